@@ -0,0 +1,358 @@
+# bench_consolidate.py
+# 송장발부 묶음 엔진 벤치마크: 기존 행 단위 루프 vs invoice_consolidate (groupby 1회)
+#
+# 사용 예)
+#   python bench_consolidate.py                      # 1k / 10k / 100k 행
+#   python bench_consolidate.py --sizes 1000 5000 --legacy-max 5000
+#   python bench_consolidate.py --workers 1 2 4 8    # 가장 큰 크기로 멀티프로세스 확장성 측정
+#
+# 크기와 상관없이 빈 입력 등 경계 경우도 매번 돌려서 consolidate / consolidate_sharded 결과가 같은지 확인하고,
+# 같은 입력을 두 번 돌리는 경우(두 번째는 이미 변환한 주문이라 전부 건너뜀)도 각 엔진(단일/분할/스트리밍)으로 확인한다.
+# 기존 루프는 O(행 × 묶음) 이라 큰 입력에서는 수십 분 걸리므로 --legacy-max 이하 크기에서만 돌리고,
+# 돌린 경우에는 결과가 완전히 같은지(출고번호 기준 정렬 후) 함께 확인한다.
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from invoice_consolidate import (
+    ChannelSpec,
+    NAVER,
+    COUPANG,
+    consolidate,
+    consolidate_sharded,
+    COL_BUNDLE,
+    COL_ITEM,
+    COL_QTY,
+    COL_MEMO,
+    COL_ENGRAVE,
+    COL_YEAR_COUNT,
+    TITLE_DISPLAY_COUNT,
+)
+from invoice_stream import stream_consolidate
+from order_history import OrderHistory
+from processed_index import ProcessedIndex
+
+
+# ---------------------------------------------------------------------------
+# 합성 입력 (실제 다운로드 엑셀과 같은 컬럼 구성)
+# ---------------------------------------------------------------------------
+
+def make_naver_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    rows = []
+    bundle = 2024010100000000
+    while len(rows) < n_rows:
+        bundle += rnd.randint(1, 50)
+        for _ in range(rnd.choice([1, 1, 1, 2, 3, 5, 14])):
+            memo = None if rnd.random() < 0.3 else f"여기에 문구: 각인 {rnd.randint(1, 999)}"
+            rows.append({
+                "상품주문번호": bundle * 10 + len(rows) % 10,
+                "주문번호": bundle,
+                "배송방법": "택배,등기,소포",
+                "송장번호": None,
+                "수취인명": f"고객{bundle % 1000}",
+                "수취인연락처1": f"010-{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+                "수취인연락처2": None,
+                "상품명": f"하비브라운 각인 키링 {rnd.randint(1, 30)}",
+                "옵션정보": memo,
+                "수량": rnd.randint(1, 4),
+                "배송메세지": "문 앞",
+                "1년 주문건수": rnd.randint(0, 5),
+                "기본배송지": "서울특별시 강남구 테헤란로 1",
+                "상세배송지": "101호",
+                "우편번호": "06236",
+                "구매자명": f"구매자{bundle % 1000}",
+                "구매자연락처": "010-0000-0000",
+                "주문일시": "2024-01-01 10:00:00",
+                "결제일": "2024-01-01 10:00:01",
+                "정산예정금액": 12000,
+            })
+    return pd.DataFrame(rows[:n_rows])
+
+
+def make_coupang_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    rows = []
+    bundle = 300000000
+    while len(rows) < n_rows:
+        bundle += rnd.randint(1, 50)
+        for _ in range(rnd.choice([1, 1, 1, 2, 3, 5, 14])):
+            rows.append({
+                "묶음배송번호": bundle,
+                "주문번호": bundle * 10 + len(rows) % 10,
+                "수취인이름": f"고객{bundle % 1000}",
+                "수취인전화번호": "0502-0000-0000",
+                "등록옵션명": f"옵션 {rnd.randint(1, 30)}",
+                "최초등록등록상품명/옵션명": f"하비브라운 각인 키링,{rnd.randint(1, 30)}",
+                "구매수(수량)": rnd.randint(1, 4),
+                "배송메세지": "문 앞",
+                "주문자 추가메시지": 0 if rnd.random() < 0.3 else f"각인 {rnd.randint(1, 999)}",
+                "수취인 주소": "서울특별시 강남구 테헤란로 1 101호",
+                "우편번호": "06236",
+                "구매자": f"구매자{bundle % 1000}",
+                "구매자전화번호": "0502-0000-0001",
+                "결제액": 12000,
+            })
+    return pd.DataFrame(rows[:n_rows])
+
+
+# ---------------------------------------------------------------------------
+# 기존 루프 (ExcelCalWindow.my_naver / my_coopang 의 묶음 부분, print/qWait 만 뺌)
+# ---------------------------------------------------------------------------
+
+def legacy_consolidate(df_raw: pd.DataFrame, spec: ChannelSpec):
+    df_list = df_raw.copy()
+    for col, value in spec.constants.items():
+        df_list[col] = value
+    df_list.rename(columns=spec.rename, inplace=True)
+    df_list[COL_ENGRAVE] = ""
+
+    cols = spec.work_columns
+    df = pd.DataFrame(df_list[cols].values.tolist(), columns=cols)
+    keys = list(set(df_list[COL_BUNDLE].values.tolist()))
+    new_data = pd.DataFrame(columns=cols)
+
+    def body(idx):
+        if pd.isnull(df.loc[idx, COL_MEMO]):
+            text = df.loc[idx, COL_ITEM]
+        else:
+            text = str(df.loc[idx, COL_MEMO])
+            text = text.replace("여기에 문구:", "").replace("여기에 각인 문구:", "")
+        if spec.option_column:
+            text = df.loc[idx, spec.option_column] + ":" + text
+        return text
+
+    for set_2 in range(len(keys)):
+        result = df[df[COL_BUNDLE] == keys[set_2]]
+        total_ = 0
+        for set_index in range(len(result.index)):
+            idx = result.index[set_index]
+            add_write = "=> " + str(result[COL_QTY][idx]) + " ea"
+            num = str(set_index + 1) + ". "
+            if set_index == 0:
+                df.loc[idx, COL_ITEM] = num + body(idx) + add_write
+                df.loc[idx, COL_ENGRAVE] = df.loc[idx, COL_ITEM]
+                new_data.loc[len(new_data)] = df.iloc[result.index[0]]
+            else:
+                line = num + body(idx) + add_write
+                new_data.loc[set_2, COL_ITEM] = new_data.loc[set_2, COL_ITEM] + "\n" + line
+                new_data.loc[set_2, COL_ENGRAVE] = new_data.loc[set_2, COL_ENGRAVE] + "\n" + line
+
+            total_ += int(result[COL_QTY][idx])
+            if len(result.index) - 1 == set_index:
+                header = "[hobby brown] total => " + str(total_) + " ea" + "\n\n"
+                new_data.loc[set_2, COL_ENGRAVE] = header + new_data.loc[set_2, COL_ITEM]
+                if spec.year_count_line:
+                    new_data.loc[set_2, COL_ENGRAVE] = (
+                        "1년 주문건수 : " + str(new_data.loc[set_2, COL_YEAR_COUNT]) + "건" + "\n"
+                        + new_data.loc[set_2, COL_ENGRAVE]
+                    )
+                split = new_data.loc[set_2, COL_ITEM].split("\n")
+                if len(split) >= TITLE_DISPLAY_COUNT + 1:
+                    kept = split[:TITLE_DISPLAY_COUNT - 3] + [".", ".", "^_~"]
+                    new_data.loc[set_2, COL_ITEM] = "\n".join(kept)
+                new_data.loc[set_2, COL_ITEM] = header + new_data.loc[set_2, COL_ITEM]
+
+    for many in range(len(new_data)):
+        new_data.loc[many, COL_QTY] = 1
+    new_data = pd.DataFrame(new_data, columns=spec.invoice_columns)
+    for col in spec.invoice_str_columns:
+        new_data[col] = new_data[col].astype(str)
+    full = new_data.copy()
+    full[COL_ITEM] = full[COL_ENGRAVE]
+
+    send_data = None
+    if spec.send_columns:
+        df_send = pd.DataFrame(
+            df_list.rename(columns=spec.send_source)[list(spec.send_source.values())].values.tolist(),
+            columns=list(spec.send_source.values()),
+        )
+        send_data = pd.DataFrame(columns=spec.send_columns)
+        for key in keys:
+            result = df_send[df_send[spec.send_source[COL_BUNDLE]] == key]
+            for idx in result.index:
+                send_data.loc[len(send_data)] = df_send.iloc[idx]
+        for col in spec.send_str_columns:
+            send_data[col] = send_data[col].astype(str)
+
+    return new_data, full, send_data
+
+
+# ---------------------------------------------------------------------------
+# 비교 / 실행
+# ---------------------------------------------------------------------------
+
+def _sorted_cells(df: pd.DataFrame) -> List[List[str]]:
+    out = df.sort_values(COL_BUNDLE, kind="stable").reset_index(drop=True)
+    return out.astype(object).astype(str).values.tolist()
+
+
+def _check_same(spec: ChannelSpec, legacy, fast) -> None:
+    pairs = [("송장발부", legacy[0], fast.invoice), ("송장발부_전체", legacy[1], fast.invoice_full)]
+    if spec.send_columns:
+        pairs.append(("발송처리", legacy[2], fast.send))
+    for name, old, new in pairs:
+        if list(old.columns) != list(new.columns) or _sorted_cells(old) != _sorted_cells(new):
+            raise AssertionError(f"[{spec.label}] {name} 결과가 기존 루프와 다릅니다.")
+
+
+def run(sizes: List[int], legacy_max: int) -> None:
+    makers = [(NAVER, make_naver_frame), (COUPANG, make_coupang_frame)]
+    print(f"{'채널':<6}{'행 수':>9}{'묶음 수':>9}{'기존(s)':>11}{'신규(s)':>10}{'배속':>10}")
+    for spec, maker in makers:
+        for n in sizes:
+            raw = maker(n)
+            if spec is COUPANG:
+                raw = raw.fillna(0)
+
+            t0 = time.perf_counter()
+            fast = consolidate(raw, spec)
+            t_fast = time.perf_counter() - t0
+
+            t_old_txt, speed_txt = "-", "-"
+            if n <= legacy_max:
+                t0 = time.perf_counter()
+                legacy = legacy_consolidate(raw, spec)
+                t_old = time.perf_counter() - t0
+                _check_same(spec, legacy, fast)
+                t_old_txt = f"{t_old:.2f}"
+                speed_txt = f"x{t_old / max(t_fast, 1e-9):.0f}"
+
+            print(f"{spec.label:<6}{n:>9,}{fast.groups:>9,}{t_old_txt:>11}{t_fast:>10.3f}{speed_txt:>10}")
+
+
+def _check_identical(spec: ChannelSpec, base, other, workers: int) -> None:
+    """여러 프로세스로 나눠도 행 순서까지 그대로여야 한다 (결정적 결과)."""
+    pairs = [("송장발부", base.invoice, other.invoice)]
+    if spec.send_columns:
+        pairs.append(("발송처리", base.send, other.send))
+    for name, a, b in pairs:
+        if not a.astype(object).astype(str).equals(b.astype(object).astype(str)):
+            raise AssertionError(f"[{spec.label}] {name} 결과가 workers={workers} 에서 다릅니다.")
+
+
+def run_scaling(n: int, workers_list: List[int]) -> None:
+    """consolidate_sharded 를 workers 별로 돌려 시간/배속을 찍고, 단일 프로세스 결과와 같은지 확인."""
+    makers = [(NAVER, make_naver_frame), (COUPANG, make_coupang_frame)]
+    print(f"\n{'채널':<6}{'행 수':>9}{'workers':>9}{'시간(s)':>10}{'배속':>8}  단계")
+    for spec, maker in makers:
+        raw = maker(n)
+        if spec is COUPANG:
+            raw = raw.fillna(0)
+        base = consolidate(raw, spec)
+        t_base = None
+        for w in workers_list:
+            t0 = time.perf_counter()
+            res = consolidate_sharded(raw, spec, workers=w)
+            elapsed = time.perf_counter() - t0
+            _check_identical(spec, base, res, w)
+            if t_base is None:
+                t_base = elapsed
+            steps = ", ".join(f"{k} {v:.2f}" for k, v in res.timings.items())
+            print(f"{spec.label:<6}{n:>9,}{w:>9}{elapsed:>10.3f}{t_base / max(elapsed, 1e-9):>8.2f}  {steps}")
+
+
+def _edge_inputs(spec: ChannelSpec, maker) -> List[tuple]:
+    """(이름, 입력) — 벤치 크기와 상관없이 항상 확인하는 경계 경우"""
+    raw = maker(50)
+    if spec is COUPANG:
+        raw = raw.fillna(0)
+    bundle_col = spec.raw_column(COL_BUNDLE)
+    return [
+        ("빈 입력", raw.iloc[0:0]),
+        ("1행", raw.iloc[:1]),
+        ("출고번호 1개", raw[raw[bundle_col] == raw[bundle_col].iloc[0]]),
+    ]
+
+
+def run_edge_cases(workers_list: List[int]) -> None:
+    """빈 입력 / 나눌 조각이 하나뿐인 입력에서도 consolidate_sharded 가 consolidate 와 같은지."""
+    makers = [(NAVER, make_naver_frame), (COUPANG, make_coupang_frame)]
+    for spec, maker in makers:
+        for name, raw in _edge_inputs(spec, maker):
+            base = consolidate(raw, spec)
+            for w in workers_list:
+                res = consolidate_sharded(raw, spec, workers=w)
+                _check_identical(spec, base, res, w)
+                if (res.rows, res.groups) != (base.rows, base.groups):
+                    raise AssertionError(f"[{spec.label}] {name}: 행/묶음 수가 workers={w} 에서 다릅니다.")
+    print(f"\n경계 경우 확인 OK (빈 입력, 1행, 출고번호 1개 / workers {workers_list})")
+
+
+def _check_rerun_skipped(spec: ChannelSpec, raw: pd.DataFrame, workers: int, db_dir: Path) -> None:
+    """한 번 변환하고 표시한 주문을 다시 넣으면 전부 건너뛰고, 빈 입력 변환이 오류 없이 0건으로 끝나야 한다."""
+    with ProcessedIndex(db_dir / "processed.sqlite3") as processed, \
+            OrderHistory(db_dir / "history.sqlite3") as history:
+        new, skipped = processed.split_new(spec, raw)
+        if skipped or len(new) != len(raw):
+            raise AssertionError(f"[{spec.label}] 첫 실행에서 {skipped}행을 건너뛰었습니다.")
+        first = consolidate_sharded(new, spec, workers, history=history)
+        if first.rows != len(raw):
+            raise AssertionError(f"[{spec.label}] 첫 실행 결과 행 수가 다릅니다 (workers={workers}).")
+        processed.mark_processed(spec, new)
+
+        again, skipped = processed.split_new(spec, raw)
+        if len(again) or skipped != len(raw):
+            raise AssertionError(f"[{spec.label}] 다시 돌릴 때 {len(again)}행이 새 주문으로 남았습니다.")
+        res = consolidate_sharded(again, spec, workers, history=history)
+        if res.rows or res.groups or len(res.invoice) or list(res.invoice.columns) != list(first.invoice.columns):
+            raise AssertionError(f"[{spec.label}] 전부 건너뛴 재실행 결과가 비어 있지 않습니다 (workers={workers}).")
+
+
+def _check_rerun_stream(spec: ChannelSpec, raw: pd.DataFrame, tmp_dir: Path) -> None:
+    """스트리밍 엔진도 같은 파일을 두 번 돌리면 두 번째는 전부 건너뛰고 아무것도 저장하지 않아야 한다."""
+    src = tmp_dir / "input.xlsx"
+    raw.to_excel(src, index=False)
+    with ProcessedIndex(tmp_dir / "processed.sqlite3") as processed:
+        first = stream_consolidate(spec, str(src), str(tmp_dir / "out"), "first_", processed=processed)
+        again = stream_consolidate(spec, str(src), str(tmp_dir / "out"), "again_", processed=processed)
+    if first.rows != len(raw) or not first.paths:
+        raise AssertionError(f"[{spec.label}] 스트리밍 첫 실행 결과 행 수가 다릅니다.")
+    if again.rows or again.paths or again.skipped_rows != len(raw):
+        raise AssertionError(f"[{spec.label}] 스트리밍 재실행에서 주문을 다시 변환했습니다.")
+
+
+def run_rerun_checks(workers_list: List[int]) -> None:
+    """같은 입력을 두 번 — 두 번째는 이미 변환한 주문이라 빈 입력으로 변환된다."""
+    makers = [(NAVER, make_naver_frame), (COUPANG, make_coupang_frame)]
+    with tempfile.TemporaryDirectory(prefix="bench_rerun_") as tmp:
+        tmp_dir = Path(tmp)
+        for i, (spec, maker) in enumerate(makers):
+            raw = maker(200)
+            if spec is COUPANG:
+                raw = raw.fillna(0)
+            for w in [1] + workers_list:
+                db_dir = tmp_dir / f"{i}_{w}"
+                db_dir.mkdir()
+                _check_rerun_skipped(spec, raw, w, db_dir)
+            if not spec.password_protected:         # 네이버 스트리밍은 암호 걸린 원본이 필요
+                stream_dir = tmp_dir / f"{i}_stream"
+                stream_dir.mkdir()
+                _check_rerun_stream(spec, raw, stream_dir)
+    print(f"재실행(전부 건너뜀) 확인 OK (workers 1, {', '.join(map(str, workers_list))} / 스트리밍)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="송장발부 묶음 엔진 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000,
+                        help="이 행 수 이하에서만 기존 루프를 돌려 비교 (기본 10000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="가장 큰 --sizes 로 consolidate_sharded 를 이 프로세스 수들로 측정 (예: 1 2 4 8)")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_max)
+    edge_workers = sorted({w for w in (args.workers or []) if w > 1}) or [2, 4]
+    run_edge_cases(edge_workers)
+    run_rerun_checks(edge_workers)
+    if args.workers:
+        run_scaling(max(args.sizes), args.workers)
+
+
+if __name__ == "__main__":
+    main()
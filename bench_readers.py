@@ -0,0 +1,115 @@
+# bench_readers.py
+# 엑셀 읽기 백엔드 벤치마크: openpyxl vs calamine vs CSV/TSV (excel_readers)
+#
+# 사용 예)
+#   python bench_readers.py                      # 10k / 50k 행
+#   python bench_readers.py --sizes 1000 100000
+#
+# 실제 다운로드/결과 엑셀과 같은 컬럼 구성(네이버 주문, 쿠팡 주문, 송장발부 결과)으로 파일을 만들어
+# 백엔드마다 읽기 시간을 재고, openpyxl 결과와 dtype·값이 완전히 같은지 함께 확인한다.
+# 합성 입력은 고치지 않고 그대로 쓴다: 17자리 숫자 주문번호(calamine 은 openpyxl 로 다시 읽음),
+# 숫자 0 과 글자가 섞인 컬럼 등 실제 다운로드 파일 모양에서 백엔드 차이가 드러나야 하므로.
+# CSV 는 셀 타입이 없어 섞인 컬럼은 값이 다르게 나올 수 있다 (다른 컬럼과 예를 함께 출력).
+# calamine 은 python-calamine 이 설치되어 있을 때만 측정한다.
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from bench_consolidate import make_coupang_frame, make_naver_frame
+from excel_readers import available_backends, read_table
+from invoice_consolidate import NAVER, COUPANG, consolidate
+from xlsx_stream import write_xlsx
+
+
+# ---------------------------------------------------------------------------
+# 측정용 파일 (형태 이름, DataFrame, usecols, dtype)
+# ---------------------------------------------------------------------------
+
+def _shapes(n: int) -> List[Tuple[str, pd.DataFrame, Optional[List[str]], Optional[Dict[str, type]]]]:
+    naver = make_naver_frame(n)
+    coupang = make_coupang_frame(n)
+    invoice = consolidate(naver, NAVER).invoice
+    return [
+        ("네이버 주문", naver, NAVER.source_columns(), NAVER.source_dtypes()),
+        ("쿠팡 주문", coupang, COUPANG.source_columns(), COUPANG.source_dtypes()),
+        ("송장발부 결과", invoice, None, None),
+    ]
+
+
+def _write_inputs(df: pd.DataFrame, folder: str) -> Dict[str, str]:
+    paths = {
+        "xlsx": os.path.join(folder, "export.xlsx"),
+        "csv": os.path.join(folder, "export.csv"),
+        "tsv": os.path.join(folder, "export.tsv"),
+    }
+    write_xlsx(paths["xlsx"], df)
+    df.to_csv(paths["csv"], index=False, encoding="utf-8-sig")
+    df.to_csv(paths["tsv"], index=False, sep="\t", encoding="utf-8-sig")
+    return paths
+
+
+def _timed(fn: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, float]:
+    t0 = time.perf_counter()
+    df = fn()
+    return df, time.perf_counter() - t0
+
+
+def _compare(base: pd.DataFrame, other: pd.DataFrame) -> Tuple[bool, bool]:
+    """(dtype 일치, 값 일치)"""
+    same_dtypes = list(base.columns) == list(other.columns) and (base.dtypes == other.dtypes).all()
+    return bool(same_dtypes), bool(same_dtypes and base.equals(other))
+
+
+def _value_diff(base: pd.DataFrame, other: pd.DataFrame) -> Dict[str, str]:
+    """값이 다른 컬럼마다 다른 행 수와 첫 예 (openpyxl 값 → 이 백엔드 값)"""
+    out = {}
+    for c in base.columns:
+        a, b = base[c], other[c]
+        diff = ~((a == b) | (a.isna() & b.isna()))
+        if diff.any():
+            i = diff.idxmax()
+            out[c] = f"{int(diff.sum())}행, 예: {a[i]!r} → {b[i]!r}"
+    return out
+
+
+def run(sizes: List[int]) -> None:
+    excel_backends = [b for b in ("openpyxl", "calamine") if b in available_backends()]
+    print(f"{'형태':<10}{'행 수':>9}  {'백엔드':<10}{'입력':<6}{'시간(s)':>10}{'배속':>8}  dtype  값")
+    for n in sizes:
+        for shape, df, usecols, dtype in _shapes(n):
+            with tempfile.TemporaryDirectory(prefix="bench_readers_") as folder:
+                paths = _write_inputs(df, folder)
+                runs = [(b, "xlsx") for b in excel_backends] + [("csv", "csv"), ("csv", "tsv")]
+                base, t_base = None, None
+                for backend, kind in runs:
+                    out, elapsed = _timed(lambda: read_table(paths[kind], usecols=usecols, dtype=dtype,
+                                                             backend=backend))
+                    if base is None:
+                        base, t_base = out, elapsed
+                    same_dtypes, same_values = _compare(base, out)
+                    print(
+                        f"{shape:<10}{n:>9,}  {backend:<10}{kind:<6}{elapsed:>10.3f}{t_base / max(elapsed, 1e-9):>8.1f}"
+                        f"  {'O' if same_dtypes else 'X':^5}  {'O' if same_values else 'X'}"
+                    )
+                    if not same_dtypes:
+                        diff = {c: (str(base[c].dtype), str(out[c].dtype))
+                                for c in base.columns if c in out.columns and base[c].dtype != out[c].dtype}
+                        print(f"    dtype 다름: {diff}")
+                    elif not same_values:
+                        print(f"    값 다름: {_value_diff(base, out)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀 읽기 백엔드 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# blob_store.py
+# 첨부 사진 원본 저장소 (내용 주소, 사용자 로컬 폴더, Qt 없이 동작)
+# - 예전: 사진을 붙일 때마다 원본 전체를 메모리로 읽어(read_bytes) <엑셀이름>/images 에 통째로 복사
+#   → 같은 도안 사진을 주문 50개에 붙이면 디스크에 50벌
+# - 지금: 원본은 blobs/<sha256 앞 2자리>/<sha256><확장자> 에 한 벌만 (처음 붙일 때 COPY_CHUNK 씩 흘려 복사)
+#   각 송장의 images/row_… 파일은 그 blob 의 하드링크 → 다시 붙이는 건 링크 하나 (데이터 복사 없음)
+#   이미지 캐시/썸네일/갤러리는 지금처럼 images/ 의 파일 경로를 그대로 읽는다.
+# - 참조 수 = 파일 시스템 링크 수 (st_nlink): blob 자신 1 + 송장 images 의 링크들
+#   → 따로 색인 파일 없이 usage() 로 논리(송장들이 보는) / 실제(디스크) 용량을 계산하고,
+#     아무 송장도 안 쓰는 blob(링크 1개)은 정리할 수 있다.
+# - 하드링크를 만들 수 없는 곳(다른 드라이브, 네트워크 폴더 등)은 blob 없이 원본에서 바로 복사 (역시 흘려 복사)
+# - 안 쓰는 blob 정리(usage(prune_orphans=True))는 송장을 열 때마다 하지 않고, 해도 ORPHAN_GRACE_SECONDS 지난 것만
+#
+# 주의: 링크된 사진은 같은 파일이므로 images/ 안에서 직접 고치면 같은 사진을 붙인 다른 주문도 바뀐다.
+#       (사진을 바꾸려면 사진 관리에서 지우고 다시 추가)
+
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from file_hash import sha256_file
+
+
+DEFAULT_BLOB_DIR = Path.home() / ".excel_cal" / "blobs"
+
+# 복사할 때 한 번에 읽고 쓰는 크기
+COPY_CHUNK = 1024 * 1024
+
+# usage(prune_orphans=True) 는 이만큼(초) 지난 blob 만 지운다
+# (다른 프로세스가 막 만들고 아직 송장에 링크하기 전일 수 있음)
+ORPHAN_GRACE_SECONDS = 10 * 60
+
+
+@dataclass
+class BlobUsage:
+    blobs: int = 0              # 저장된 사진 수 (내용 기준)
+    links: int = 0              # 송장 images 에서 가리키는 파일 수
+    logical_bytes: int = 0      # 송장 images 파일 크기 합 (링크마다 따로 센 크기)
+    physical_bytes: int = 0     # blob 실제 크기 합
+    orphans: int = 0            # 아무 송장도 안 쓰는 blob (prune_orphans 면 지운 수)
+
+    def describe(self) -> str:
+        mb = 1024 * 1024
+        text = (
+            f"사진 {self.links:,}장 / 실제 {self.blobs:,}개, "
+            f"논리 {self.logical_bytes / mb:,.1f}MB / 실제 {self.physical_bytes / mb:,.1f}MB "
+            f"(절약 {(self.logical_bytes - self.physical_bytes) / mb:,.1f}MB)"
+        )
+        if self.orphans:
+            text += f", 안 쓰는 사진 {self.orphans:,}개"
+        return text
+
+
+def _copy_streaming(src: Path, dst: Path) -> None:
+    """src → dst (COPY_CHUNK 씩, 임시 파일에 쓴 뒤 이름 바꾸기)"""
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            shutil.copyfileobj(fin, fout, COPY_CHUNK)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class BlobStore:
+    """
+    sha256 → 원본 사진 한 벌.
+    cache_dir/<sha256 앞 2자리>/<sha256><확장자 소문자>
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_BLOB_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+        self.linked = 0
+        self.copied = 0
+
+    def blob_path(self, sha: str, ext: str) -> Path:
+        return self.cache_dir / sha[:2] / f"{sha}{ext.lower()}"
+
+    def _can_link(self, target_dir: Path) -> bool:
+        """target_dir 에 blob 의 하드링크를 만들 수 있는지 (같은 드라이브/볼륨인지)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return os.stat(target_dir).st_dev == os.stat(self.cache_dir).st_dev
+
+    def attach(self, src: Path, target: Path) -> bool:
+        """
+        src 사진을 target(송장 images/ 안의 새 파일 이름)으로 붙인다.
+        blob 의 하드링크면 True, 링크를 만들 수 없어 복사했으면 False.
+        링크를 못 만드는 곳(송장이 다른 드라이브 등)은 blob 을 만들지 않고 src 에서 바로 복사한다
+        (blob 을 만들어 두면 복사가 두 번이고, 링크 없는 blob 은 결국 정리 대상).
+        """
+        src, target = Path(src), Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not self._can_link(target.parent):
+            _copy_streaming(src, target)
+            self.copied += 1
+            return False
+
+        blob = self.blob_path(sha256_file(str(src)), src.suffix or ".png")
+        with self._lock:
+            for _ in range(2):
+                created = False
+                if not blob.is_file():
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    _copy_streaming(src, blob)
+                    created = True
+                try:
+                    os.link(blob, target)
+                    self.linked += 1
+                    return True
+                except FileNotFoundError:
+                    # 확인한 뒤 다른 프로세스가 마지막 사용처를 지우면서 blob 도 지움 → 다시 만든다
+                    continue
+                except OSError:
+                    # 같은 볼륨이라도 하드링크를 지원하지 않는 파일 시스템 → 방금 만든 blob 은 남기지 않음
+                    if created:
+                        try:
+                            blob.unlink()
+                        except OSError:
+                            pass
+                    break
+        _copy_streaming(src, target)
+        self.copied += 1
+        return False
+
+    def release(self, path: Path) -> None:
+        """송장 images/ 의 파일을 지운다. 그 사진을 쓰는 곳이 더 없으면 blob 도 지운다."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        blob = None
+        if st.st_nlink == 2:                # 이 파일 + blob → 마지막 사용처
+            try:
+                blob = self.blob_path(sha256_file(str(path)), path.suffix or ".png")
+            except OSError:
+                blob = None
+        path.unlink()
+        if blob is not None:
+            with self._lock:
+                try:
+                    bst = blob.stat()
+                    if bst.st_nlink == 1 and bst.st_ino == st.st_ino:
+                        blob.unlink()
+                except OSError:
+                    pass
+
+    def usage(self, prune_orphans: bool = False) -> BlobUsage:
+        """
+        저장소 전체의 논리/실제 용량. prune_orphans 면 아무 송장도 안 쓰는 blob 중
+        ORPHAN_GRACE_SECONDS 보다 오래된 것을 지운다 (_lock 은 이 프로세스 안에서만 막으므로).
+        """
+        out = BlobUsage()
+        if not self.cache_dir.is_dir():
+            return out
+        older_than = time.time() - ORPHAN_GRACE_SECONDS
+        with self._lock:
+            for sub in os.scandir(self.cache_dir):
+                if not sub.is_dir():
+                    continue
+                for entry in os.scandir(sub.path):
+                    if not entry.is_file() or entry.name.endswith(".tmp"):
+                        continue
+                    st = os.stat(entry.path)     # Windows 의 DirEntry.stat() 은 st_nlink 가 0
+                    refs = st.st_nlink - 1
+                    if refs <= 0:
+                        out.orphans += 1
+                        if prune_orphans and st.st_mtime < older_than:
+                            try:
+                                os.unlink(entry.path)
+                            except OSError:
+                                pass
+                            continue
+                    out.blobs += 1
+                    out.links += max(refs, 0)
+                    out.physical_bytes += st.st_size
+                    out.logical_bytes += st.st_size * max(refs, 0)
+        return out
+
+    def clear(self) -> None:
+        """blob 전체 삭제 (송장 images/ 의 하드링크는 그대로 남는다)"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# 기본 저장소 (프로세스당 하나)
+# ---------------------------------------------------------------------------
+
+_default_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = BlobStore()
+    return _default_store
@@ -0,0 +1,144 @@
+# cache_index.py
+# 원본 파일 sha256 로 찾는 캐시 폴더 공용 부분 (복호화 캐시 / 읽기 캐시)
+# - index.json
+#   · "paths": {"경로|크기|mtime_ns": sha256}   ← 같은 파일이면 sha256 계산도 생략
+#   · "entries": {"sha256_부가키": {"size", "last_used", ...}}
+# - 캐시 파일: cache_dir/<키><BLOB_SUFFIX>
+# - 전체 크기 상한을 넘으면 가장 오래 안 쓴 것부터 삭제 (LRU)
+# - 여러 프로세스(명령줄 --jobs)가 같은 폴더를 쓴다:
+#   · index 는 임시 파일(프로세스+스레드별 이름)에 쓴 뒤 교체
+#   · 오래 걸리는 작업(복호화/파싱) 뒤에는 index 를 다시 읽어서 항목을 추가 (add_entry)
+#   · 그래도 빠진 캐시 파일(index 에 없는 것)은 ORPHAN_GRACE_SECONDS 가 지나면 정리
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from file_hash import path_key, sha256_file
+
+
+# index 에 없는 캐시 파일은 이만큼(초) 지난 것만 지운다 (다른 프로세스가 막 만들고 아직 index 에 넣기 전일 수 있음)
+ORPHAN_GRACE_SECONDS = 10 * 60
+
+
+def temp_path(path: Path) -> Path:
+    """path 옆의 임시 파일 이름 (프로세스 + 스레드별, 다 쓰면 os.replace 로 path 에)"""
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+class IndexedFileCache:
+    """
+    DecryptCache / FrameCache 의 공통 부분. 하위 클래스는 BLOB_SUFFIX / LOG_LABEL 만 정하고
+    _file_sha() 로 키를 만들어 _blob_path() 에 저장한 뒤 add_entry() 한다.
+    """
+
+    BLOB_SUFFIX = ".bin"
+    LOG_LABEL = "캐시"
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.index_path = self.cache_dir / "index.json"
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # index.json
+    # ------------------------------------------------------------------
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {"paths": dict(data.get("paths", {})), "entries": dict(data.get("entries", {}))}
+        except (OSError, IOError, json.JSONDecodeError, ValueError, TypeError, AttributeError):
+            return {"paths": {}, "entries": {}}
+
+    def _save_index(self, index: Dict[str, Dict]) -> None:
+        tmp = temp_path(self.index_path)
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def _blob_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.BLOB_SUFFIX}"
+
+    def _file_sha(self, index: Dict[str, Dict], path: str) -> str:
+        pk = path_key(path, os.stat(path))
+        sha = index["paths"].get(pk)
+        if sha is None:
+            sha = sha256_file(path)
+            index["paths"][pk] = sha
+        return sha
+
+    # ------------------------------------------------------------------
+    # 추가 / 정리
+    # ------------------------------------------------------------------
+    def add_entry(self, path: str, key: str, entry: Dict) -> None:
+        """
+        _blob_path(key) 에 캐시 파일을 다 쓴 뒤 index 에 추가.
+        그동안 다른 프로세스가 index 를 바꿨을 수 있으므로 다시 읽어서 추가한다.
+        """
+        index = self._load_index()
+        self._file_sha(index, path)
+        index["entries"][key] = {"size": self._blob_path(key).stat().st_size, "last_used": time.time(), **entry}
+        self._evict(index)
+        self._save_index(index)
+
+    def _evict(self, index: Dict[str, Dict]) -> None:
+        entries = index["entries"]
+        total = sum(e.get("size", 0) for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key].get("size", 0)
+            entries.pop(key)
+            try:
+                self._blob_path(key).unlink()
+            except OSError:
+                pass
+
+        live_shas = {k.split("_", 1)[0] for k in entries}
+        index["paths"] = {p: sha for p, sha in index["paths"].items() if sha in live_shas}
+        self._remove_orphans(set(entries), time.time() - ORPHAN_GRACE_SECONDS)
+
+    def _remove_orphans(self, keep: Set[str], older_than: Optional[float] = None) -> None:
+        """
+        index 에 없는 캐시 파일(동시에 쓰던 다른 프로세스가 index 를 덮어써서 빠진 것 등)과 남은 임시 파일 삭제.
+        주문 내용이 그대로 들어 있으므로 남겨 두지 않는다. older_than 이 있으면 그보다 오래된 것만.
+        """
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(self.BLOB_SUFFIX):
+                if name[:-len(self.BLOB_SUFFIX)] in keep:
+                    continue
+            elif not name.endswith(".tmp"):
+                continue
+            p = self.cache_dir / name
+            try:
+                if older_than is None or p.stat().st_mtime < older_than:
+                    p.unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """index 에 있든 없든 캐시 폴더의 캐시 파일 / 임시 파일을 모두 지운다."""
+        self._remove_orphans(set())
+        if self.cache_dir.is_dir():
+            self._save_index({"paths": {}, "entries": {}})
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+    def stats_text(self) -> str:
+        return f"적중 {self.hits}회 / 미적중 {self.misses}회, 절약 {self.saved_seconds:.2f}초"
+
+    def _log(self) -> None:
+        print(f"[{self.LOG_LABEL}] {self.stats_text()}")
@@ -0,0 +1,245 @@
+# decrypt_cache.py
+# 비밀번호 걸린 네이버 엑셀의 복호화 결과 캐시
+# - 같은 다운로드 파일을 여러 번 열 때 msoffcrypto AES 복호화를 한 번만 하도록
+# - 키: 원본 파일 (경로, 크기, 수정시각) → sha256, sha256 + 비밀번호 해시 → 복호화된 파일
+# - 전체 크기 상한을 넘으면 가장 오래 안 쓴 것부터 삭제 (LRU)
+# - 복호화는 4KB 구간 단위로 바로 파일에 쓰고(스트리밍), 읽을 때는 mmap 으로 연다.
+#
+# 주의: 캐시에는 복호화된(=비밀번호 없는) 주문 엑셀이 저장되므로 사용자 로컬 폴더에만 둔다.
+
+import functools
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from struct import pack, unpack
+from typing import Dict, Optional
+
+import msoffcrypto
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from cache_index import IndexedFileCache, temp_path
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".excel_cal" / "decrypt_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024   # 512MB
+
+
+_SEGMENT = 4096
+_HASH_FUNCS = {"SHA1": hashlib.sha1, "SHA256": hashlib.sha256, "SHA384": hashlib.sha384, "SHA512": hashlib.sha512}
+
+
+def _decrypt_agile_streaming(excel, out) -> bool:
+    """
+    ECMA-376 Agile 암호화(엑셀 기본)를 4KB 구간마다 바로 out 에 쓴다.
+    msoffcrypto 의 decrypt() 는 복호화 결과 전체를 BytesIO → bytes 로 두 번 들고 있다가 쓰기 때문에
+    같은 알고리즘을 구간 단위로 돌린다. 지원하지 않는 형식이면 False (호출 쪽에서 기존 방식 사용).
+    """
+    try:
+        if getattr(excel, "type", None) != "agile":
+            return False
+        key = excel.secret_key
+        salt = excel.info["keyDataSalt"]
+        hash_func = _HASH_FUNCS[excel.info["keyDataHashAlgorithm"]]
+        stream = excel.file.openstream("EncryptedPackage")
+    except (AttributeError, KeyError, TypeError):
+        return False
+
+    with stream:
+        remaining = unpack("<Q", stream.read(8))[0]
+        for i, buf in enumerate(iter(functools.partial(stream.read, _SEGMENT), b"")):
+            iv = hash_func(salt + pack("<I", i)).digest()[:16]
+            decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+            dec = decryptor.update(buf) + decryptor.finalize()
+            if remaining < len(dec):
+                dec = dec[:remaining]
+            out.write(dec)
+            remaining -= len(dec)
+            if remaining <= 0:
+                break
+    return True
+
+
+def decrypt_office_file(path: str, password: str, out) -> None:
+    """
+    msoffcrypto 로 path 를 복호화해서 out(파일 객체)에 쓴다. (Agile 형식은 스트리밍)
+    스트리밍 결과가 zip(xlsx) 이 아니면 msoffcrypto 의 decrypt() 로 한 번 더 해 보고,
+    그것도 안 되면(= 비밀번호가 틀림) msoffcrypto 가 InvalidKeyError 를 낸다.
+    _decrypt_agile_streaming 은 msoffcrypto 내부 속성을 쓰므로 버전이 바뀌어 뜻이 달라져도
+    "비밀번호 틀림" 으로 끝나지 않게 하기 위함 (requirements.txt 에 검증한 버전 고정).
+    """
+    with open(path, "rb") as f:
+        excel = msoffcrypto.OfficeFile(f)
+        excel.load_key(password)
+        start = out.tell()
+        if _decrypt_agile_streaming(excel, out):
+            out.flush()
+            out.seek(start)
+            if zipfile.is_zipfile(out):
+                out.seek(0, io.SEEK_END)
+                return
+            print("[복호화] 구간 복호화 결과가 엑셀이 아니어서 msoffcrypto 로 다시 복호화합니다")
+            out.seek(start)
+            out.truncate()
+        excel.decrypt(out)
+
+
+class _MmapFile(io.RawIOBase):
+    """
+    읽기 전용 mmap 을 파일 객체처럼 감싼다.
+    (파이썬 3.13 전의 mmap 에는 seekable() 이 없어서 zipfile/openpyxl 이 바로 못 읽는다)
+    """
+
+    def __init__(self, mm: mmap.mmap):
+        super().__init__()
+        self._mm = mm
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self._mm.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mm.read(size if size is not None and size >= 0 else None)
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        self._mm.seek(pos, whence)
+        return self._mm.tell()
+
+    def tell(self) -> int:
+        return self._mm.tell()
+
+
+@contextmanager
+def _open_mmap(path) -> "_MmapFile":
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield _MmapFile(mm)
+
+
+class DecryptCache(IndexedFileCache):
+    """
+    복호화 결과를 cache_dir 에 저장해 두고 재사용 (index / LRU 는 cache_index.IndexedFileCache).
+    index.json
+      - "paths": {"경로|크기|mtime_ns": sha256}      ← 같은 파일이면 sha256 계산도 생략
+      - "entries": {"sha256_비번해시": {"size", "last_used", "decrypt_seconds"}}
+    """
+
+    BLOB_SUFFIX = ".bin"
+    LOG_LABEL = "복호화 캐시"
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def _entry_key(self, index: Dict[str, Dict], path: str, password: str) -> str:
+        pw_hash = hashlib.sha256(password.encode("utf-8")).hexdigest()[:16]
+        return f"{self._file_sha(index, path)}_{pw_hash}"
+
+    def cached_path(self, path: str, password: str) -> Path:
+        """
+        복호화된 파일의 캐시 경로를 돌려준다. 없으면 복호화해서 만든다.
+        (스트리밍/메모리 매핑으로 바로 열 때 사용)
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index = self._load_index()
+        key = self._entry_key(index, path, password)
+        blob = self._blob_path(key)
+        entry = index["entries"].get(key)
+
+        if entry is not None and blob.is_file():
+            self.hits += 1
+            self.saved_seconds += entry.get("decrypt_seconds", 0.0)
+            entry["last_used"] = time.time()
+            self._save_index(index)
+            self._log()
+            return blob
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        tmp = temp_path(blob)
+        try:
+            with tmp.open("w+b") as out:
+                decrypt_office_file(path, password, out)
+            os.replace(tmp, blob)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        self.add_entry(path, key, {"decrypt_seconds": time.perf_counter() - t0})
+        self._log()
+        return blob
+
+    def decrypt(self, path: str, password: str) -> io.BytesIO:
+        """복호화된 내용을 BytesIO 로 돌려준다. (캐시에 있으면 AES 복호화 생략)"""
+        blob = self.cached_path(path, password)
+        return io.BytesIO(blob.read_bytes())
+
+    @contextmanager
+    def open_mmap(self, path: str, password: str):
+        """복호화된 캐시 파일을 읽기 전용 mmap 으로 연다."""
+        with _open_mmap(self.cached_path(path, password)) as mm:
+            yield mm
+
+
+# ---------------------------------------------------------------------------
+# 캐시 없이 임시 파일로 복호화
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def open_decrypted_mmap(path: str, password: str, cache: Optional[DecryptCache] = None):
+    """
+    복호화된 엑셀을 mmap 으로 연다. (pd.read_excel 에 그대로 넘길 수 있음)
+    - cache 가 있으면 캐시 파일을 그대로 매핑
+    - 없으면 임시 파일에 스트리밍 복호화 → 매핑 → 끝나면 삭제
+    복호화 결과가 파이썬 메모리에 bytes 로 올라오지 않으므로, 읽는 동안 메모리에는
+    olefile 이 잡는 암호화 원본 1벌(복호화 단계) 또는 pandas 가 만든 결과 1벌(읽기 단계)만 남는다.
+    """
+    if cache is not None:
+        with cache.open_mmap(path, password) as mm:
+            yield mm
+        return
+
+    fd, tmp = tempfile.mkstemp(prefix="excel_cal_", suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "w+b") as out:
+            decrypt_office_file(path, password, out)
+        with _open_mmap(tmp) as mm:
+            yield mm
+    finally:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# 기본 캐시 (프로세스당 하나)
+# ---------------------------------------------------------------------------
+
+_default_cache: Optional[DecryptCache] = None
+_default_enabled = True
+
+
+def get_default_cache() -> Optional[DecryptCache]:
+    """기본 캐시. set_cache_enabled(False) 면 None (매번 메모리에서 복호화)."""
+    global _default_cache
+    if not _default_enabled:
+        return None
+    if _default_cache is None:
+        _default_cache = DecryptCache()
+    return _default_cache
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    global _default_enabled
+    _default_enabled = enabled
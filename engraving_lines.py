@@ -0,0 +1,107 @@
+# engraving_lines.py
+# 송장 품목명/상품명 칸의 각인 문구 줄 파싱 (Qt 없이 동작)
+# - 칸 하나씩 splitlines + re.match 하지 않고, 컬럼 전체를 pandas str 연산으로 한 번에 나눈다.
+# - 결과는 줄 단위 표 (row, line_no, text, qty): 엑셀을 읽을 때 한 번 만들어서
+#   "문구개수" 컬럼과 더블클릭 COPY 다이얼로그가 같이 쓴다 (더블클릭할 때 다시 파싱하지 않음).
+#
+# 줄 규칙 (송장발부 결과의 "N. 문구=> 수량 ea" 줄, invoice_consolidate.format_lines 참고)
+# - "숫자." 로 시작하는 줄만 (앞뒤 공백 제거 후). 합계 머리줄/줄임 표시(".", "^_~")는 제외
+# - 네이버: "숫자." 뒤에서 "/ 각인체" 앞까지, 없으면 "=>" 앞까지
+# - 쿠팡  : 첫 ":" 뒤에서 (없으면 줄 전체) "=>" 앞까지
+# - 앞뒤 공백을 뗀 문구가 비어 있으면 제외
+# - qty: "=> 2 ea" 의 수량 (없으면 NA)
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+NAVER_INVOICE = "네이버 송장"
+
+LINES_COLUMNS = ["row", "line_no", "text", "qty"]
+
+# str.splitlines() 와 같은 줄바꿈 문자들
+_LINE_BREAKS = r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85  ]"
+_NUMBERED = r"^\d+\."
+_QTY = r"=>\s*(\d+)\s*ea"
+
+
+def _cells_as_text(cells: pd.Series) -> pd.Series:
+    """칸 값 → 글자 (빈 칸은 "", 나머지는 str())"""
+    cells = cells.reset_index(drop=True)
+    return cells.where(cells.notna(), "").astype(str)
+
+
+def _line_core(lines: pd.Series, invoice_type: str) -> pd.Series:
+    """"숫자." 로 시작하는(공백 제거된) 줄들 → 문구 부분"""
+    if invoice_type == NAVER_INVOICE:
+        body = lines.str.replace(_NUMBERED, "", n=1, regex=True).str.lstrip()
+        has_font = body.str.contains("/ 각인체", regex=False)
+        before_font = body.str.split("/ 각인체", n=1, regex=False).str[0]
+        before_arrow = body.str.split("=>", n=1, regex=False).str[0]
+        core = before_font.where(has_font, before_arrow)
+    else:
+        has_colon = lines.str.contains(":", regex=False)
+        right = lines.str.split(":", n=1, regex=False).str[1].where(has_colon, lines)
+        core = right.str.split("=>", n=1, regex=False).str[0]
+    return core.str.strip()
+
+
+def parse_lines(cells: pd.Series, invoice_type: str) -> pd.DataFrame:
+    """
+    품목명/상품명 컬럼 전체 → 줄 단위 표 (row 는 cells 안의 위치, 0부터 / line_no 는 칸 안의 순서, 0부터).
+    row, line_no 순으로 정렬되어 있다.
+    """
+    text = _cells_as_text(cells)
+    exploded = text.str.split(_LINE_BREAKS, regex=True).explode()
+    lines = exploded.str.strip()
+    lines = lines[lines.str.match(_NUMBERED)]
+    if lines.empty:
+        return pd.DataFrame({
+            "row": pd.Series(dtype="int64"),
+            "line_no": pd.Series(dtype="int64"),
+            "text": pd.Series(dtype=object),
+            "qty": pd.Series(dtype="Int64"),
+        })
+
+    core = _line_core(lines, invoice_type)
+    keep = core != ""
+    lines, core = lines[keep], core[keep]
+    qty = pd.to_numeric(lines.str.extract(_QTY, expand=False), errors="coerce").astype("Int64")
+
+    rows = lines.index.to_numpy(dtype="int64")
+    table = pd.DataFrame({"row": rows, "text": core.to_numpy(dtype=object), "qty": qty.to_numpy()})
+    table.insert(1, "line_no", table.groupby("row").cumcount().to_numpy(dtype="int64"))
+    return table
+
+
+def parse_cell(cell_text: str, invoice_type: str) -> List[str]:
+    """칸 하나의 문구 목록 (페이지 모드처럼 줄 표가 없을 때)."""
+    return parse_lines(pd.Series([cell_text], dtype=object), invoice_type)["text"].tolist()
+
+
+class EngravingLines:
+    """
+    엑셀 한 장의 줄 표 + 행별 조회.
+    for_row() 는 row 로 정렬된 표에서 searchsorted 로 범위만 찾는다 (행마다 다시 파싱하지 않음).
+    """
+
+    def __init__(self, table: pd.DataFrame, n_rows: int):
+        self.table = table
+        self.n_rows = n_rows
+        self._rows = table["row"].to_numpy(dtype="int64")
+        self._texts = table["text"].to_numpy(dtype=object)
+
+    @classmethod
+    def parse(cls, cells: pd.Series, invoice_type: str) -> "EngravingLines":
+        return cls(parse_lines(cells, invoice_type), len(cells))
+
+    def counts(self) -> np.ndarray:
+        """행별 문구 수 (문구개수 컬럼)"""
+        return np.bincount(self._rows, minlength=self.n_rows).astype("int64")
+
+    def for_row(self, row: int) -> List[str]:
+        lo = np.searchsorted(self._rows, row, side="left")
+        hi = np.searchsorted(self._rows, row, side="right")
+        return list(self._texts[lo:hi])
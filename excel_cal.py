@@ -0,0 +1,303 @@
+# excel_cal.py
+# 명령줄(헤드리스) 실행: PyQt5 없이 네이버/쿠팡 다운로드 엑셀 → 송장발부/발송처리 일괄 변환
+#
+# 사용 예)
+#   python -m excel_cal consolidate --channel naver --password 1111 C:/down/네이버 --out C:/my_games/excel_result/batch
+#   python -m excel_cal consolidate --channel coupang --jobs 4 쿠팡1.xlsx 쿠팡2.xlsx --out ./out
+#   python -m excel_cal consolidate --channel naver --stream 시즌전체.xlsx --out ./out   (수십만 행, 메모리 일정)
+#   python -m excel_cal consolidate --channel naver --workers 4 시즌전체.xlsx --out ./out  (한 파일 묶음을 여러 코어로)
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Dict
+
+from decrypt_cache import get_default_cache, set_cache_enabled
+from excel_readers import AUTO, BACKENDS, set_default_backend
+from frame_cache import get_frame_cache, set_frame_cache_enabled
+from invoice_consolidate import CHANNELS, consolidate_sharded, write_result
+from invoice_io import peak_memory, read_channel_excel
+from invoice_stream import stream_consolidate
+from order_history import OrderHistory
+from processed_index import ProcessedIndex
+
+
+EXCEL_SUFFIXES = (".xlsx", ".xls", ".csv", ".tsv")
+
+
+@dataclass
+class FileReport:
+    path: str
+    rows: int = 0
+    groups: int = 0
+    repeat_buyers: int = 0
+    skipped: int = 0                 # 전에 변환해서 건너뛴 행 수
+    timings: Optional[Dict[str, float]] = None
+    outputs: Optional[Dict[str, str]] = None
+    error: str = ""
+    cache_hit: bool = False          # 복호화 캐시 적중 여부 (네이버)
+    cache_saved: float = 0.0         # 캐시로 아낀 복호화 시간(초)
+    frame_hit: bool = False          # 읽기 캐시 적중 여부 (엑셀 파싱 생략)
+    frame_saved: float = 0.0         # 읽기 캐시로 아낀 파싱 시간(초)
+    read_peak_mb: Optional[float] = None   # 읽기 단계 파이썬 힙 최고치 (--mem 일 때만, --stream 이면 전체)
+    read_rss_mb: Optional[float] = None    # 같은 구간 프로세스 RSS 최고치 (mmap/복호화 버퍼 포함, 못 재면 None)
+
+    @property
+    def total_time(self) -> float:
+        return sum((self.timings or {}).values())
+
+
+# ---------------------------------------------------------------------------
+# 파일 1개 처리 (프로세스 풀에서도 그대로 호출되므로 모듈 최상위 함수)
+# ---------------------------------------------------------------------------
+
+def process_file(
+    channel: str,
+    path: str,
+    password: Optional[str],
+    out_dir: str,
+    decrypt_cache: bool = True,
+    measure_memory: bool = False,
+    sheet_workers: Optional[int] = None,
+    order_history: bool = True,
+    skip_processed: bool = True,
+    stream: bool = False,
+    workers: int = 1,
+    frame_cache: bool = True,
+    reader: str = AUTO,
+) -> FileReport:
+    spec = CHANNELS[channel]
+    report = FileReport(path=path)
+    set_default_backend(reader)
+    set_cache_enabled(decrypt_cache)
+    cache = get_default_cache()
+    hits_before = cache.hits if cache else 0
+    saved_before = cache.saved_seconds if cache else 0.0
+    set_frame_cache_enabled(frame_cache)
+    fcache = get_frame_cache()
+    frame_hits_before = fcache.hits if fcache else 0
+    frame_saved_before = fcache.saved_seconds if fcache else 0.0
+    if stream:
+        _process_stream(report, spec, password, out_dir, measure_memory, order_history, skip_processed)
+        if cache is not None:
+            report.cache_hit = cache.hits > hits_before
+            report.cache_saved = cache.saved_seconds - saved_before
+        return report
+    try:
+        t0 = time.perf_counter()
+        if measure_memory:
+            with peak_memory() as mem:
+                df = read_channel_excel(spec, path, password, sheet_workers)
+            report.read_peak_mb = mem.peak_mb
+            report.read_rss_mb = mem.rss_peak_mb
+        else:
+            df = read_channel_excel(spec, path, password, sheet_workers)
+        read_time = time.perf_counter() - t0
+        if skip_processed:
+            with ProcessedIndex() as processed:
+                df, report.skipped = processed.split_new(spec, df)
+        if cache is not None:
+            report.cache_hit = cache.hits > hits_before
+            report.cache_saved = cache.saved_seconds - saved_before
+        if fcache is not None:
+            report.frame_hit = fcache.hits > frame_hits_before
+            report.frame_saved = fcache.saved_seconds - frame_saved_before
+
+        if order_history:
+            with OrderHistory() as history:
+                result = consolidate_sharded(df, spec, workers, history=history)
+        else:
+            result = consolidate_sharded(df, spec, workers)
+        result.timings = {"읽기": read_time, **result.timings}
+
+        # 여러 파일을 한 번에 돌리므로 원본 파일명을 결과 파일명 앞에 붙인다.
+        report.outputs = {}
+        if result.rows:
+            report.outputs = write_result(result, spec, out_dir, f"{Path(path).stem}_")
+            if skip_processed:
+                with ProcessedIndex() as processed:
+                    processed.mark_processed(spec, df)
+        report.rows = result.rows
+        report.groups = result.groups
+        report.repeat_buyers = result.repeat_buyers
+        report.timings = result.timings
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+    return report
+
+
+def _process_stream(report: FileReport, spec, password: Optional[str], out_dir: str,
+                    measure_memory: bool, order_history: bool, skip_processed: bool) -> None:
+    """--stream: 조각 단위로 읽고 변환해서 바로 저장 (invoice_stream)"""
+    history = OrderHistory() if order_history else None
+    processed = ProcessedIndex() if skip_processed else None
+    try:
+        stamp = f"{Path(report.path).stem}_"
+        if measure_memory:
+            with peak_memory() as mem:
+                result = stream_consolidate(spec, report.path, out_dir, stamp, password, history, processed)
+            report.read_peak_mb = mem.peak_mb
+            report.read_rss_mb = mem.rss_peak_mb
+        else:
+            result = stream_consolidate(spec, report.path, out_dir, stamp, password, history, processed)
+        report.outputs = result.paths
+        report.rows = result.rows
+        report.skipped = result.skipped_rows
+        report.groups = result.groups
+        report.repeat_buyers = result.repeat_buyers
+        report.timings = result.timings
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+    finally:
+        for store in (history, processed):
+            if store is not None:
+                store.close()
+
+
+def collect_inputs(inputs: List[str]) -> List[str]:
+    """파일/폴더 인자를 엑셀 파일 목록으로 펼친다. (폴더는 바로 아래 파일만, 엑셀 임시파일 ~$ 제외)"""
+    files: List[str] = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            for child in sorted(p.iterdir()):
+                if child.suffix.lower() in EXCEL_SUFFIXES and not child.name.startswith("~$"):
+                    files.append(str(child))
+        elif p.is_file():
+            files.append(str(p))
+        else:
+            print(f"[경고] 파일/폴더를 찾을 수 없습니다: {item}", file=sys.stderr)
+    return files
+
+
+# ---------------------------------------------------------------------------
+# 요약 출력
+# ---------------------------------------------------------------------------
+
+def print_summary(reports: List[FileReport], elapsed: float) -> None:
+    print()
+    print(
+        f"{'파일':<40}{'새 행':>9}{'건너뜀':>9}{'묶음':>8}{'읽기(s)':>10}{'변환(s)':>10}{'저장(s)':>10}"
+        f"{'합계(s)':>10}  상태"
+    )
+    for r in reports:
+        name = os.path.basename(r.path)
+        if r.error:
+            print(f"{name:<40}{'-':>9}{'-':>9}{'-':>8}{'-':>10}{'-':>10}{'-':>10}{'-':>10}  실패: {r.error}")
+            continue
+        t = r.timings or {}
+        convert = sum(v for k, v in t.items() if k not in ("읽기", "저장"))
+        print(
+            f"{name:<40}{r.rows:>9,}{r.skipped:>9,}{r.groups:>8,}{t.get('읽기', 0):>10.2f}{convert:>10.2f}"
+            f"{t.get('저장', 0):>10.2f}{r.total_time:>10.2f}  {'OK' if r.outputs else '새 주문 없음'}"
+        )
+    ok = [r for r in reports if not r.error]
+    measured = [r for r in ok if r.read_peak_mb is not None]
+    if measured:
+        print("\n읽기 단계 최대 메모리 (--stream 이면 변환 전체, 시작 시점 대비 증가분):")
+        print(f"  {'파일':<40}{'파이썬 힙':>12}{'프로세스 RSS':>14}")
+        for r in measured:
+            rss = f"{r.read_rss_mb:>11.1f} MB" if r.read_rss_mb is not None else f"{'-':>14}"
+            print(f"  {os.path.basename(r.path):<40}{r.read_peak_mb:>9.1f} MB{rss}")
+    repeat = sum(r.repeat_buyers for r in ok)
+    if repeat:
+        print(f"\n재구매 고객(최근 1년 2건 이상): {repeat:,}건")
+    hits = [r for r in reports if r.cache_hit]
+    if hits:
+        print(f"\n복호화 캐시: {len(hits)}/{len(reports)}개 파일 적중, 절약 {sum(r.cache_saved for r in hits):.2f}초")
+    frame_hits = [r for r in reports if r.frame_hit]
+    if frame_hits:
+        print(f"읽기 캐시: {len(frame_hits)}/{len(reports)}개 파일 적중, "
+              f"절약 {sum(r.frame_saved for r in frame_hits):.2f}초")
+    print(
+        f"\n총 {len(reports)}개 파일 (성공 {len(ok)}, 실패 {len(reports) - len(ok)}), "
+        f"{sum(r.rows for r in ok):,}행 → {sum(r.groups for r in ok):,}건 "
+        f"(건너뜀 {sum(r.skipped for r in ok):,}행), 경과 {elapsed:.2f}초"
+    )
+
+
+# ---------------------------------------------------------------------------
+# consolidate 명령
+# ---------------------------------------------------------------------------
+
+def cmd_consolidate(args: argparse.Namespace) -> int:
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("[오류] 처리할 엑셀 파일이 없습니다.", file=sys.stderr)
+        return 2
+
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    reports: List[FileReport] = []
+    use_cache = not args.no_decrypt_cache
+    parallel_files = args.jobs > 1 and len(files) > 1
+    # 파일 단위로 이미 나눠 돌릴 때는 시트까지 또 나누면 프로세스가 너무 많아지므로 시트는 순서대로
+    sheet_workers = 1 if parallel_files else None
+    job_args = (
+        args.password, out_dir, use_cache, args.mem, sheet_workers, not args.no_history, not args.reprocess,
+        args.stream, 1 if parallel_files else args.workers, not args.no_frame_cache, args.reader,
+    )
+    if parallel_files:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [
+                pool.submit(process_file, args.channel, f, *job_args) for f in files
+            ]
+            for fut in futures:
+                reports.append(fut.result())
+                print(f"  완료: {os.path.basename(reports[-1].path)}")
+    else:
+        for f in files:
+            reports.append(process_file(args.channel, f, *job_args))
+            print(f"  완료: {os.path.basename(f)}")
+
+    print_summary(reports, time.perf_counter() - t0)
+    return 1 if any(r.error for r in reports) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="excel_cal", description="하비 브라운 엑셀 도구 (명령줄)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("consolidate", help="네이버/쿠팡 주문 엑셀 → 송장발부/발송처리 일괄 변환")
+    p.add_argument("--channel", required=True, choices=sorted(CHANNELS), help="naver 또는 coupang")
+    p.add_argument("--password", default=None, help="네이버 엑셀 비밀번호 (기본 1111, 쿠팡은 무시)")
+    p.add_argument("--out", required=True, help="결과 엑셀 저장 폴더")
+    p.add_argument("--no-decrypt-cache", action="store_true",
+                   help="복호화 캐시를 쓰지 않음 (매번 비밀번호 복호화)")
+    p.add_argument("--no-frame-cache", action="store_true",
+                   help="읽기 캐시를 쓰지 않음 (매번 엑셀을 새로 파싱)")
+    p.add_argument("--reader", default=AUTO, choices=[AUTO, *BACKENDS],
+                   help="엑셀 읽기 백엔드 (기본 auto: .csv/.tsv → csv, 엑셀 → calamine 이 설치되어 있으면 calamine, "
+                        "없으면 openpyxl)")
+    p.add_argument("--no-history", action="store_true",
+                   help="주문 이력(1년 주문건수 계산용)에 기록하지 않음")
+    p.add_argument("--reprocess", action="store_true",
+                   help="전에 변환한 주문도 건너뛰지 않고 모두 다시 변환")
+    p.add_argument("--stream", action="store_true",
+                   help="아주 큰 엑셀: 한 번에 읽지 않고 조각 단위로 읽고 변환해서 바로 저장 (메모리 일정)")
+    p.add_argument("--mem", action="store_true",
+                   help="파일별 읽기 단계 최대 메모리(MB, 파이썬 힙 / 프로세스 RSS)를 측정해서 요약에 표시 "
+                        "(측정 중에는 느려짐, RSS 는 psutil 이 있거나 리눅스일 때)")
+    p.add_argument("--jobs", type=int, default=1, help="동시에 처리할 파일 수 (프로세스 풀, 기본 1). "
+                        "동시에 도는 파일끼리는 겹치는 주문을 서로 건너뛰지 못함")
+    p.add_argument("--workers", type=int, default=1,
+                   help="한 파일의 묶음 작업을 나눌 프로세스 수 (출고번호 기준, 기본 1). "
+                        "--jobs 로 여러 파일을 동시에 돌릴 때와 --stream 에서는 무시")
+    p.add_argument("inputs", nargs="+", help="주문 엑셀 파일 또는 폴더")
+    p.set_defaults(func=cmd_consolidate)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,19 +4,30 @@
 import os
 import pandas as pd  # pandas 추가
 from datetime import datetime # 날짜용 추가
-import msoffcrypto
 
-import io
 from PyQt5.QtWidgets import QFileDialog # 파일 탐색기
-from PyQt5.QtTest import QTest # 대기(wait)용
 
+import multiprocessing
 import sys
 import re
+import time
 from pathlib import Path
-from typing import List
+from typing import List, Callable
 
 from PyQt5 import QtWidgets, QtCore
 
+from invoice_consolidate import (
+    ChannelSpec,
+    ConsolidateResult,
+    ConsolidateCancelled,
+    NAVER,
+    COUPANG,
+    consolidate,
+    write_result,
+)
+from invoice_io import read_password_excel, read_non_password_excel, NAVER_DEFAULT_PASSWORD
+from order_history import OrderHistory
+from processed_index import ProcessedIndex
 from vat_excel_tool import (
     TradeInfo,
     LineItemInput,
@@ -36,6 +47,79 @@ from vat_excel_tool import (
         # pyinstaller --hidden-import PyQt5 --hidden-import pyserial --hidden-import requests --hidden-import chardet --add-data="C:\\my_games\\game_folder\\data_game;./data_game" --name game_folder -i="game_folder_macro.ico" --add-data="game_folder_macro.ico;./" --icon="game_folder_macro.ico" --paths "C:\Users\1_S_3\AppData\Local\Programs\Python\Python311\Lib\site-packages\cv2" main.py
 
 
+class ConsolidateWorker(QtCore.QThread):
+    """
+    네이버/쿠팡 송장 변환(읽기 → 출고번호 묶기 → 저장)을 GUI 스레드 밖에서 실행.
+    - progress(묶음 완료, 전체 묶음, 초당 처리 행)
+    - cancel() 하면 다음 진행률 체크 시점에 멈추고 cancelled 시그널
+    - 끝나면 done(ConsolidateResult, 저장 경로 dict), result.timings 에 단계별 시간
+    - skip_processed 면 전에 변환한 주문은 건너뛰고 새 주문만 변환 (새 주문이 없으면 저장 경로 dict 가 빈 dict)
+    """
+    progress = QtCore.pyqtSignal(int, int, float)
+    done = QtCore.pyqtSignal(object, dict)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, spec: ChannelSpec, load: Callable[[], pd.DataFrame], out_dir: str, stamp: str,
+                 skip_processed: bool = True, parent=None):
+        super().__init__(parent)
+        self.spec = spec
+        self.load = load
+        self.out_dir = out_dir
+        self.stamp = stamp
+        self.skip_processed = skip_processed
+        self._cancel = False
+        self._t_start = 0.0
+
+    def cancel(self):
+        self._cancel = True
+
+    def _is_cancelled(self) -> bool:
+        return self._cancel
+
+    def _on_progress(self, done: int, total: int, rows_done: int):
+        elapsed = time.perf_counter() - self._t_start
+        self.progress.emit(done, total, rows_done / elapsed if elapsed > 0 else 0.0)
+
+    def run(self):
+        # sqlite 연결은 만든 스레드에서만 쓸 수 있으므로 작업 스레드 안에서 연다.
+        processed = ProcessedIndex() if self.skip_processed else None
+        try:
+            t0 = time.perf_counter()
+            df = self.load()
+            skipped = 0
+            if processed is not None:
+                df, skipped = processed.split_new(self.spec, df)
+            read_time = time.perf_counter() - t0
+            if self._cancel:
+                raise ConsolidateCancelled()
+
+            self._t_start = time.perf_counter()
+            with OrderHistory() as history:
+                result = consolidate(df, self.spec, progress=self._on_progress,
+                                     is_cancelled=self._is_cancelled, history=history)
+            result.timings = {"읽기": read_time, **result.timings}
+            result.skipped_rows = skipped
+
+            if self._cancel:
+                raise ConsolidateCancelled()
+            paths = {}
+            if result.rows:
+                paths = write_result(result, self.spec, self.out_dir, self.stamp)
+                if processed is not None:
+                    processed.mark_processed(self.spec, df)
+
+        except ConsolidateCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(f"[{self.spec.label}] 송장 변환 실패: {e}")
+        else:
+            self.done.emit(result, paths)
+        finally:
+            if processed is not None:
+                processed.close()
+
+
 class ExcelCalWindow(QtWidgets.QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -45,6 +129,10 @@ class ExcelCalWindow(QtWidgets.QMainWindow):
 
         self.df_list = None
 
+        # 송장 변환 백그라운드 작업
+        self._worker = None
+        self._progress_dlg = None
+
         self._last_items_computed = None  # (더 이상 사용 안 함)
 
         central = QtWidgets.QWidget(self)
@@ -227,6 +315,10 @@ class ExcelCalWindow(QtWidgets.QMainWindow):
         self.btn_make_statement = QtWidgets.QPushButton("거래명세표만 생성")
         bottom_layout.addWidget(self.btn_naver)
         bottom_layout.addWidget(self.btn_coopang)
+        self.chk_skip_processed = QtWidgets.QCheckBox("이미 변환한 주문 건너뛰기")
+        self.chk_skip_processed.setChecked(True)
+        self.chk_skip_processed.setToolTip("전에 송장발부로 만든 주문(네이버 상품주문번호 / 쿠팡 묶음배송번호)은 빼고 새 주문만 변환합니다.")
+        bottom_layout.addWidget(self.chk_skip_processed)
         bottom_layout.addWidget(self.btn_make_all)
         bottom_layout.addWidget(self.btn_make_quote)
         bottom_layout.addWidget(self.btn_make_delivery)
@@ -489,859 +581,128 @@ class ExcelCalWindow(QtWidgets.QMainWindow):
     # 네이버, 쿠팡
 
     def my_naver(self):
-
-
-        try:
-            # x = Test_check(self)
-            # # self.mytestin.setText("GootEvening")
-            # # self.mytestin.setDisabled(True)
-            # x.start()
-
-            a = '수취인명'
-            aa = "받으시는 분"
-
-            b = '수취인연락처1'
-            bb = '받으시는 분 전화'
-            c = '수취인연락처2'
-            cc = '받는분핸드폰'
-            d = '상품명'
-            dd = '품목명'
-            e = '수량'
-            ee = '수량'
-            f = '배송메세지'
-            ff = '특기사항'
-            g = '옵션정보'
-            gg = '메모1'
-            h = '기본배송지'
-            hh = '기본배송지'
-            i = '상세배송지'
-            ii = '상세배송지'
-            j = '우편번호'
-            jj = '받는분우편번호'
-            k = '구매자명'
-            kk = '구매자명'
-            l = '구매자연락처'
-            ll = '구매자연락처'
-            m = '주문번호'
-            mm = '출고번호'
-            n = '상품주문번호'
-            nn = '상품주문번호'
-            buy_time = '주문일시'
-
-            ###################
-            o = ''
-            oo = '운임Type'
-            p = ''
-            pp = '지불조건'
-            ###################
-
-            q = '1년 주문건수'
-            qq = '1년 주문건수'
-
-            ##################
-
-            r = '배송방법'
-            s = '택배사'
-            t = '송장번호'
-
-            ############ 추가
-
-            gagin = "각인"
-
-            ##############엑셀
-            file_path, ext = QFileDialog.getOpenFileName(self, '파일 열기', os.getcwd(), 'excel file (*.xls *.xlsx)')
-            if file_path:
-
-                print("file_path", file_path)
-
-                self.df_list = self.get_df_from_password_excel(file_path, "1111")
-
-                print("결과???", self.df_list)
-
-                # self.df_list = self.loadData(file_path)[0]
-
-                print(self.df_list)
-
-                # self.df_list.insert(2, c, "s")
-                data_o = "s"
-                self.df_list[str(oo)] = data_o
-                data_p = "신용"
-                self.df_list[str(pp)] = data_p
-
-                data_s = "한진택배"
-                self.df_list[str(s)] = data_s
-
-                print(self.df_list)
-
-                self.df_list.rename(
-                    columns={a: aa, b: bb, c: cc, d: dd, f: ff, q: qq, g: gg, j: jj, k: kk, l: ll, m: mm, n: nn},
-                    inplace=True)
-                print("재정비")
-
-                self.df_list[gagin] = ""
-
-                print(self.df_list)
-
-                print("원하는 열 나열하기1")
-                columns_list = self.df_list[[aa, bb, cc, dd, ee, ff, qq, gg, hh, ii, jj, kk, ll, mm, nn, oo, pp, gagin,
-                                             buy_time]].values.tolist()
-
-                print("원하는 열 나열하기2")
-                print(columns_list)
-                #
-
-                # 출고번호(m)에서 동일한거 묶고
-
-                # 메모1(g)과 수량(e)를 품목명(d)에 다시 수정한다.
-
-                print("특정 열 나열하기")
-                columns_list_m = self.df_list[mm].values.tolist()
-                print(columns_list_m)
-                print("[[특정 열 중복제거]]")
-                result_set_1 = set(columns_list_m)
-                print("특정 열 중복제거 준비", result_set_1)
-                result_set_1_len = len(result_set_1)
-
-                result_set_2 = list(result_set_1)
-                print("특정 열 중복제거 완료", result_set_2)
-                result_set_2_len = len(result_set_2)
-                #
-
-                ############
-                # # data_list의 데이터를 데이터프레임으로 변환
-                # data = [row.split(":") for row in new_list]
-                # df = pd.DataFrame(data, columns=["사용자", "게임", "서버", "다이아", "골드", "컴퓨터번호"])
-                #############
-
-                # 엑셀 저장 날짜 및 시간을 엑셀 파일명으로...
-                nowDay_ = datetime.today().strftime("%Y%m%d%H%M%S")
-                year = datetime.today().strftime("%Y")
-                month = datetime.today().strftime("%m")
-                day = datetime.today().strftime("%d")
-                hour = datetime.today().strftime("%H")
-                minute = datetime.today().strftime("%M")
-                last = str(day) + "d_" + str(hour) + "h" + str(minute) + "m"
-                nowDay = str(nowDay_)
-
-                ################ 네이버 송장 발부 #############
-                df = pd.DataFrame(columns_list,
-                                  columns=[aa, bb, cc, dd, ee, ff, qq, gg, hh, ii, jj, kk, ll, mm, nn, oo, pp, gagin,
-                                           buy_time])
-                dir_path = "C:/my_games/excel_result/" + str(year) + "/" + str(month) + "/"
-                if not os.path.isdir(dir_path):
-                    os.makedirs(dir_path)
-
-                temporary_data = pd.DataFrame(
-                    columns=[aa, bb, cc, dd, ee, ff, qq, gg, hh, ii, jj, kk, ll, mm, nn, oo, pp])
-
-                # 네이버 송장발부용
-                new_data = pd.DataFrame(
-                    columns=[aa, bb, cc, dd, ee, ff, qq, gg, hh, ii, jj, kk, ll, mm, nn, oo, pp, gagin, buy_time])
-
-                # dd 품목명, ee 수량, gg 메모1
-                print("new_data 1", new_data)
-                for set_2 in range(result_set_2_len):
-
-                    # 출고번호로 검색한 것...
-                    result = df[df[mm] == result_set_2[set_2]]
-                    print("???", result)
-                    print("???", result.index)
-                    # print("???", result.index[0])
-                    print("???gg", result[gg])
-                    # print("???gg[0]", result[gg][result.index[0]])
-                    # print("???", len(result.index))
-                    QTest.qWait(100)
-                    # 검색된 것을 임시로 저장하기
-
-                    print("뽑기전 temporary_data", temporary_data)
-
-                    if len(temporary_data) == 0:
-                        print("전체저장")
-                        temporary_data = pd.concat([temporary_data, result])
-                    else:
-                        print("삭제 후 저장")
-                        temporary_data = temporary_data.drop(temporary_data.index[:len(temporary_data)])
-                        temporary_data = pd.concat([temporary_data, result])
-                    print("뽑아낸 temporary_data", temporary_data)
-
-                    total_ = 0
-
-                    # 뽑아낸 주문번호의 중복갯수로 다시 반복문 돌려서 작업하기
-                    for set_index in range(len(result.index)):
-                        print("여기인가 1")
-                        ###############
-
-                        # 해당문구 추출하여 갯수파악하고 바로 수량 적어놓기
-                        # 해당문구가 품목명에 있을 경우 pass 하기기
-                        # df['col_name'].str.contains("여기에문구...")
-
-                        ################
-                        # 'gg' 문구 갯수 파악
-                        # many = temporary_data[temporary_data[gg] == temporary_data[gg][result.index[set_index]]]
-                        # print("how many???", len(many.index))
-
-                        # print("set_index", set_index)
-                        # print("set_index?", result.index[set_index])
-                        add_write = "=> " + str(result[ee][result.index[set_index]]) + " ea"
-
-                        write_num = set_index + 1
-                        result_write_num = str(write_num) + ". "
-
-                        if set_index == 0:
-                            # print("여기인가 2")
-                            # print("여기인가 2", df.loc[result.index[set_index], gg])
-                            # print("여기인가 2", str(add_write))
-                            # test = df.loc[result.index[set_index], gg] + str(add_write)
-                            # print("add_write", add_write)
-                            # print("test", test)
-
-                            # print("df.loc[result.index[set_index], gg]", df.loc[result.index[set_index], gg])
-                            if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                # if len(df.loc[result.index[set_index], gg]) == 0:
-                                df.loc[result.index[set_index], dd] = result_write_num + df.loc[
-                                    result.index[set_index], dd] + str(add_write)
-
-                                df.loc[result.index[set_index], gagin] = result_write_num + df.loc[
-                                    result.index[set_index], dd] + str(add_write)
-                            else:
-
-                                write_memo = str(df.loc[result.index[set_index], gg]).replace("여기에 문구:", "")
-                                write_memo = str(write_memo).replace("여기에 각인 문구:", "")
-                                df.loc[result.index[set_index], dd] = result_write_num + write_memo + str(add_write)
-
-                                df.loc[result.index[set_index], gagin] = result_write_num + write_memo + str(add_write)
-
-                            df_2 = df.iloc[result.index[0]]
-                            print("set_index == 0", df_2)
-                            new_data.loc[len(new_data)] = df_2
-
-                            # new_data.loc[set_2, dd] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg]
-
-                        else:
-
-                            print("수정 및 추가하기1", new_data)
-                            print("수정 및 추가하기2", result.index[set_index])
-
-                            # [송장발부]마지막으로 같은 문구 갯수 파악하기
-                            result_memo = new_data[new_data[dd] == result.loc[result.index[set_index], gg]] + add_write
-
-                            print("수정 및 추가하기3", result_memo)
-                            print("수정 및 추가하기4", df.loc[result.index[set_index], gg])
-
-                            if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                print("this is nan")
-
-                            if len(result_memo.index) == 0:
-                                print("없당.", result_memo[gg])
-                                if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                    new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + result_write_num + \
-                                                              df.loc[result.index[set_index], dd] + add_write
-                                    new_data.loc[set_2, gagin] = new_data.loc[set_2, gagin] + "\n" + result_write_num + \
-                                                                 df.loc[result.index[set_index], dd] + add_write
-                                else:
-
-                                    write_memo = str(df.loc[result.index[set_index], gg]).replace("여기에 문구:", "")
-                                    write_memo = str(write_memo).replace("여기에 각인 문구:", "")
-
-                                    new_data.loc[set_2, dd] = new_data.loc[
-                                                                  set_2, dd] + "\n" + result_write_num + write_memo + add_write
-                                    new_data.loc[set_2, gagin] = new_data.loc[
-                                                                     set_2, gagin] + "\n" + result_write_num + write_memo + add_write
-                            else:
-                                print("송장발부는 이미 있다..", result_memo[gg])
-
-                            # # 마지막으로 같은 문구 갯수 파악하기
-                            # result_memo = df[df[gg] == df.loc[result.index[set_index], gg]]
-                            #
-                            # if len(result_memo.index) == 1:
-                            #     new_data.loc[set_2, dd] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg] + "=> " + str(len(result_memo.index)) +"개"
-                            # else:
-                            #     print("g")
-                            # new_data.loc[set_2, gg] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg]
-
-                        # print("new_data for", new_data)
-                        # print("new_data for2", new_data[dd])
-
-                        # total 갯수 구하기 및 1년 주문건수
-
-                        title_display_count = 11
-                        print("total_total_total_total_total_total_", result[ee][result.index[set_index]])
-                        total_ += int(result[ee][result.index[set_index]])
-                        print("total_", total_)
-                        if len(result.index) - 1 == set_index:
-
-                            # 몇개 표시할지...
-
-                            # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                            new_data.loc[set_2, gagin] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                         new_data.loc[set_2, dd]
-
-                            # 1년 주문건수
-                            # if new_data.loc[set_2, qq] > 0:
-                            new_data.loc[set_2, gagin] = "1년 주문건수 : " + str(new_data.loc[set_2, qq]) + "건" + "\n" + \
-                                                         new_data.loc[set_2, gagin]
-
-                            if '\n' in new_data.loc[set_2, dd]:
-
-                                result_split = new_data.loc[set_2, dd].split('\n')
-                                print("new_data.loc[set_2, dd].split('\n')", result_split)
-
-                                if len(result_split) < title_display_count + 1:
-                                    new_data.loc[set_2, dd] = new_data.loc[set_2, dd]
-                                    new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                              new_data.loc[
-                                                                  set_2, dd]
-                                else:
-
-                                    for w in range(title_display_count):
-                                        if w == 0:
-
-                                            new_data.loc[set_2, dd] = result_split[w]
-                                        elif w < title_display_count - 3:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + result_split[w]
-                                        elif w == title_display_count - 1:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + str("^_~")
-                                        else:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + str(".")
-                                    # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                                    new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                              new_data.loc[set_2, dd]
-                            else:
-                                # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                                new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                          new_data.loc[set_2, dd]
-                                # print("new_data 2", new_data)
-
-                # print("new_data 3", len(new_data))
-
-                # 수량 1로 바꾸기
-                for many in range(len(new_data)):
-                    new_data.loc[many, ee] = 1
-                # 메모1 빼고 '1년 구매건수'로 바꾸기
-                new_data = pd.DataFrame(new_data,
-                                        columns=[aa, bb, cc, dd, ee, ff, qq, hh, ii, jj, kk, ll, mm, nn, oo, pp, gagin,
-                                                 buy_time])
-
-                #################################################
-                #################################################
-                #################################################
-                print("발송처리 부분")
-
-                # data_s = "한진택배"
-                # self.df_list[str(s)] = data_s
-
-                # get_name = "받으시는 분"
-                # billing_number = "운송장번호"
-                # df_send = pd.DataFrame(columns_list, columns=[nn, r, s, t, a, "비고", mm, get_name, billing_number])
-                self.df_list.rename(
-                    columns={aa: a},
-                    inplace=True)
-                print("재정비")
-                print(self.df_list)
-
-                print("발송처리 : 원하는 열 나열하기1")
-                columns_list = self.df_list[
-                    [nn, r, s, t, a, mm]].values.tolist()
-                print("발송처리 : 원하는 열 나열하기2")
-                print(columns_list)
-                #
-
-                # 출고번호(m)에서 동일한거 묶고
-
-                # 메모1(g)과 수량(e)를 품목명(d)에 다시 수정한다.
-
-                print("특정 열 나열하기")
-                columns_list_m = self.df_list[mm].values.tolist()
-                print(columns_list_m)
-                print("[[특정 열 중복제거]]")
-                result_set_1 = set(columns_list_m)
-                print("특정 열 중복제거 준비", result_set_1)
-                result_set_1_len = len(result_set_1)
-
-                result_set_2 = list(result_set_1)
-                print("특정 열 중복제거 완료", result_set_2)
-                result_set_2_len = len(result_set_2)
-
-                ################ 발송 처리 #############
-
-                df_send = pd.DataFrame(columns_list, columns=[nn, r, s, t, a, mm])
-
-                # 발송처리용
-
-                get_name = "출고번호넣기"
-                billing_number = "운송장번호"
-
-                send_data = pd.DataFrame(columns=[nn, r, s, t, a, "비고", mm, get_name, billing_number])
-
-                # dd 품목명, ee 수량, gg 메모1
-                for set_2 in range(result_set_2_len):
-
-                    # 출고번호로 검색한 것...
-                    result = df_send[df_send[mm] == result_set_2[set_2]]
-                    QTest.qWait(100)
-                    # 검색된 것을 임시로 저장하기
-
-                    # 뽑아낸 주문번호의 중복갯수로 다시 반복문 돌려서 작업하기
-                    for set_index in range(len(result.index)):
-                        df_send_result = df_send.iloc[result.index[set_index]]
-                        send_data.loc[len(send_data)] = df_send_result
-
-                ###################################################
-                ###################################################
-                ##################################################
-                new_data.astype(str)
-                send_data.astype(str)
-
-                # 데이터프레임을 엑셀 파일로 저장
-                excel_file_name = dir_path + last + "네이버_송장발부.xlsx"
-                # df.to_excel(excel_file_name, index=False)
-                # writer_1 = pd.ExcelWriter(excel_file_name, options={'strings_to_urls': False}
-                new_data[dd] = new_data[dd].astype(str)
-                new_data[mm] = new_data[mm].astype(str)
-                new_data[nn] = new_data[nn].astype(str)
-                new_data[buy_time] = new_data[buy_time].astype(str)
-                new_data.to_excel(excel_file_name, index=False, engine="openpyxl")
-                # writer_1.save()
-
-                # === 추가: 품목 전체 표기 버전 엑셀도 함께 저장 ===
-                # new_data에는 dd(품목명)가 잘린 버전, gagin(각인)에 전체 문구가 들어있다.
-                new_data_full = new_data.copy()
-                if gagin in new_data_full.columns:
-                    # '품목명' 컬럼에 '각인'에 들어있는 전체 내용을 그대로 넣어준다.
-                    new_data_full[dd] = new_data_full[gagin]
-
-                excel_file_name_full = dir_path + last + "네이버_송장발부_전체.xlsx"
-                new_data_full.to_excel(excel_file_name_full, index=False, engine="openpyxl")
-
-
-                excel_file_name = dir_path + last + "네이버_발송처리.xlsx"
-                # df.to_excel(excel_file_name, index=False)
-                # writer_2 = pd.ExcelWriter(excel_file_name, options={'strings_to_urls': False})
-                send_data[nn] = send_data[nn].astype(str)
-                send_data[mm] = send_data[mm].astype(str)
-                send_data.to_excel(excel_file_name, index=False, sheet_name='발송처리', engine='openpyxl')
-                # writer_2.save()
-
-                # self는 현재 클래스(ExcelCalWindow)를 의미합니다.
-                QtWidgets.QMessageBox.information(self, '엑셀로 저장', '엑셀 파일로 저장했습니다. 꼬꼬님')
-
-        except Exception as e:
-            print(e)
-            return 0
+        ##############엑셀
+        file_path, ext = QFileDialog.getOpenFileName(self, '파일 열기', os.getcwd(), 'excel file (*.xls *.xlsx *.csv *.tsv)')
+        if file_path:
+            print("file_path", file_path)
+            self._start_consolidate(NAVER, lambda: self.get_df_from_password_excel(
+                file_path, NAVER_DEFAULT_PASSWORD, NAVER.source_columns(), NAVER.source_dtypes()))
 
     def my_coopang(self):
+        ##############엑셀
+        file_path, ext = QFileDialog.getOpenFileName(self, '파일 열기', os.getcwd(), 'excel file (*.xls *.xlsx *.csv *.tsv)')
+        if file_path:
+            print("file_path", file_path)
+            self._start_consolidate(COUPANG, lambda: self.get_df_from_non_password_excel(
+                file_path, COUPANG.source_columns(), COUPANG.source_dtypes()))
 
-        try:
-            # x = Test_check(self)
-            # # self.mytestin.setText("GootEvening")
-            # # self.mytestin.setDisabled(True)
-            # x.start()
-
-            a = '수취인이름'
-            aa = "받으시는 분"
-
-            b = '수취인전화번호'
-            bb = '받으시는 분 전화'
-            c = '수취인전화번호'
-            cc = '받는분핸드폰'
-            d = '등록옵션명'
-            dd = '품목명'
-            e = '구매수(수량)'
-            ee = '수량'
-            f = '배송메세지'
-            ff = '특기사항'
-            g = '주문자 추가메시지'
-            gg = '메모1'
-            h = '수취인 주소'
-            hh = '기본배송지'
-            i = '상세배송지'  # ?? 비워놓음
-            ii = '상세배송지'
-            j = '우편번호'
-            jj = '받는분우편번호'
-            k = '구매자'
-            kk = '구매자명'
-            l = '구매자전화번호'
-            ll = '구매자연락처'
-            m = '묶음배송번호'
-            mm = '출고번호'
-            n = '주문번호'
-            nn = '상품주문번호'
-
-            ###################
-            o = ''
-            oo = '운임Type'
-            p = ''
-            pp = '지불조건'
-            ###################
-
-            q = '1년 주문건수'
-            qq = '1년 주문건수'
-
-            ##################
-
-            r = '배송방법'
-            s = '택배사'
-            t = '송장번호'
-
-            ############ 추가
-
-            gagin = "각인"
-
-            ##############쿠팡 추가
-
-            is_option = "최초등록등록상품명/옵션명"
-            option = "상품옵션명"
-
-            ##############엑셀
-            file_path, ext = QFileDialog.getOpenFileName(self, '파일 열기', os.getcwd(), 'excel file (*.xls *.xlsx)')
-            if file_path:
-
-                print("file_path", file_path)
-
-                self.df_list = self.get_df_from_non_password_excel(file_path)
-
-                # self.df_list = self.loadData(file_path)[0]
-
-                print("결과???", self.df_list)
-
-                # self.df_list.insert(2, c, "s")
-                data_o = "s"
-                self.df_list[str(oo)] = data_o
-                data_p = "신용"
-                self.df_list[str(pp)] = data_p
-
-                # data_s = "한진택배"
-                # self.df_list[str(s)] = data_s
-
-                print(self.df_list)
-
-                self.df_list.rename(
-                    columns={a: aa, c: cc, d: dd, e: ee, f: ff, h: hh, g: gg, j: jj, k: kk, l: ll, m: mm, n: nn,
-                             is_option: option}, inplace=True)
-                print("재정비")
-
-                self.df_list[gagin] = ""
-
-                print(self.df_list)
-
-                print("원하는 열 나열하기1")
-                columns_list = self.df_list[
-                    [aa, cc, dd, ee, ff, gg, hh, jj, kk, ll, mm, nn, oo, pp, gagin, option]].values.tolist()
-
-                print("원하는 열 나열하기2")
-                print(columns_list)
-                #
-
-                # 출고번호(m)에서 동일한거 묶고
-
-                # 메모1(g)과 수량(e)를 품목명(d)에 다시 수정한다.
-
-                print("특정 열 나열하기")
-                columns_list_m = self.df_list[mm].values.tolist()
-                print(columns_list_m)
-                print("[[특정 열 중복제거]]")
-                result_set_1 = set(columns_list_m)
-                print("특정 열 중복제거 준비", result_set_1)
-                result_set_1_len = len(result_set_1)
-
-                result_set_2 = list(result_set_1)
-                print("특정 열 중복제거 완료", result_set_2)
-                result_set_2_len = len(result_set_2)
-                #
-
-                ############
-                # # data_list의 데이터를 데이터프레임으로 변환
-                # data = [row.split(":") for row in new_list]
-                # df = pd.DataFrame(data, columns=["사용자", "게임", "서버", "다이아", "골드", "컴퓨터번호"])
-                #############
-
-                # 엑셀 저장 날짜 및 시간을 엑셀 파일명으로...
-                nowDay_ = datetime.today().strftime("%Y%m%d%H%M%S")
-                year = datetime.today().strftime("%Y")
-                month = datetime.today().strftime("%m")
-                day = datetime.today().strftime("%d")
-                hour = datetime.today().strftime("%H")
-                minute = datetime.today().strftime("%M")
-                last = str(day) + "d_" + str(hour) + "h" + str(minute) + "m"
-                nowDay = str(nowDay_)
-
-                ################ 쿠팡 송장 발부 #############
-                df = pd.DataFrame(columns_list,
-                                  columns=[aa, cc, dd, ee, ff, gg, hh, jj, kk, ll, mm, nn, oo, pp, gagin, option])
-                dir_path = "C:/my_games/excel_result/" + str(year) + "/" + str(month) + "/"
-                if not os.path.isdir(dir_path):
-                    os.makedirs(dir_path)
-
-                temporary_data = pd.DataFrame(
-                    columns=[aa, cc, dd, ee, ff, gg, hh, jj, kk, ll, mm, nn, oo, pp, gagin, option])
+    # ------------------------------------------------------------------
+    # 송장 변환 백그라운드 실행 (ConsolidateWorker)
+    # ------------------------------------------------------------------
+    def _start_consolidate(self, spec: ChannelSpec, load: Callable[[], pd.DataFrame]):
+        if self._worker is not None:
+            return
 
-                # 쿠팡 송장발부용
-                new_data = pd.DataFrame(columns=[aa, cc, dd, ee, ff, gg, hh, jj, kk, ll, mm, nn, oo, pp, gagin, option])
+        # 엑셀 저장 날짜 및 시간을 엑셀 파일명으로... (예: C:/my_games/excel_result/2025/12/08d_14h30m네이버_송장발부.xlsx)
+        now = datetime.today()
+        dir_path = "C:/my_games/excel_result/" + now.strftime("%Y") + "/" + now.strftime("%m") + "/"
+        last = now.strftime("%d") + "d_" + now.strftime("%H") + "h" + now.strftime("%M") + "m"
+
+        self.btn_naver.setEnabled(False)
+        self.btn_coopang.setEnabled(False)
+
+        self._progress_dlg = QtWidgets.QProgressDialog(f"{spec.label} 엑셀 읽는 중...", "취소", 0, 0, self)
+        self._progress_dlg.setWindowTitle(f"{spec.label} 송장 변환")
+        self._progress_dlg.setMinimumDuration(0)
+        self._progress_dlg.setAutoClose(False)
+        self._progress_dlg.setAutoReset(False)
+
+        worker = ConsolidateWorker(spec, load, dir_path, last, self.chk_skip_processed.isChecked(), self)
+        worker.progress.connect(self._on_consolidate_progress)
+        worker.done.connect(self._on_consolidate_done)
+        worker.failed.connect(self._on_consolidate_failed)
+        worker.cancelled.connect(self._on_consolidate_cancelled)
+        worker.finished.connect(self._on_consolidate_finished)
+        self._progress_dlg.canceled.connect(worker.cancel)
+
+        self._worker = worker
+        self._progress_dlg.show()
+        worker.start()
+
+    def _on_consolidate_progress(self, done: int, total: int, rows_per_sec: float):
+        if self._progress_dlg is None:
+            return
+        self._progress_dlg.setMaximum(total)
+        self._progress_dlg.setValue(done)
+        self._progress_dlg.setLabelText(f"묶음 {done:,} / {total:,}  ({rows_per_sec:,.0f}행/초)")
+
+    def _on_consolidate_done(self, result: ConsolidateResult, paths: dict):
+        timing_text = "\n".join(f"  - {k}: {v:.2f}초" for k, v in result.timings.items())
+        summary = f"{result.rows:,}행 → {result.groups:,}건 (재구매 고객 {result.repeat_buyers:,}건)"
+        if result.skipped_rows:
+            summary += f"\n이미 변환한 {result.skipped_rows:,}행은 건너뛰었습니다."
+        if not paths:
+            self.status.showMessage("새 주문이 없습니다.", 10000)
+            QtWidgets.QMessageBox.information(self, '송장 변환', f'새로 변환할 주문이 없습니다. 꼬꼬님\n\n{summary}')
+            return
+        print(f"송장 변환 완료: {summary}")
+        print(timing_text)
+        for p in paths.values():
+            print("  저장:", p)
+        self.status.showMessage(f"송장 변환 완료: {result.rows:,}행 → {result.groups:,}건", 10000)
+
+        # self는 현재 클래스(ExcelCalWindow)를 의미합니다.
+        QtWidgets.QMessageBox.information(
+            self,
+            '엑셀로 저장',
+            f'엑셀 파일로 저장했습니다. 꼬꼬님\n\n{summary}\n{timing_text}',
+        )
 
-                # dd 품목명, ee 수량, gg 메모1
-                print("new_data 1", new_data)
-                for set_2 in range(result_set_2_len):
-
-                    # 출고번호로 검색한 것...
-                    result = df[df[mm] == result_set_2[set_2]]
-                    print("???", result)
-                    print("???", result.index)
-                    # print("???", result.index[0])
-                    print("???gg", result[gg])
-                    # print("???gg[0]", result[gg][result.index[0]])
-                    # print("???", len(result.index))
-                    QTest.qWait(100)
-                    # 검색된 것을 임시로 저장하기
-
-                    print("뽑기전 temporary_data", temporary_data)
-
-                    if len(temporary_data) == 0:
-                        print("전체저장")
-                        temporary_data = pd.concat([temporary_data, result])
-                    else:
-                        print("삭제 후 저장")
-                        temporary_data = temporary_data.drop(temporary_data.index[:len(temporary_data)])
-                        temporary_data = pd.concat([temporary_data, result])
-                    print("뽑아낸 temporary_data", temporary_data)
-
-                    total_ = 0
-
-                    # 뽑아낸 주문번호의 중복갯수로 다시 반복문 돌려서 작업하기
-                    for set_index in range(len(result.index)):
-                        print("여기인가 1")
-                        ###############
-
-                        # 해당문구 추출하여 갯수파악하고 바로 수량 적어놓기
-                        # 해당문구가 품목명에 있을 경우 pass 하기기
-                        # df['col_name'].str.contains("여기에문구...")
-
-                        ################
-                        # 'gg' 문구 갯수 파악
-                        # many = temporary_data[temporary_data[gg] == temporary_data[gg][result.index[set_index]]]
-                        # print("how many???", len(many.index))
-
-                        # print("set_index", set_index)
-                        # print("set_index?", result.index[set_index])
-                        add_write = "=> " + str(result[ee][result.index[set_index]]) + " ea"
-
-                        write_num = set_index + 1
-                        result_write_num = str(write_num) + ". "
-
-                        if set_index == 0:
-                            # print("여기인가 2")
-                            # print("여기인가 2", df.loc[result.index[set_index], gg])
-                            # print("여기인가 2", str(add_write))
-                            # test = df.loc[result.index[set_index], gg] + str(add_write)
-                            # print("add_write", add_write)
-                            # print("test", test)
-
-                            # print("df.loc[result.index[set_index], gg]", df.loc[result.index[set_index], gg])
-                            if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                # if len(df.loc[result.index[set_index], gg]) == 0:
-                                df.loc[result.index[set_index], dd] = result_write_num + df.loc[
-                                    result.index[set_index], option] + ":" + df.loc[result.index[set_index], dd] + str(
-                                    add_write)
-
-                                df.loc[result.index[set_index], gagin] = result_write_num + df.loc[
-                                    result.index[set_index], option] + ":" + df.loc[result.index[set_index], dd] + str(
-                                    add_write)
-                            else:
-
-                                write_memo = str(df.loc[result.index[set_index], gg]).replace("여기에 문구:", "")
-                                write_memo = str(write_memo).replace("여기에 각인 문구:", "")
-                                df.loc[result.index[set_index], dd] = result_write_num + df.loc[
-                                    result.index[set_index], option] + ":" + write_memo + str(add_write)
-
-                                df.loc[result.index[set_index], gagin] = result_write_num + df.loc[
-                                    result.index[set_index], option] + ":" + write_memo + str(add_write)
-
-                            df_2 = df.iloc[result.index[0]]
-                            print("set_index == 0", df_2)
-                            new_data.loc[len(new_data)] = df_2
-
-                            # new_data.loc[set_2, dd] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg]
-
-                        else:
-
-                            print("수정 및 추가하기1", new_data)
-                            print("수정 및 추가하기2", result.index[set_index])
-
-                            # [송장발부]마지막으로 같은 문구 갯수 파악하기
-                            result_memo = new_data[new_data[dd] == result.loc[result.index[set_index], gg]] + add_write
-
-                            print("수정 및 추가하기3", result_memo)
-                            print("수정 및 추가하기4", df.loc[result.index[set_index], gg])
-
-                            if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                print("this is nan")
-
-                            if len(result_memo.index) == 0:
-                                print("없당.", result_memo[gg])
-                                if pd.isnull(df.loc[result.index[set_index], gg]) == True:
-                                    new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + result_write_num + \
-                                                              df.loc[result.index[set_index], option] + ":" + df.loc[
-                                                                  result.index[set_index], dd] + add_write
-                                    new_data.loc[set_2, gagin] = new_data.loc[set_2, gagin] + "\n" + result_write_num + \
-                                                                 df.loc[result.index[set_index], option] + ":" + df.loc[
-                                                                     result.index[set_index], dd] + add_write
-                                else:
-
-                                    write_memo = str(df.loc[result.index[set_index], gg]).replace("여기에 문구:", "")
-                                    write_memo = str(write_memo).replace("여기에 각인 문구:", "")
-
-                                    new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + result_write_num + \
-                                                              df.loc[result.index[
-                                                                  set_index], option] + ":" + write_memo + add_write
-                                    new_data.loc[set_2, gagin] = new_data.loc[set_2, gagin] + "\n" + result_write_num + \
-                                                                 df.loc[result.index[
-                                                                     set_index], option] + ":" + write_memo + add_write
-                            else:
-                                print("송장발부는 이미 있다..", result_memo[gg])
-
-                            # # 마지막으로 같은 문구 갯수 파악하기
-                            # result_memo = df[df[gg] == df.loc[result.index[set_index], gg]]
-                            #
-                            # if len(result_memo.index) == 1:
-                            #     new_data.loc[set_2, dd] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg] + "=> " + str(len(result_memo.index)) +"개"
-                            # else:
-                            #     print("g")
-                            # new_data.loc[set_2, gg] = new_data.loc[set_2, gg] + "\n" + df.loc[result.index[set_index], gg]
-
-                        # print("new_data for", new_data)
-                        # print("new_data for2", new_data[dd])
-
-                        # total 갯수 구하기 및 1년 주문건수
-
-                        title_display_count = 11
-                        print("total_total_total_total_total_total_", result[ee][result.index[set_index]])
-                        total_ += int(result[ee][result.index[set_index]])
-                        print("total_", total_)
-                        if len(result.index) - 1 == set_index:
-
-                            # 몇개 표시할지...
-
-                            # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                            new_data.loc[set_2, gagin] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                         new_data.loc[set_2, dd]
-
-                            # 1년 주문건수
-                            # if new_data.loc[set_2, qq] > 0:
-                            # new_data.loc[set_2, gagin] = "1년 주문건수 : " + str(new_data.loc[set_2, qq]) + "건" + "\n" + \
-                            #                              new_data.loc[set_2, gagin]
-
-                            if '\n' in new_data.loc[set_2, dd]:
-
-                                result_split = new_data.loc[set_2, dd].split('\n')
-                                print("new_data.loc[set_2, dd].split('\n')", result_split)
-
-                                if len(result_split) < title_display_count + 1:
-                                    new_data.loc[set_2, dd] = new_data.loc[set_2, dd]
-                                    new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                              new_data.loc[
-                                                                  set_2, dd]
-                                else:
-
-                                    for w in range(title_display_count):
-                                        if w == 0:
-
-                                            new_data.loc[set_2, dd] = result_split[w]
-                                        elif w < title_display_count - 3:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + result_split[w]
-                                        elif w == title_display_count - 1:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + str("^_~")
-                                        else:
-                                            new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + str(".")
-                                    # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                                    new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                              new_data.loc[set_2, dd]
-                            else:
-                                # new_data.loc[set_2, dd] = new_data.loc[set_2, dd] + "\n" + "total => " + str(total_) + " ea"
-                                new_data.loc[set_2, dd] = "[hobby brown] total => " + str(total_) + " ea" + "\n\n" + \
-                                                          new_data.loc[set_2, dd]
-                                # print("new_data 2", new_data)
-
-                # print("new_data 3", len(new_data))
-
-                # 수량 1로 바꾸기
-                for many in range(len(new_data)):
-                    new_data.loc[many, ee] = 1
-                # 메모1 빼고 '1년 구매건수'로 바꾸기
-                new_data = pd.DataFrame(new_data,
-                                        columns=[aa, bb, cc, dd, ee, ff, qq, hh, ii, jj, kk, ll, mm, nn, oo, pp, gagin])
-
-                #################################################
-                #################################################
-                #################################################
-                print("발송처리 부분")
-
-                ###################################################
-                ###################################################
-                ##################################################
-                new_data.astype(str)
-
-                # 데이터프레임을 엑셀 파일로 저장
-                excel_file_name = dir_path + last + "쿠팡_송장발부.xlsx"
-                # df.to_excel(excel_file_name, index=False)
-                # writer_1 = pd.ExcelWriter(excel_file_name, options={'strings_to_urls': False}
-                new_data[dd] = new_data[dd].astype(str)
-                new_data[mm] = new_data[mm].astype(str)
-                new_data[nn] = new_data[nn].astype(str)
-                new_data.to_excel(excel_file_name, index=False, engine="openpyxl")
-                # writer_1.save()
-
-                # === 추가: 품목 전체 표기 버전 엑셀도 함께 저장 ===
-                new_data_full = new_data.copy()
-                if gagin in new_data_full.columns:
-                    new_data_full[dd] = new_data_full[gagin]
-
-                excel_file_name_full = dir_path + last + "쿠팡_송장발부_전체.xlsx"
-                new_data_full.to_excel(excel_file_name_full, index=False, engine="openpyxl")
-
-
-                # self는 현재 클래스(ExcelCalWindow)를 의미합니다.
-                QtWidgets.QMessageBox.information(self, '엑셀로 저장', '엑셀 파일로 저장했습니다. 꼬꼬님')
+    def _on_consolidate_failed(self, message: str):
+        print(message)
+        QtWidgets.QMessageBox.warning(self, '송장 변환 오류', message)
+
+    def _on_consolidate_cancelled(self):
+        self.status.showMessage("송장 변환을 취소했습니다.", 5000)
+
+    def _on_consolidate_finished(self):
+        if self._progress_dlg is not None:
+            self._progress_dlg.close()
+            self._progress_dlg.deleteLater()
+            self._progress_dlg = None
+        if self._worker is not None:
+            self._worker.deleteLater()
+            self._worker = None
+        self.btn_naver.setEnabled(True)
+        self.btn_coopang.setEnabled(True)
+
+    def closeEvent(self, event):
+        # 변환 중에 창을 닫으면: 취소를 알리고 작업 스레드가 끝날 때까지 기다린 뒤 닫는다
+        # (돌고 있는 QThread 를 지우면 프로그램이 죽고, 저장 중이던 결과 엑셀이 반쯤 써진 채 남을 수 있음)
+        worker = self._worker
+        if worker is not None and worker.isRunning():
+            self.status.showMessage("송장 변환을 취소하는 중입니다...")
+            # 닫힌 창 위에 완료/실패 메시지 창이 뜨지 않도록
+            worker.done.disconnect(self._on_consolidate_done)
+            worker.failed.disconnect(self._on_consolidate_failed)
+            worker.cancelled.disconnect(self._on_consolidate_cancelled)
+            worker.cancel()
+            QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+            try:
+                worker.wait()
+            finally:
+                QtWidgets.QApplication.restoreOverrideCursor()
+        event.accept()
 
-        except Exception as e:
-            print(e)
-            return 0
-
-    def get_df_from_password_excel(self, excelpath, password):
-
-        df = pd.DataFrame()
-        temp = io.BytesIO()
-        with open(excelpath, 'rb') as f:
-            excel = msoffcrypto.OfficeFile(f)
-            excel.load_key(password)
-            excel.decrypt(temp)
-            # df = pd.read_excel(temp, skiprows=[0], converters={"code": lambda x: str(x)})
-            df = pd.read_excel(temp, skiprows=[0])
-            del temp
-            # df = df.drop(1)
-        return df
-
-    def get_df_from_non_password_excel(self, file_name):
-
-        df_list = []
-        with pd.ExcelFile(file_name) as wb:
-            for i, sn in enumerate(wb.sheet_names):
-                try:
-
-                    pd.set_option('display.max_columns', None)
-                    pd.set_option('display.max_rows', None)
-                    df = pd.read_excel(wb, sheet_name=sn, engine='openpyxl')
-
-                except Exception as e:
-                    print('File read error:', e)
-                else:
-                    df = df.fillna(0)
-                    print("dfdfdfdfdfdfdfdf", df)
-                    print("snsnsnsnsnsnsnsnsnsnsn", sn)
-                    df.name = sn
-                    df_list.append(df)
+    def get_df_from_password_excel(self, excelpath, password, usecols=None, dtype=None):
+        return read_password_excel(excelpath, password, usecols, dtype)
 
-        return df
+    def get_df_from_non_password_excel(self, file_name, usecols=None, dtype=None):
+        return read_non_password_excel(file_name, usecols, dtype)
 
 def main():
+    # 쿠팡 여러 시트 읽기가 프로세스 풀을 쓰므로, exe(PyInstaller)로 묶었을 때 필요
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     win = ExcelCalWindow()
     win.show()
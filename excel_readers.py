@@ -0,0 +1,270 @@
+# excel_readers.py
+# 엑셀/CSV 읽기 백엔드 (Qt 없이 동작)
+# - openpyxl   : pandas 기본 xlsx 엔진. 항상 있음, 가장 느림
+# - calamine   : python-calamine(Rust) 이 설치되어 있으면 xlsx/xls 를 여기로 (openpyxl 보다 수 배 빠름)
+# - csv        : .csv/.tsv/.txt 는 pd.read_csv 로 바로 (XML 파싱 없음)
+# - 파일 확장자로 자동 선택 (auto), 명령줄 --reader / set_default_backend() 로 강제 가능
+# 어느 백엔드로 읽어도 같은 컬럼·같은 dtype 이 나오도록 맞춘다 (_align_dtypes).
+# - calamine 은 숫자 셀을 f64 로 읽어서 16자리 이상 주문번호가 깨질 수 있으므로, 그런 값이 보이면
+#   openpyxl 로 다시 읽는다 (_LossyNumbers).
+# - CSV 에는 셀 타입이 없으므로 엑셀 날짜 셀(datetime)은 CSV 에서 글자로 들어온다.
+#   주문 엑셀의 날짜는 글자로 내려오므로 실제 파일에서는 차이가 없다.
+#
+# 비교: python bench_readers.py
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook
+    _HAS_CALAMINE = True
+except ImportError:
+    CalamineWorkbook = None
+    _HAS_CALAMINE = False
+
+
+AUTO = "auto"
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+CSV_SUFFIXES = (".csv", ".tsv", ".txt")
+
+# 한국어 CSV 는 엑셀에서 저장하면 cp949, 다른 도구는 utf-8(BOM) 이 많다
+_CSV_ENCODINGS = ("utf-8-sig", "cp949")
+
+# f64 로 정확히 나타낼 수 있는 가장 큰 정수 (2^53, 16자리)
+_EXACT_INT_LIMIT = 2 ** 53
+
+
+@dataclass(frozen=True)
+class ReaderBackend:
+    """읽기 백엔드 1개. read(원본, sheet_name, skiprows, usecols, dtype) → DataFrame"""
+    name: str
+    label: str
+    suffixes: Tuple[str, ...]
+    available: bool
+    read: Callable[..., pd.DataFrame]
+    sheet_names: Callable[[str], List[str]]
+
+
+# ---------------------------------------------------------------------------
+# 백엔드별 구현
+# ---------------------------------------------------------------------------
+
+def _read_openpyxl(src, sheet_name, skiprows, usecols, dtype) -> pd.DataFrame:
+    return pd.read_excel(src, sheet_name=sheet_name, engine="openpyxl",
+                         skiprows=skiprows, usecols=usecols, dtype=dtype)
+
+
+def _sheet_names_openpyxl(path: str) -> List[str]:
+    """시트 이름 목록만 빠르게 읽는다. (read_only 라 셀 내용은 읽지 않음)"""
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+class _LossyNumbers(Exception):
+    """calamine 이 2^53 이상 숫자 셀을 읽었음 (f64 라 자리수가 깨졌을 수 있음)"""
+
+
+def _read_calamine(src, sheet_name, skiprows, usecols, dtype) -> pd.DataFrame:
+    """
+    calamine 은 숫자 셀을 f64 로 넘기므로 16자리 이상 번호가 숫자 셀이면 값이 달라진다.
+    문자열 스키마 컬럼은 dtype 대신 converter 로 셀마다 글자로 바꾸면서 그런 숫자 셀이 있는지 보고,
+    나머지 숫자 컬럼은 _maybe_rounded 로 확인한다. 있으면 _LossyNumbers (호출 쪽에서 openpyxl 로 다시).
+    """
+    text_cols = [c for c, t in (dtype or {}).items() if t is str]
+    lossy = []
+
+    def text_cell(v):
+        if isinstance(v, str):
+            return v
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and abs(v) >= _EXACT_INT_LIMIT:
+            lossy.append(v)
+        return str(v)
+
+    other = {c: t for c, t in (dtype or {}).items() if c not in text_cols}
+    df = pd.read_excel(src, sheet_name=sheet_name, engine="calamine", skiprows=skiprows, usecols=usecols,
+                       dtype=other or None, converters={c: text_cell for c in text_cols} or None)
+    if lossy:
+        raise _LossyNumbers()
+    if any(_maybe_rounded(df[col]) for col in df.columns if col not in text_cols):
+        raise _LossyNumbers()
+    return df
+
+
+def _maybe_rounded(s: pd.Series) -> bool:
+    """
+    스키마 없는 숫자 컬럼이 f64 로 반올림된 숫자 셀에서 왔을 수 있는지.
+    글자 셀("20240101000000250")에서 pandas 가 추론한 정수는 정확하고 대부분 f64 로 나타낼 수 없는 값이 섞여 있다.
+    2^53 이상 값이 모두 f64 로 정확히 나타낼 수 있는 값일 때만 반올림된 것으로 본다 (아니면 글자 셀에서 온 것).
+    """
+    if s.dtype.kind == "f":
+        return bool((s.abs() >= _EXACT_INT_LIMIT).any())
+    if s.dtype.kind != "i":
+        return False
+    big = s[s.abs() >= _EXACT_INT_LIMIT]
+    return bool(len(big) and (big.astype("float64").astype("int64") == big).all())
+
+
+def _sheet_names_calamine(path: str) -> List[str]:
+    return list(CalamineWorkbook.from_path(str(path)).sheet_names)
+
+
+def _csv_sep(path: str, encoding: str) -> str:
+    if str(path).lower().endswith(".tsv"):
+        return "\t"
+    with open(path, "r", encoding=encoding, newline="") as f:
+        sample = f.read(64 * 1024)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",\t;|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _read_delimited(src, sheet_name, skiprows, usecols, dtype) -> pd.DataFrame:
+    """CSV/TSV. 시트가 없으므로 sheet_name 은 무시. 파일 경로만 받는다."""
+    if not isinstance(src, (str, Path)):
+        raise TypeError("CSV/TSV 는 파일 경로로만 읽을 수 있습니다.")
+    last_error: Optional[Exception] = None
+    for enc in _CSV_ENCODINGS:
+        try:
+            return pd.read_csv(src, sep=_csv_sep(src, enc), encoding=enc,
+                               skiprows=skiprows, usecols=usecols, dtype=dtype)
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise last_error
+
+
+def _sheet_names_delimited(path: str) -> List[str]:
+    return [Path(path).stem]
+
+
+def _read_pandas_default(src, sheet_name, skiprows, usecols, dtype) -> pd.DataFrame:
+    return pd.read_excel(src, sheet_name=sheet_name, skiprows=skiprows, usecols=usecols, dtype=dtype)
+
+
+def _sheet_names_pandas_default(path: str) -> List[str]:
+    with pd.ExcelFile(path) as xl:
+        return list(xl.sheet_names)
+
+
+BACKENDS: Dict[str, ReaderBackend] = {
+    "openpyxl": ReaderBackend("openpyxl", "openpyxl", (".xlsx", ".xlsm"), True,
+                              _read_openpyxl, _sheet_names_openpyxl),
+    "calamine": ReaderBackend("calamine", "calamine (Rust)", EXCEL_SUFFIXES, _HAS_CALAMINE,
+                              _read_calamine, _sheet_names_calamine),
+    "csv": ReaderBackend("csv", "CSV/TSV", CSV_SUFFIXES, True,
+                         _read_delimited, _sheet_names_delimited),
+}
+
+# 확장자별 자동 선택 순서 (앞에서부터 설치된 것)
+_AUTO_ORDER = ("csv", "calamine", "openpyxl")
+
+# .xls 인데 calamine 이 없을 때 등: pandas 가 확장자에 맞는 엔진(xlrd 등)을 고르게 둔다
+_PANDAS_DEFAULT = ReaderBackend("pandas", "pandas 기본", EXCEL_SUFFIXES, True,
+                                _read_pandas_default, _sheet_names_pandas_default)
+
+_default_backend = AUTO
+
+
+def set_default_backend(name: str) -> None:
+    """기본 백엔드 강제 ("auto" 면 확장자로 자동 선택). 설치 안 된 백엔드면 ValueError."""
+    global _default_backend
+    if name != AUTO:
+        get_backend(name)
+    _default_backend = name
+
+
+def get_backend(name: str) -> ReaderBackend:
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"알 수 없는 읽기 백엔드: {name} ({', '.join(BACKENDS)})")
+    if not backend.available:
+        raise ValueError(f"읽기 백엔드 {name} 가 설치되어 있지 않습니다. (pip install python-calamine)")
+    return backend
+
+
+def available_backends() -> List[str]:
+    return [name for name, b in BACKENDS.items() if b.available]
+
+
+def pick_backend(path: str, backend: Optional[str] = None) -> ReaderBackend:
+    """
+    path 를 읽을 백엔드. backend(또는 기본값)가 "auto" 가 아니면 그대로,
+    auto 면 확장자를 처리할 수 있는 것 중 _AUTO_ORDER 순서로 먼저 설치된 것.
+    """
+    name = backend or _default_backend
+    if name == _PANDAS_DEFAULT.name:          # pick_backend(...).name 을 그대로 넘겨받은 경우
+        return _PANDAS_DEFAULT
+    if name != AUTO:
+        return get_backend(name)
+    suffix = Path(str(path)).suffix.lower()
+    for candidate in _AUTO_ORDER:
+        b = BACKENDS[candidate]
+        if b.available and suffix in b.suffixes:
+            return b
+    return _PANDAS_DEFAULT
+
+
+# ---------------------------------------------------------------------------
+# dtype 맞추기
+# ---------------------------------------------------------------------------
+
+def _align_dtypes(df: pd.DataFrame, dtype: Optional[Dict[str, type]]) -> pd.DataFrame:
+    """
+    백엔드마다 다르게 나올 수 있는 부분을 openpyxl 결과에 맞춘다.
+    - 스키마(dtype)에 있는 컬럼은 이미 같은 타입 → 그대로
+    - 소수점 없는 정수만 있는 float 컬럼 → int64 (CSV 의 "3.0" 등, openpyxl 은 정수로 읽음)
+    """
+    fixed = set(dtype or {})
+    for col in df.columns:
+        if col in fixed:
+            continue
+        s = df[col]
+        if s.dtype.kind == "f" and len(s) and s.notna().all() and (s % 1 == 0).all():
+            df[col] = s.astype("int64")
+    return df
+
+
+# ---------------------------------------------------------------------------
+# 공용 진입점
+# ---------------------------------------------------------------------------
+
+def read_table(
+    path: str,
+    source=None,
+    sheet_name=0,
+    skiprows=None,
+    usecols=None,
+    dtype: Optional[Dict[str, type]] = None,
+    backend: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    엑셀/CSV 한 장을 읽는다. 백엔드는 path 의 확장자로 고른다.
+    source: 실제로 읽을 대상 (복호화한 mmap 등). 없으면 path.
+    """
+    b = pick_backend(path, backend)
+    src = path if source is None else source
+    try:
+        df = b.read(src, sheet_name, skiprows, usecols, dtype)
+    except _LossyNumbers:
+        print(f"[읽기] 16자리 이상 숫자 셀이 있어 openpyxl 로 다시 읽습니다: {Path(str(path)).name}")
+        if hasattr(src, "seek"):
+            src.seek(0)
+        df = BACKENDS["openpyxl"].read(src, sheet_name, skiprows, usecols, dtype)
+    return _align_dtypes(df, dtype)
+
+
+def sheet_names(path: str, backend: Optional[str] = None) -> List[str]:
+    """시트 이름 목록 (CSV 는 파일 이름 1개)."""
+    return pick_backend(path, backend).sheet_names(path)
+
+
+def is_delimited(path: str) -> bool:
+    return Path(str(path)).suffix.lower() in CSV_SUFFIXES
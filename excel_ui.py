@@ -1,6 +1,7 @@
 # excel_ui.py
 # 탭 통합 메인 UI: 기존 엑셀 계산기 + 네이버/쿠팡 송장 읽기 + git 업데이트 탭
 
+import multiprocessing
 import sys
 import subprocess
 from pathlib import Path
@@ -230,6 +231,8 @@ class MainTabbedWindow(QtWidgets.QMainWindow):
 
 
 def main():
+    # 쿠팡 여러 시트 읽기가 프로세스 풀을 쓰므로, exe(PyInstaller)로 묶었을 때 필요
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     win = MainTabbedWindow()
     win.show()
@@ -0,0 +1,23 @@
+# file_hash.py
+# 캐시 키로 쓰는 파일 내용 sha256 (복호화/읽기 캐시, 썸네일, 사진 저장소 공용)
+# 암호화 라이브러리(msoffcrypto 등)를 끌어오지 않도록 hashlib 만 쓰는 모듈로 따로 둔다.
+
+import hashlib
+import os
+
+
+# 한 번에 읽는 크기 (파일 전체를 메모리에 올리지 않음)
+HASH_CHUNK = 1024 * 1024
+
+
+def sha256_file(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def path_key(path, st: os.stat_result) -> str:
+    """"경로|크기|mtime_ns" — 같은 파일이면 sha256 을 다시 계산하지 않도록 기억해 두는 키"""
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
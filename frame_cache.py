@@ -0,0 +1,192 @@
+# frame_cache.py
+# 엑셀을 읽어서 만든 DataFrame 캐시 (열 단위 파일)
+# - 같은 주문/결과 엑셀을 다시 열 때 XLSX XML 파싱을 건너뛰고 저장해 둔 DataFrame 을 바로 읽는다.
+# - 키: 원본 파일 sha256 + 읽기 방식(함수·백엔드·컬럼·스키마·비밀번호 해시) + 읽기 코드 버전(READER_VERSION)
+#   → 원본이 바뀌거나 읽는 코드가 바뀌면 자동으로 새로 읽음
+#   → --reader / set_default_backend() 로 백엔드를 바꾸면 그 백엔드로 새로 읽음 (잘못 읽는 백엔드 피하기)
+# - 저장 형식: pyarrow 가 있으면 Feather(Arrow), 없거나 Arrow 로 못 쓰는 컬럼(숫자/문자 섞임)이면 pickle
+# - 전체 크기 상한을 넘으면 가장 오래 안 쓴 것부터 삭제 (LRU), set_frame_cache_enabled(False) 로 끔
+#
+# 주의: 복호화 캐시와 마찬가지로 주문 내용이 그대로 저장되므로 사용자 로컬 폴더에만 둔다.
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from cache_index import IndexedFileCache, temp_path
+from excel_readers import pick_backend, read_table
+
+try:
+    import pyarrow  # noqa: F401  (Feather 저장용, 없으면 pickle)
+    _HAS_ARROW = True
+except ImportError:
+    _HAS_ARROW = False
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".excel_cal" / "frame_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024   # 512MB
+
+# 읽기 코드(컬럼 정리, 빈 칸 채우기 등)를 바꾸면 올린다 → 예전 캐시는 자연히 안 쓰이고 LRU 로 지워짐
+READER_VERSION = 2
+
+
+def reader_key(reader: str, **params) -> str:
+    """
+    읽기 방식 → 캐시 키 일부. params 는 JSON 으로 바꿀 수 있는 값 (타입은 이름으로).
+    같은 파일이라도 백엔드마다 결과가 다를 수 있으므로 backend=pick_backend(path).name 을 꼭 넣는다.
+    """
+    def _plain(v):
+        if isinstance(v, type):
+            return v.__name__
+        if isinstance(v, dict):
+            return {str(k): _plain(x) for k, x in sorted(v.items(), key=lambda kv: str(kv[0]))}
+        if isinstance(v, (list, tuple)):
+            return [_plain(x) for x in v]
+        return v
+
+    text = json.dumps([reader, READER_VERSION, _plain(params)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_frame(df: pd.DataFrame, path: Path) -> str:
+    """df 를 path 에 저장하고 형식 이름을 돌려준다."""
+    if _HAS_ARROW:
+        try:
+            df.reset_index(drop=True).to_feather(path)
+            return "feather"
+        except (ValueError, TypeError, pyarrow.ArrowException):
+            pass
+    df.to_pickle(path)
+    return "pickle"
+
+
+def _read_frame(path: Path, fmt: str) -> pd.DataFrame:
+    if fmt == "feather":
+        return pd.read_feather(path)
+    return pd.read_pickle(path)
+
+
+class FrameCache(IndexedFileCache):
+    """
+    파싱한 DataFrame 을 cache_dir 에 저장해 두고 재사용 (index / LRU 는 cache_index.IndexedFileCache).
+    index.json
+      - "paths": {"경로|크기|mtime_ns": sha256}      ← 같은 파일이면 sha256 계산도 생략
+      - "entries": {"sha256_읽기키": {"size", "last_used", "parse_seconds", "format", "name"}}
+    """
+
+    BLOB_SUFFIX = ".frame"
+    LOG_LABEL = "읽기 캐시"
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def read(self, path: str, key_part: str, parse: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        path 를 key_part(reader_key) 방식으로 읽은 DataFrame. 캐시에 있으면 저장본을 읽고,
+        없으면 parse() 로 읽어서 저장한다. 매번 새 DataFrame 이므로 호출 쪽에서 고쳐 써도 된다.
+        df.name (합친 시트 이름) 도 같이 저장/복원.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index = self._load_index()
+        key = f"{self._file_sha(index, path)}_{key_part}"
+        blob = self._blob_path(key)
+        entry = index["entries"].get(key)
+
+        if entry is not None and blob.is_file():
+            t0 = time.perf_counter()
+            try:
+                df = _read_frame(blob, entry.get("format", "pickle"))
+            except Exception as e:
+                # 깨진 캐시 파일(저장 도중 종료 등)은 버리고 새로 읽는다
+                print(f"[읽기 캐시] 캐시 파일을 읽지 못해 다시 읽습니다: {e}")
+            else:
+                self.hits += 1
+                self.saved_seconds += max(entry.get("parse_seconds", 0.0) - (time.perf_counter() - t0), 0.0)
+                if entry.get("name") is not None:
+                    df.name = entry["name"]
+                entry["last_used"] = time.time()
+                self._save_index(index)
+                self._log()
+                return df
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        df = parse()
+        parse_seconds = time.perf_counter() - t0
+
+        tmp = temp_path(blob)
+        try:
+            fmt = _write_frame(df, tmp)
+            os.replace(tmp, blob)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[읽기 캐시] 저장 실패 (캐시 없이 계속): {e}")
+            return df
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        name = getattr(df, "name", None)
+        self.add_entry(path, key, {
+            "parse_seconds": parse_seconds,
+            "format": fmt,
+            "name": name if isinstance(name, str) else None,
+        })
+        self._log()
+        return df
+
+    def contains(self, path: str, key_part: str) -> bool:
+        """path 를 key_part 방식으로 읽은 결과가 캐시에 있는지 (읽지는 않음)."""
+        index = self._load_index()
+        key = f"{self._file_sha(index, path)}_{key_part}"
+        return key in index["entries"] and self._blob_path(key).is_file()
+
+
+# ---------------------------------------------------------------------------
+# 기본 캐시 (프로세스당 하나)
+# ---------------------------------------------------------------------------
+
+_default_cache: Optional[FrameCache] = None
+_default_enabled = True
+
+
+def get_frame_cache() -> Optional[FrameCache]:
+    """기본 캐시. set_frame_cache_enabled(False) 면 None (매번 엑셀을 새로 읽음)."""
+    global _default_cache
+    if not _default_enabled:
+        return None
+    if _default_cache is None:
+        _default_cache = FrameCache()
+    return _default_cache
+
+
+def set_frame_cache_enabled(enabled: bool) -> None:
+    global _default_enabled
+    _default_enabled = enabled
+
+
+def cached_read(path: str, key_part: str, parse: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """기본 캐시가 켜져 있으면 캐시를 거쳐서, 꺼져 있으면 바로 parse()."""
+    cache = get_frame_cache()
+    if cache is None:
+        return parse()
+    return cache.read(path, key_part, parse)
+
+
+def _read_excel_key(path: str) -> str:
+    return reader_key("read_excel", backend=pick_backend(path).name)
+
+
+def read_excel_is_cached(path: str) -> bool:
+    """read_excel_cached(path) 가 파싱 없이 캐시에서 바로 나오는지."""
+    cache = get_frame_cache()
+    return cache is not None and cache.contains(path, _read_excel_key(path))
+
+
+def read_excel_cached(path: str) -> pd.DataFrame:
+    """pd.read_excel(path) 의 캐시 버전 (결과 엑셀 다시 열기용). 파싱은 excel_readers 가 확장자로 골라서."""
+    return cached_read(path, _read_excel_key(path), lambda: read_table(path))
@@ -0,0 +1,218 @@
+# image_cache.py
+# 사진 미리보기용 비동기 디코딩 + 축소 pixmap 캐시 (ReadInvoiceWidget / ImageManageDialog 에서 사용)
+# - 원본(폰 사진 12MP 등)을 화면 스레드에서 QPixmap(path) 로 읽고 다시 줄이면 행을 옮길 때마다 멈칫하므로,
+#   QImageReader 로 "필요한 크기로 바로" 디코딩하는 일을 QThreadPool 에 맡긴다.
+#   (JPEG 는 디코더 단계에서 줄여서 읽으므로 전체 해상도로 풀지 않음)
+# - 결과는 (경로, mtime, 목표 크기) 키로 축소 QPixmap 을 LRU 캐시에 두고, 합계 MAX_CACHE_BYTES 를 넘으면
+#   가장 오래 안 쓴 것부터 버림 → 같은 사진을 다시 보면 디코딩 없이 바로
+# - 파일을 바꾸면 mtime 이 달라지므로 예전 캐시는 자연히 안 쓰임
+# - QPixmap 은 화면 스레드에서만 만들 수 있으므로 작업 스레드는 QImage 까지만, 변환은 loaded 시그널 직전에
+# - 원본 대신 디스크 썸네일(thumb_store)이 있으면 그걸 디코딩하고, 없으면 이 때 만들어 둔다
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+from thumb_store import get_thumb_store, wait_pool
+
+
+# 축소 pixmap 합계 상한 (160x160 미리보기 약 100KB, 64x64 아이콘 약 16KB)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# 디코딩 작업 스레드 수 (화면 스레드 몫은 남겨 둠)
+MAX_DECODE_THREADS = max(2, (os.cpu_count() or 2) - 1)
+
+# 선택한 행 위아래로 대표 이미지를 미리 디코딩해 둘 행 수
+PREFETCH_ROWS = 2
+
+# 우선순위: 지금 보이는 것 > 이웃 행 미리 읽기
+PRIORITY_VISIBLE = 1
+PRIORITY_PREFETCH = 0
+
+# (경로, mtime_ns, 너비, 높이)
+CacheKey = Tuple[str, int, int, int]
+
+
+def decode_scaled(path: str, size: QSize) -> QImage:
+    """
+    path 를 size 안에 들어가게(비율 유지) 디코딩. 작업 스레드에서 불러도 된다.
+    예전 pix.scaled(size, KeepAspectRatio, SmoothTransformation) 와 같은 크기 (작은 사진은 키움).
+    읽지 못하면 빈 QImage.
+    """
+    reader = QImageReader(path)
+    src = reader.size()
+    if not src.isValid():
+        return reader.read()
+    fit = src.scaled(size, Qt.KeepAspectRatio)
+    if fit.width() < src.width():
+        reader.setScaledSize(fit)
+    image = reader.read()
+    if image.isNull() or image.size() == fit:
+        return image
+    return image.scaled(fit, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, cache: "PixmapCache", key: CacheKey):
+        super().__init__()
+        self.cache = cache
+        self.key = key
+
+    def run(self):
+        path, _, w, h = self.key
+        size = QSize(w, h)
+        store = self.cache.store
+        if store is not None:
+            # 디스크 썸네일이 있으면 원본(수 MB) 대신 썸네일(수십 KB)을 디코딩
+            thumb = store.thumbnail_for(path, size)
+            if thumb is not None:
+                path = str(thumb)
+        image = decode_scaled(path, size)
+        # PixmapCache 는 화면 스레드 객체 → 시그널은 화면 스레드에서 받음 (queued)
+        self.cache._decoded.emit(self.key, image)
+
+
+class PixmapCache(QObject):
+    """
+    축소 QPixmap LRU 캐시 + 디코딩 스레드 풀.
+    load() 가 바로 돌려주지 못한 것은 디코딩이 끝나면 loaded(key, pixmap) 로 알린다.
+    읽지 못한 파일은 빈 QPixmap 으로 알리고, 같은 키로 다시 시도하지 않는다.
+    """
+
+    loaded = pyqtSignal(object, QPixmap)
+    _decoded = pyqtSignal(object, QImage)
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES, threads: int = MAX_DECODE_THREADS, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self._pixmaps: "OrderedDict[CacheKey, QPixmap]" = OrderedDict()
+        self._bytes = 0
+        self._pending: Dict[CacheKey, _DecodeTask] = {}
+        self._visible_task: Optional[_DecodeTask] = None
+        self.store = get_thumb_store()
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(threads)
+        self._decoded.connect(self._on_decoded)
+
+        self.hits = 0
+        self.decodes = 0
+
+    # ------------------------------------------------------------------
+    # 키 / 조회
+    # ------------------------------------------------------------------
+    @staticmethod
+    def key_for(path, size: QSize) -> Optional[CacheKey]:
+        """파일이 없으면 None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (str(Path(path)), st.st_mtime_ns, size.width(), size.height())
+
+    def get(self, key: CacheKey) -> Optional[QPixmap]:
+        pix = self._pixmaps.get(key)
+        if pix is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+        return pix
+
+    def load(self, key: CacheKey, prefetch: bool = False) -> Optional[QPixmap]:
+        """
+        캐시에 있으면 바로 돌려주고, 없으면 디코딩을 맡기고 None (끝나면 loaded).
+        prefetch=False 는 "지금 보여줄 것" → 앞서 맡긴 "지금 보여줄 것" 이 아직 시작 전이면 취소하고 먼저 처리.
+        """
+        pix = self.get(key)
+        if pix is not None:
+            return pix
+
+        task = self._pending.get(key)
+        if not prefetch:
+            stale = self._visible_task
+            if stale is not None and stale is not task and self._pool.tryTake(stale):
+                self._pending.pop(stale.key, None)
+            if task is not None and self._pool.tryTake(task):
+                # 미리 읽기로 줄 서 있던 것 → 높은 우선순위로 다시
+                task = None
+        if task is None:
+            task = _DecodeTask(self, key)
+            task.setAutoDelete(False)   # tryTake / _pending 에서 계속 참조
+            self._pending[key] = task
+            self._pool.start(task, PRIORITY_PREFETCH if prefetch else PRIORITY_VISIBLE)
+        if not prefetch:
+            self._visible_task = task
+        return None
+
+    def cancel(self, key: CacheKey) -> bool:
+        """아직 시작 전인 디코딩 요청 취소 (이미 디코딩 중이거나 끝났으면 False)."""
+        task = self._pending.get(key)
+        if task is None or not self._pool.tryTake(task):
+            return False
+        self._pending.pop(key, None)
+        if task is self._visible_task:
+            self._visible_task = None
+        return True
+
+    def prefetch(self, key: Optional[CacheKey]) -> None:
+        if key is not None and key not in self._pixmaps:
+            self.load(key, prefetch=True)
+
+    # ------------------------------------------------------------------
+    # 디코딩 결과 (화면 스레드)
+    # ------------------------------------------------------------------
+    def _on_decoded(self, key: CacheKey, image: QImage) -> None:
+        task = self._pending.pop(key, None)
+        if task is not None and task is self._visible_task:
+            self._visible_task = None
+        self.decodes += 1
+        pix = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        self._remember(key, pix)
+        self.loaded.emit(key, pix)
+
+    def _remember(self, key: CacheKey, pix: QPixmap) -> None:
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self._bytes -= _pixmap_bytes(old)
+        self._pixmaps[key] = pix
+        self._bytes += _pixmap_bytes(pix)
+        while self._bytes > self.max_bytes and len(self._pixmaps) > 1:
+            _, dropped = self._pixmaps.popitem(last=False)
+            self._bytes -= _pixmap_bytes(dropped)
+
+    def cache_bytes(self) -> int:
+        return self._bytes
+
+    def wait_idle(self, msecs: int = -1) -> bool:
+        """남은 디코딩이 끝날 때까지 대기."""
+        return wait_pool(self._pool, msecs)
+
+    def shutdown(self) -> None:
+        """시작 전 요청은 버리고 디코딩 중인 것만 끝나기를 기다림 (프로그램 종료 시)."""
+        self._pool.clear()
+        self._pending.clear()
+        self._visible_task = None
+        self.wait_idle()
+
+
+def _pixmap_bytes(pix: QPixmap) -> int:
+    if pix.isNull():
+        return 64
+    return pix.width() * pix.height() * max(pix.depth(), 8) // 8
+
+
+# ---------------------------------------------------------------------------
+# 기본 캐시 (프로세스당 하나, QApplication 만든 뒤에 사용)
+# ---------------------------------------------------------------------------
+
+_default_cache: Optional[PixmapCache] = None
+
+
+def get_pixmap_cache() -> PixmapCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PixmapCache()
+    return _default_cache
@@ -0,0 +1,201 @@
+# image_meta.py
+# 송장 행별 첨부 사진 목록 저장소 (송장 폴더마다 SQLite 하나, Qt 없이 동작)
+# - 예전: 사진 관리 창을 닫을 때마다 meta.json 전체를 다시 쓰고(indent=2), 열 때 전체를 파싱
+#   → 행/사진이 수천 개면 느리고, 쓰는 도중에 꺼지면 파일이 깨질 수 있었음
+# - 지금: <엑셀 이름>/meta.sqlite3 (WAL) 에 (행 키, 순서, 파일명) 으로 저장
+#   · 행 하나 바꾸면 그 행만 트랜잭션 하나로 교체 (원자적, 중간에 꺼지면 이전 상태 그대로)
+#   · 수정이 COMPACT_EVERY 번 쌓이면 WAL 체크포인트 + (빈 페이지가 많으면) VACUUM
+#   · DB 가 깨져 있으면 옆으로 치워 두고(.corrupt-시각) meta.json 또는 빈 상태에서 다시 시작
+# - 처음 열 때 meta.json 만 있으면 한 번 옮겨 담고 meta.json 은 meta.json.migrated 로 이름을 바꿔 둠
+#
+# 행 키는 order_keys 의 주문 키 ("출고번호:…" 등). 예전 meta.json 에서 옮긴 것은 행 번호(1부터) 글자이고,
+# 송장을 열 때 그 행의 주문 키로 rename_rows() 된다.
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+META_DB_NAME = "meta.sqlite3"
+LEGACY_META_NAME = "meta.json"
+
+# 수정 이만큼마다 정리 (WAL 파일 비우기, 필요하면 VACUUM)
+COMPACT_EVERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS row_images (
+    row_key     TEXT NOT NULL,
+    position    INTEGER NOT NULL,   -- 0 = 대표 사진
+    fname       TEXT NOT NULL,
+    PRIMARY KEY (row_key, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_info (
+    name        TEXT PRIMARY KEY,
+    value       TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _read_legacy(path: Path) -> Optional[Dict[str, List[str]]]:
+    """
+    meta.json → {행 키: [파일명, ...]}. 파일 자체를 읽지 못하면(깨짐/잘림) None.
+    행 번호가 아닌 키나 목록이 아닌 값은 그 항목만 건너뛴다.
+    """
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            rows = json.load(f).get("rows", {})
+        items = list(rows.items())
+    except (OSError, IOError, json.JSONDecodeError, ValueError, TypeError, AttributeError):
+        return None
+
+    out: Dict[str, List[str]] = {}
+    skipped = 0
+    for k, v in items:
+        try:
+            key = str(int(k))
+        except (ValueError, TypeError):
+            skipped += 1
+            continue
+        if not isinstance(v, list):
+            skipped += 1
+            continue
+        if v:
+            out[key] = [str(x) for x in v]
+    if skipped:
+        print(f"[사진 목록] {path.name}: 알 수 없는 항목 {skipped}개는 건너뜀")
+    return out
+
+
+class ImageMetaStore:
+    """
+    송장 폴더 하나의 행 → 사진 목록.
+    DB 파일은 처음 쓸 때(또는 meta.json 을 옮길 때) 만든다 → 사진이 없는 송장은 폴더를 만들지 않음.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self.db_path = self.base_dir / META_DB_NAME
+        self.legacy_path = self.base_dir / LEGACY_META_NAME
+        self.conn: Optional[sqlite3.Connection] = None
+
+    # ------------------------------------------------------------------
+    # 열기 / 복구 / 옮겨 담기
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                self.conn = self._open()
+            except sqlite3.DatabaseError as e:
+                self._set_aside(e)
+                self.conn = self._open()
+        return self.conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise sqlite3.DatabaseError("quick_check 실패")
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _set_aside(self, error: Exception) -> None:
+        """깨진 DB(와 WAL/SHM)를 옆으로 치움. 새 DB 는 meta.json(있으면)에서 다시 채워진다."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        for suffix in ("", "-wal", "-shm"):
+            p = self.db_path.with_name(self.db_path.name + suffix)
+            if p.exists():
+                p.replace(p.with_name(f"{p.name}.corrupt-{stamp}"))
+        print(f"[사진 목록] {self.db_path} 를 읽지 못해 새로 만듭니다: {error}")
+
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        """DB 가 비어 있고 meta.json 이 있으면 한 번 옮겨 담는다."""
+        legacy = self.legacy_path
+        if not legacy.is_file():
+            migrated = legacy.with_name(legacy.name + ".migrated")
+            if not migrated.is_file() or conn.execute("SELECT 1 FROM store_info WHERE name='migrated'").fetchone():
+                return
+            legacy = migrated      # DB 를 치운 뒤 복구: 예전에 옮겨 담았던 meta.json 에서 다시
+        rows = _read_legacy(legacy)
+        if rows is None:
+            # 깨진 meta.json 은 그대로 두고 옮긴 것으로 치지 않는다 (다음에 열 때 다시 시도, 손으로 고칠 수 있게)
+            print(f"[사진 목록] {legacy} 를 읽지 못해 옮기지 않았습니다")
+            return
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO row_images (row_key, position, fname) VALUES (?, ?, ?)",
+                ((key, pos, fname) for key, files in rows.items() for pos, fname in enumerate(files)),
+            )
+            conn.execute("INSERT OR REPLACE INTO store_info (name, value) VALUES ('migrated', ?)", (str(time.time()),))
+        if legacy == self.legacy_path:
+            legacy.replace(legacy.with_name(legacy.name + ".migrated"))
+        print(f"[사진 목록] meta.json → {META_DB_NAME} ({len(rows)}행)")
+
+    # ------------------------------------------------------------------
+    # 읽기 / 쓰기
+    # ------------------------------------------------------------------
+    def load(self) -> Dict[str, List[str]]:
+        """전체 {행 키: [파일명, ...]} (대표 사진이 맨 앞). 저장된 것이 없으면 빈 dict."""
+        if self.conn is None and not self.db_path.exists() and not self.legacy_path.is_file():
+            return {}
+        conn = self._connect()
+        self._migrate_legacy(conn)
+        rows: Dict[str, List[str]] = {}
+        for key, fname in conn.execute("SELECT row_key, fname FROM row_images ORDER BY row_key, position"):
+            rows.setdefault(key, []).append(fname)
+        return rows
+
+    def set_row(self, row_key: str, files: List[str]) -> None:
+        """행 하나의 사진 목록을 통째로 바꾼다 (빈 목록이면 삭제). 트랜잭션 하나."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM row_images WHERE row_key = ?", (row_key,))
+            conn.executemany(
+                "INSERT INTO row_images (row_key, position, fname) VALUES (?, ?, ?)",
+                ((row_key, pos, fname) for pos, fname in enumerate(files)),
+            )
+            writes = self._bump_writes(conn)
+        if writes >= COMPACT_EVERY:
+            self.compact()
+
+    def rename_rows(self, renames: Dict[str, str]) -> None:
+        """행 키 바꾸기 {예전 키: 새 키} (한 트랜잭션). 새 키에는 사진이 없어야 한다."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE row_images SET row_key = ? WHERE row_key = ?",
+                             ((new, old) for old, new in renames.items()))
+            self._bump_writes(conn)
+
+    def _bump_writes(self, conn: sqlite3.Connection) -> int:
+        conn.execute(
+            "INSERT INTO store_info (name, value) VALUES ('writes', '1') "
+            "ON CONFLICT (name) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        return int(conn.execute("SELECT value FROM store_info WHERE name = 'writes'").fetchone()[0])
+
+    def compact(self) -> None:
+        """WAL 내용을 DB 에 합치고 WAL 파일을 비운다. 빈 페이지가 1/4 을 넘으면 VACUUM."""
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE store_info SET value = '0' WHERE name = 'writes'")
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if pages and free * 4 > pages:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.DatabaseError:
+                pass
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,572 @@
+# invoice_consolidate.py
+# 네이버·쿠팡 주문 엑셀(DataFrame) → 송장발부 / 송장발부_전체 / 발송처리 DataFrame 변환.
+# Qt 없이 동작하는 순수 pandas 엔진 (ExcelCalWindow.my_naver / my_coopang 에서 사용)
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Callable
+
+import numpy as np
+import pandas as pd
+
+from order_history import OrderHistory, normalize_buyer_keys
+from xlsx_stream import SharedStrings, write_xlsx
+
+
+# ---------------------------------------------------------------------------
+# 공통 컬럼명 (송장발부 양식)
+# ---------------------------------------------------------------------------
+
+COL_NAME = "받으시는 분"
+COL_PHONE = "받으시는 분 전화"
+COL_MOBILE = "받는분핸드폰"
+COL_ITEM = "품목명"
+COL_QTY = "수량"
+COL_NOTE = "특기사항"
+COL_YEAR_COUNT = "1년 주문건수"
+COL_MEMO = "메모1"
+COL_ADDR = "기본배송지"
+COL_ADDR_DETAIL = "상세배송지"
+COL_ZIP = "받는분우편번호"
+COL_BUYER = "구매자명"
+COL_BUYER_PHONE = "구매자연락처"
+COL_BUNDLE = "출고번호"
+COL_PRODUCT_ORDER = "상품주문번호"
+COL_FARE = "운임Type"
+COL_PAY = "지불조건"
+COL_ENGRAVE = "각인"
+COL_BUY_TIME = "주문일시"
+COL_OPTION = "상품옵션명"
+
+# 발송처리 양식
+COL_SHIP_METHOD = "배송방법"
+COL_COURIER = "택배사"
+COL_TRACKING = "송장번호"
+
+# 품목명 표시 줄 수 (넘으면 앞 8줄 + "." "." "^_~" 로 줄임)
+TITLE_DISPLAY_COUNT = 11
+
+MEMO_PREFIXES = ("여기에 문구:", "여기에 각인 문구:")
+
+# 진행률 콜백 간격 (묶음 수)
+PROGRESS_CHUNK = 200
+
+# progress(묶음 완료, 전체 묶음, 처리 행)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+# ---------------------------------------------------------------------------
+# 채널 정의
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ChannelSpec:
+    name: str                               # "naver" / "coupang"
+    label: str                              # 파일명 접두어 ("네이버" / "쿠팡")
+    constants: Dict[str, str]               # rename 전에 고정값으로 채우는 컬럼
+    rename: Dict[str, str]                  # 원본 컬럼 → 송장발부 컬럼
+    work_columns: List[str]                 # 묶음 계산에 쓰는 컬럼 (rename 후)
+    invoice_columns: List[str]              # 송장발부 최종 컬럼 순서
+    invoice_str_columns: List[str]          # 저장 직전에 문자열로 바꾸는 컬럼
+    option_column: Optional[str] = None     # 쿠팡: "옵션명:" 을 문구 앞에 붙임
+    year_count_line: bool = False           # 네이버: 각인 맨 위에 "1년 주문건수 : N건"
+    send_source: Dict[str, str] = field(default_factory=dict)   # 발송처리: rename 후 컬럼 → 출력 컬럼
+    send_columns: List[str] = field(default_factory=list)       # 발송처리 최종 컬럼 순서
+    send_str_columns: List[str] = field(default_factory=list)
+    password_protected: bool = False        # 네이버 다운로드는 비밀번호 걸린 엑셀
+    text_columns: List[str] = field(default_factory=list)      # 원본 컬럼 중 문자열로 읽을 것 (주문번호/전화번호)
+    processed_key: str = COL_PRODUCT_ORDER  # 이미 변환한 주문을 가려내는 키 (rename 후 컬럼)
+
+    def raw_column(self, col: str) -> str:
+        """rename 후 컬럼명 → 다운로드 엑셀의 원본 컬럼명"""
+        back = {v: k for k, v in self.rename.items()}
+        return back.get(col, col)
+
+    def source_columns(self) -> List[str]:
+        """
+        다운로드 엑셀에서 실제로 읽어야 하는 원본 컬럼명 (읽기 단계 usecols 용).
+        고정값으로 채우는 컬럼 / 각인 컬럼은 읽지 않는다.
+        """
+        back = {v: k for k, v in self.rename.items()}
+        cols: List[str] = []
+        for c in list(self.work_columns) + list(self.send_source):
+            if c in self.constants or c == COL_ENGRAVE:
+                continue
+            raw = back.get(c, c)
+            if raw not in cols:
+                cols.append(raw)
+        return cols
+
+    def source_dtypes(self) -> Dict[str, type]:
+        """
+        읽기 단계 dtype 스키마. 주문번호/전화번호는 숫자로 읽으면 앞자리 0 이 빠지거나
+        16자리 이상에서 float 로 바뀌어 자리수가 깨지므로 처음부터 문자열로 읽는다.
+        """
+        return {c: str for c in self.text_columns}
+
+
+NAVER = ChannelSpec(
+    name="naver",
+    label="네이버",
+    constants={COL_FARE: "s", COL_PAY: "신용", COL_COURIER: "한진택배"},
+    rename={
+        "수취인명": COL_NAME,
+        "수취인연락처1": COL_PHONE,
+        "수취인연락처2": COL_MOBILE,
+        "상품명": COL_ITEM,
+        "배송메세지": COL_NOTE,
+        "1년 주문건수": COL_YEAR_COUNT,
+        "옵션정보": COL_MEMO,
+        "우편번호": COL_ZIP,
+        "구매자명": COL_BUYER,
+        "구매자연락처": COL_BUYER_PHONE,
+        "주문번호": COL_BUNDLE,
+        "상품주문번호": COL_PRODUCT_ORDER,
+    },
+    work_columns=[
+        COL_NAME, COL_PHONE, COL_MOBILE, COL_ITEM, COL_QTY, COL_NOTE, COL_YEAR_COUNT, COL_MEMO,
+        COL_ADDR, COL_ADDR_DETAIL, COL_ZIP, COL_BUYER, COL_BUYER_PHONE, COL_BUNDLE,
+        COL_PRODUCT_ORDER, COL_FARE, COL_PAY, COL_ENGRAVE, COL_BUY_TIME,
+    ],
+    invoice_columns=[
+        COL_NAME, COL_PHONE, COL_MOBILE, COL_ITEM, COL_QTY, COL_NOTE, COL_YEAR_COUNT,
+        COL_ADDR, COL_ADDR_DETAIL, COL_ZIP, COL_BUYER, COL_BUYER_PHONE, COL_BUNDLE,
+        COL_PRODUCT_ORDER, COL_FARE, COL_PAY, COL_ENGRAVE, COL_BUY_TIME,
+    ],
+    invoice_str_columns=[COL_ITEM, COL_BUNDLE, COL_PRODUCT_ORDER, COL_BUY_TIME],
+    year_count_line=True,
+    send_source={
+        COL_PRODUCT_ORDER: COL_PRODUCT_ORDER,
+        COL_SHIP_METHOD: COL_SHIP_METHOD,
+        COL_COURIER: COL_COURIER,
+        COL_TRACKING: COL_TRACKING,
+        COL_NAME: "수취인명",
+        COL_BUNDLE: COL_BUNDLE,
+    },
+    send_columns=[
+        COL_PRODUCT_ORDER, COL_SHIP_METHOD, COL_COURIER, COL_TRACKING, "수취인명",
+        "비고", COL_BUNDLE, "출고번호넣기", "운송장번호",
+    ],
+    send_str_columns=[COL_PRODUCT_ORDER, COL_BUNDLE],
+    password_protected=True,
+    text_columns=["주문번호", "상품주문번호", "수취인연락처1", "수취인연락처2", "구매자연락처"],
+)
+
+COUPANG = ChannelSpec(
+    name="coupang",
+    label="쿠팡",
+    constants={COL_FARE: "s", COL_PAY: "신용"},
+    rename={
+        "수취인이름": COL_NAME,
+        "수취인전화번호": COL_MOBILE,
+        "등록옵션명": COL_ITEM,
+        "구매수(수량)": COL_QTY,
+        "배송메세지": COL_NOTE,
+        "수취인 주소": COL_ADDR,
+        "주문자 추가메시지": COL_MEMO,
+        "우편번호": COL_ZIP,
+        "구매자": COL_BUYER,
+        "구매자전화번호": COL_BUYER_PHONE,
+        "묶음배송번호": COL_BUNDLE,
+        "주문번호": COL_PRODUCT_ORDER,
+        "최초등록등록상품명/옵션명": COL_OPTION,
+    },
+    work_columns=[
+        COL_NAME, COL_MOBILE, COL_ITEM, COL_QTY, COL_NOTE, COL_MEMO, COL_ADDR, COL_ZIP,
+        COL_BUYER, COL_BUYER_PHONE, COL_BUNDLE, COL_PRODUCT_ORDER, COL_FARE, COL_PAY,
+        COL_ENGRAVE, COL_OPTION,
+    ],
+    invoice_columns=[
+        COL_NAME, COL_PHONE, COL_MOBILE, COL_ITEM, COL_QTY, COL_NOTE, COL_YEAR_COUNT,
+        COL_ADDR, COL_ADDR_DETAIL, COL_ZIP, COL_BUYER, COL_BUYER_PHONE, COL_BUNDLE,
+        COL_PRODUCT_ORDER, COL_FARE, COL_PAY, COL_ENGRAVE,
+    ],
+    invoice_str_columns=[COL_ITEM, COL_BUNDLE, COL_PRODUCT_ORDER],
+    option_column=COL_OPTION,
+    processed_key=COL_BUNDLE,
+    text_columns=["묶음배송번호", "주문번호", "수취인전화번호", "구매자전화번호"],
+)
+
+CHANNELS: Dict[str, ChannelSpec] = {NAVER.name: NAVER, COUPANG.name: COUPANG}
+
+
+@dataclass
+class ConsolidateResult:
+    invoice: pd.DataFrame                   # 송장발부 (품목명 줄임 버전)
+    send: Optional[pd.DataFrame]            # 발송처리 (네이버만)
+    rows: int                               # 입력 주문 행 수
+    groups: int                             # 출고번호 묶음 수
+    timings: Dict[str, float] = field(default_factory=dict)    # 단계별 소요 시간(초)
+    write_timings: Dict[str, float] = field(default_factory=dict)  # 파일별 저장 시간(초)
+    skipped_rows: int = 0                   # 전에 변환해서 건너뛴 행 수 (processed_index)
+    repeat_buyers: int = 0                  # 최근 1년 주문건수 2건 이상인 묶음 수 (주문 이력 사용 시)
+
+    @property
+    def invoice_full(self) -> pd.DataFrame:
+        """송장발부_전체 (품목명 = 각인 전체 문구). 저장할 때는 복사본 없이 컬럼만 바꿔 쓴다."""
+        return self.invoice.assign(**{COL_ITEM: self.invoice[COL_ENGRAVE]})
+
+
+class ConsolidateCancelled(Exception):
+    """consolidate() 도중 is_cancelled() 가 True 를 돌려준 경우."""
+
+
+# ---------------------------------------------------------------------------
+# 내부 헬퍼
+# ---------------------------------------------------------------------------
+
+def _as_text(s: pd.Series) -> pd.Series:
+    """
+    셀 값을 str() 한 것과 같은 문자열로 바꾼다.
+    (object 로 먼저 바꿔야 2 → "2", 2.0 → "2.0", Timestamp → "YYYY-mm-dd HH:MM:SS" 가 원래 루프와 같다)
+    읽을 때 스키마(source_dtypes)로 이미 문자열이면 그대로 돌려준다.
+    """
+    if s.dtype == object and pd.api.types.infer_dtype(s, skipna=False) == "string":
+        return s
+    return s.astype(object).astype(str)
+
+
+def _prepare(df_raw: pd.DataFrame, spec: ChannelSpec) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """고정값 컬럼 추가 + rename 한 전체 프레임과, 묶음 계산용 컬럼만 뽑은 프레임을 돌려준다."""
+    df = df_raw.copy()
+    for col, value in spec.constants.items():
+        df[col] = value
+    df = df.rename(columns=spec.rename)
+    df[COL_ENGRAVE] = ""
+
+    missing = [c for c in spec.work_columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"[{spec.label}] 엑셀에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+
+    work = df[spec.work_columns].infer_objects().reset_index(drop=True)
+
+    if work[COL_BUNDLE].isna().any():
+        n_missing = int(work[COL_BUNDLE].isna().sum())
+        raise ValueError(f"[{spec.label}] 출고번호가 비어 있는 행이 {n_missing}개 있습니다.")
+    return df, work
+
+
+def _build_lines(work: pd.DataFrame, spec: ChannelSpec, seq: pd.Series) -> pd.Series:
+    """
+    행마다 "N. 문구=> 수량 ea" 한 줄을 만든다.
+    - 메모1(옵션정보/추가메시지)이 있으면 안내 문구를 지운 메모, 없으면 품목명
+    - 쿠팡은 앞에 "옵션명:" 을 붙인다.
+    """
+    memo = work[COL_MEMO]
+    has_memo = memo.notna()
+    memo_text = _as_text(memo)
+    for prefix in MEMO_PREFIXES:
+        memo_text = memo_text.str.replace(prefix, "", regex=False)
+
+    body = work[COL_ITEM].astype(object).where(~has_memo, memo_text)
+    if spec.option_column:
+        body = work[spec.option_column].astype(object) + ":" + body
+
+    return seq.astype(str) + ". " + body + "=> " + _as_text(work[COL_QTY]) + " ea"
+
+
+def _shorten(text: str, header: str) -> str:
+    lines = text.split("\n")
+    if len(lines) < TITLE_DISPLAY_COUNT + 1:
+        return header + text
+    kept = lines[:TITLE_DISPLAY_COUNT - 3] + [".", ".", "^_~"]
+    return header + "\n".join(kept)
+
+
+def _record_history(work: pd.DataFrame, spec: ChannelSpec, history: OrderHistory) -> Dict[str, int]:
+    """이번 주문을 이력에 기록하고 {구매자 키: 최근 1년 주문건수} 를 돌려준다."""
+    return history.record_and_count(
+        spec.name,
+        order_keys=_as_text(work[COL_PRODUCT_ORDER]),
+        bundles=_as_text(work[COL_BUNDLE]),
+        buyer_keys=normalize_buyer_keys(work[COL_BUYER], work[COL_BUYER_PHONE]),
+        ordered_at=work[COL_BUY_TIME] if COL_BUY_TIME in work.columns else None,
+    )
+
+
+def _apply_year_counts(frame: pd.DataFrame, spec: ChannelSpec, counts: Dict[str, int]) -> int:
+    """
+    묶음 대표 행 frame 에 1년 주문건수를 채우고(엑셀에 없는 채널만, 구매자 정보가 없으면 빈 칸)
+    2건 이상인 묶음 수를 돌려준다.
+    """
+    if COL_YEAR_COUNT not in spec.work_columns:
+        keys = normalize_buyer_keys(frame[COL_BUYER], frame[COL_BUYER_PHONE])
+        frame[COL_YEAR_COUNT] = [counts.get(k) for k in keys.tolist()]
+    return int(np.count_nonzero(pd.to_numeric(frame[COL_YEAR_COUNT], errors="coerce") > 1))
+
+
+def _build_send(df: pd.DataFrame, spec: ChannelSpec, order: np.ndarray) -> pd.DataFrame:
+    """발송처리: 출고번호 묶음 순서대로(order = 묶음 순 안정 정렬 위치) 원본 행을 모두 나열."""
+    src = df[list(spec.send_source)].rename(columns=spec.send_source).reset_index(drop=True)
+    send = src.take(order).reset_index(drop=True).astype(object)
+    send = send.reindex(columns=spec.send_columns)
+    for col in spec.send_str_columns:
+        send[col] = _as_text(send[col])
+    return send
+
+
+# ---------------------------------------------------------------------------
+# 메인 엔진
+# ---------------------------------------------------------------------------
+
+def _check_cancel(is_cancelled: Optional[Callable[[], bool]]) -> None:
+    if is_cancelled is not None and is_cancelled():
+        raise ConsolidateCancelled("사용자가 작업을 취소했습니다.")
+
+
+def consolidate(
+    df_raw: pd.DataFrame,
+    spec: ChannelSpec,
+    progress: Optional[ProgressCallback] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    history: Optional[OrderHistory] = None,
+) -> ConsolidateResult:
+    """
+    출고번호 기준으로 주문 행을 묶어서 송장발부 한 줄씩 만든다.
+    - groupby('출고번호', sort=False) 한 번으로 묶음 순서(처음 나온 순서) 결정
+    - 묶음별 문구는 "\\n".join, 합계 수량은 groupby.sum
+    - 묶음 대표 행(첫 행)의 나머지 컬럼은 그대로 사용
+    - progress(묶음 완료, 전체 묶음, 처리 행) 을 PROGRESS_CHUNK 묶음마다 호출
+    - is_cancelled() 가 True 면 ConsolidateCancelled 예외
+    - history(주문 이력)를 주면 주문을 기록하고, 엑셀에 1년 주문건수가 없는 채널(쿠팡)은
+      이력으로 계산해서 채운다. (네이버는 다운로드 엑셀 값을 그대로 씀)
+    """
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+
+    df, work = _prepare(df_raw, spec)
+    keys = work[COL_BUNDLE]
+    codes, _ = pd.factorize(keys, sort=False)
+    grouped = work.groupby(codes, sort=False)
+
+    # 출고번호 해시는 factorize 한 번만: 이후 묶음/합계/대표 행/발송처리 모두 codes 로 처리
+    lines = _build_lines(work, spec, grouped.cumcount() + 1)
+    totals = work[COL_QTY].map(int).groupby(codes, sort=False).sum()
+    order = np.argsort(codes, kind="stable")
+    bounds_arr = np.cumsum(np.bincount(codes))
+    first_pos = order[np.concatenate(([0], bounds_arr[:-1]))] if len(order) else order
+    first = work.take(first_pos).reset_index(drop=True).astype(object)
+    timings["준비"] = time.perf_counter() - t0
+
+    repeat_buyers = 0
+    if history is not None:
+        t0 = time.perf_counter()
+        repeat_buyers = _apply_year_counts(first, spec, _record_history(work, spec, history))
+        timings["주문이력"] = time.perf_counter() - t0
+    _check_cancel(is_cancelled)
+
+    # 묶음별 문구 합치기: 출고번호 순으로 줄을 모아 놓고 경계(bounds)로 잘라 join
+    t0 = time.perf_counter()
+    sorted_lines: List[str] = lines.to_numpy()[order].tolist()
+    bounds = bounds_arr.tolist()
+    total_list: List[int] = totals.tolist()
+    n_groups = len(bounds)
+
+    full_text: List[str] = []
+    start = 0
+    for g, end in enumerate(bounds):
+        full_text.append("\n".join(sorted_lines[start:end]))
+        start = end
+        if (g + 1) % PROGRESS_CHUNK == 0 or g + 1 == n_groups:
+            _check_cancel(is_cancelled)
+            if progress is not None:
+                progress(g + 1, n_groups, end)
+
+    headers = [f"[hobby brown] total => {t} ea\n\n" for t in total_list]
+    engrave = [h + t for h, t in zip(headers, full_text)]
+    if spec.year_count_line:
+        year_counts = _as_text(first[COL_YEAR_COUNT]).tolist()
+        engrave = [f"1년 주문건수 : {y}건\n" + e for y, e in zip(year_counts, engrave)]
+
+    first[COL_ITEM] = [_shorten(t, h) for t, h in zip(full_text, headers)]
+    first[COL_ENGRAVE] = engrave
+    first[COL_QTY] = 1
+
+    invoice = first.reindex(columns=spec.invoice_columns)
+    for col in spec.invoice_str_columns:
+        invoice[col] = _as_text(invoice[col])
+
+    timings["묶음"] = time.perf_counter() - t0
+    _check_cancel(is_cancelled)
+
+    send = None
+    if spec.send_columns:
+        t0 = time.perf_counter()
+        send = _build_send(df, spec, order)
+        timings["발송처리"] = time.perf_counter() - t0
+
+    return ConsolidateResult(
+        invoice=invoice,
+        send=send,
+        rows=len(work),
+        groups=len(first),
+        timings=timings,
+        repeat_buyers=repeat_buyers,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 여러 코어로 나눠서 묶기
+# ---------------------------------------------------------------------------
+
+def _consolidate_shard(df_shard: pd.DataFrame, spec: ChannelSpec) -> ConsolidateResult:
+    """프로세스 풀 작업 단위 (모듈 최상위 함수라 피클 가능)"""
+    return consolidate(df_shard, spec)
+
+
+def consolidate_sharded(
+    df_raw: pd.DataFrame,
+    spec: ChannelSpec,
+    workers: int,
+    progress: Optional[ProgressCallback] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    history: Optional[OrderHistory] = None,
+) -> ConsolidateResult:
+    """
+    consolidate 와 같은 결과를 여러 프로세스로 나눠서 만든다.
+    - 출고번호를 factorize 한 번호(처음 나온 순서)로 workers 개 조각에 나눔 → 같은 출고번호는 같은 조각
+    - 조각마다 ProcessPoolExecutor 에서 consolidate, 결과를 처음 나온 묶음 순서로 다시 합침
+      (조각 안의 묶음 순서는 전체 순서를 그대로 따르므로 번호로 안정 정렬만 하면 됨)
+    - 주문 이력(sqlite)은 프로세스 사이에 넘길 수 없어 합친 뒤 여기서 한 번에 처리
+    - progress(묶음 완료, 전체 묶음, 처리 행) 는 조각이 끝날 때마다
+    workers <= 1 이거나 나눠지는 조각이 2개 미만이면 (빈 입력 포함) consolidate 그대로.
+    """
+    if workers <= 1:
+        return consolidate(df_raw, spec, progress=progress, is_cancelled=is_cancelled, history=history)
+
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    bundle_col = spec.raw_column(COL_BUNDLE)
+    if bundle_col not in df_raw.columns:
+        raise ValueError(f"[{spec.label}] 엑셀에 필요한 컬럼이 없습니다: {bundle_col}")
+    codes, uniques = pd.factorize(df_raw[bundle_col], sort=False)
+    n_groups = len(uniques)
+    shard_of_row = codes % workers
+    shards = []
+    for k in range(workers):
+        mask = shard_of_row == k
+        if not mask.any():
+            continue
+        shard_codes = codes[mask]
+        groups = np.unique(shard_codes)         # 조각 안의 묶음 = 전체 묶음 번호 오름차순
+        sizes = np.bincount(shard_codes)[groups]
+        shards.append((df_raw[mask], groups, sizes))
+    if len(shards) < 2:
+        # 빈 입력(이미 처리한 주문을 모두 건너뛴 재실행 등)이나 묶음이 한 조각에 다 들어가면 나눌 것이 없음
+        return consolidate(df_raw, spec, progress=progress, is_cancelled=is_cancelled, history=history)
+    timings["분할"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    parts: List[Optional[ConsolidateResult]] = [None] * len(shards)
+    groups_done = rows_done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        futures = {pool.submit(_consolidate_shard, df_shard, spec): i for i, (df_shard, _, _) in enumerate(shards)}
+        try:
+            for fut in as_completed(futures):
+                i = futures[fut]
+                parts[i] = fut.result()
+                groups_done += parts[i].groups
+                rows_done += parts[i].rows
+                if progress is not None:
+                    progress(groups_done, n_groups, rows_done)
+                _check_cancel(is_cancelled)
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+    timings["묶음(병렬)"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    group_order = np.argsort(np.concatenate([g for _, g, _ in shards]), kind="stable")
+    invoice = pd.concat([p.invoice for p in parts], ignore_index=True).take(group_order).reset_index(drop=True)
+
+    send = None
+    if spec.send_columns:
+        row_groups = np.concatenate([np.repeat(g, n) for _, g, n in shards])
+        row_order = np.argsort(row_groups, kind="stable")
+        send = pd.concat([p.send for p in parts], ignore_index=True).take(row_order).reset_index(drop=True)
+    timings["병합"] = time.perf_counter() - t0
+
+    repeat_buyers = 0
+    if history is not None:
+        t0 = time.perf_counter()
+        _, work = _prepare(df_raw, spec)
+        repeat_buyers = _apply_year_counts(invoice, spec, _record_history(work, spec, history))
+        timings["주문이력"] = time.perf_counter() - t0
+
+    return ConsolidateResult(
+        invoice=invoice,
+        send=send,
+        rows=len(df_raw),
+        groups=n_groups,
+        timings=timings,
+        repeat_buyers=repeat_buyers,
+    )
+
+
+def consolidate_naver(df_raw: pd.DataFrame, **kwargs) -> ConsolidateResult:
+    return consolidate(df_raw, NAVER, **kwargs)
+
+
+def consolidate_coupang(df_raw: pd.DataFrame, **kwargs) -> ConsolidateResult:
+    return consolidate(df_raw, COUPANG, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# 결과 저장
+# ---------------------------------------------------------------------------
+
+def output_paths(spec: ChannelSpec, out_dir: str, stamp: str) -> Dict[str, str]:
+    """
+    결과 파일 경로. stamp 는 기존과 같이 "17d_09h05m" 형식.
+    (키: "invoice" / "invoice_full" / "send")
+    """
+    paths = {
+        "invoice": os.path.join(out_dir, f"{stamp}{spec.label}_송장발부.xlsx"),
+        "invoice_full": os.path.join(out_dir, f"{stamp}{spec.label}_송장발부_전체.xlsx"),
+    }
+    if spec.send_columns:
+        paths["send"] = os.path.join(out_dir, f"{stamp}{spec.label}_발송처리.xlsx")
+    return paths
+
+
+def write_result(
+    result: ConsolidateResult, spec: ChannelSpec, out_dir: str, stamp: str
+) -> Dict[str, str]:
+    """
+    송장발부 / 송장발부_전체 / (네이버) 발송처리 엑셀 저장.
+    - xlsx_stream 으로 행을 스트리밍해서 쓰고, 세 파일을 스레드로 동시에 쓴다 (zip 압축은 GIL 을 놓음)
+    - 송장발부 두 파일은 공유 문자열 표를 한 번만 만들어 같이 쓰고,
+      _전체 는 DataFrame 복사 없이 품목명 자리에 각인 컬럼을 써서 만든다
+    전체 저장 시간은 result.timings["저장"], 파일별 시간은 result.write_timings.
+    """
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    paths = output_paths(spec, out_dir, stamp)
+    invoice_strings = SharedStrings.from_frames([result.invoice])
+
+    jobs = {
+        "invoice": lambda: write_xlsx(paths["invoice"], result.invoice, shared=invoice_strings),
+        "invoice_full": lambda: write_xlsx(
+            paths["invoice_full"], result.invoice, shared=invoice_strings, replace={COL_ITEM: COL_ENGRAVE}
+        ),
+    }
+    if "send" in paths and result.send is not None:
+        jobs["send"] = lambda: write_xlsx(paths["send"], result.send, sheet_name="발송처리")
+
+    def timed(key: str) -> float:
+        start = time.perf_counter()
+        jobs[key]()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {key: pool.submit(timed, key) for key in jobs}
+        for key, fut in futures.items():
+            result.write_timings[key] = fut.result()
+
+    result.timings["저장"] = time.perf_counter() - t0
+    for key, seconds in result.write_timings.items():
+        print(f"[저장] {os.path.basename(paths[key])}: {seconds:.2f}초")
+    return paths
@@ -0,0 +1,278 @@
+# invoice_io.py
+# 네이버·쿠팡 주문 엑셀 읽기 (Qt 없이 동작)
+# - 네이버: 비밀번호 걸린 엑셀 (msoffcrypto 로 복호화 후 첫 줄 건너뛰고 읽기)
+# - 쿠팡: 비밀번호 없는 엑셀 (시트가 여러 개면 프로세스 풀로 시트마다 따로 읽어서 합침)
+# - 읽은 결과는 frame_cache 에 저장해 두고, 같은 파일을 다시 열면 엑셀 파싱 없이 바로 읽음
+# - 실제 파싱은 excel_readers (calamine 이 있으면 calamine, .csv/.tsv 는 read_csv) 가 확장자로 골라서
+
+import hashlib
+import os
+import threading
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, List, Dict
+
+import pandas as pd
+
+try:
+    import psutil     # 프로세스 RSS 측정용 (없으면 리눅스 /proc 만)
+    _HAS_PSUTIL = True
+except ImportError:
+    psutil = None
+    _HAS_PSUTIL = False
+
+from decrypt_cache import get_default_cache, open_decrypted_mmap
+from excel_readers import is_delimited, pick_backend, read_table, sheet_names
+from frame_cache import cached_read, reader_key
+from invoice_consolidate import ChannelSpec
+
+
+# 네이버 주문 엑셀 기본 비밀번호
+NAVER_DEFAULT_PASSWORD = "1111"
+
+# 여러 시트를 합칠 때 원래 시트 이름을 적는 컬럼
+COL_SHEET = "시트"
+
+
+class MissingColumnsError(ValueError):
+    """다운로드 엑셀에 필수 컬럼(헤더)이 없을 때."""
+
+    def __init__(self, missing: List[str], where: str = ""):
+        self.missing = list(missing)
+        where_txt = f" ({where})" if where else ""
+        super().__init__(f"엑셀에 필요한 컬럼이 없습니다{where_txt}: {', '.join(self.missing)}")
+
+
+# ---------------------------------------------------------------------------
+# 내부 헬퍼
+# ---------------------------------------------------------------------------
+
+def _usecols_arg(usecols: Optional[List[str]]):
+    """
+    pd.read_excel 의 usecols 인자.
+    이름 목록을 그대로 넘기면 없는 컬럼이 하나라도 있을 때 pandas 오류 문구가 알아보기 어려워서,
+    필요한 컬럼만 골라 읽고 빠진 컬럼은 _check_columns 에서 한 번에 알려준다.
+    """
+    if usecols is None:
+        return None
+    wanted = set(usecols)
+    return lambda c: str(c).strip() in wanted
+
+
+def _check_columns(df: pd.DataFrame, usecols: Optional[List[str]], where: str) -> pd.DataFrame:
+    if usecols is None:
+        return df
+    df = df.rename(columns=lambda c: str(c).strip())
+    missing = [c for c in usecols if c not in df.columns]
+    if missing:
+        raise MissingColumnsError(missing, where)
+    return df
+
+
+# 프로세스 RSS 를 재는 간격(초)
+RSS_SAMPLE_SECONDS = 0.01
+
+
+class MemoryPeak:
+    """
+    peak_memory() 가 채워 주는 측정 결과 (MB, 블록 시작 시점 대비 늘어난 최고치).
+    - peak_mb: 파이썬 힙 (tracemalloc) — numpy/pandas 버퍼 포함, mmap 페이지·C 라이브러리 버퍼는 빠짐
+    - rss_peak_mb: 프로세스 RSS (mmap 으로 읽은 페이지, 복호화 버퍼 등 포함). 잴 수 없으면 None
+    """
+
+    def __init__(self):
+        self.peak_mb = 0.0
+        self.rss_peak_mb: Optional[float] = None
+
+
+def _current_rss() -> Optional[int]:
+    """이 프로세스의 RSS(바이트). psutil 이 없으면 리눅스 /proc 만, 그 외에는 None."""
+    if _HAS_PSUTIL:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@contextmanager
+def peak_memory():
+    """
+    with 블록 안에서 늘어난 메모리의 최고치를 잰다. (블록 시작 시점 대비)
+    파이썬 힙은 tracemalloc, 프로세스 RSS 는 RSS_SAMPLE_SECONDS 마다 재는 스레드로.
+    (getrusage / 최대 작업 집합은 프로세스 시작부터의 최고치라 블록 단위로 나눌 수 없음)
+    시트를 읽는 자식 프로세스 메모리는 들어가지 않는다.
+    측정 중에는 할당마다 기록하느라 느려지므로 명령줄 --mem 처럼 필요할 때만 쓴다.
+    """
+    result = MemoryPeak()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    rss_base = _current_rss()
+    rss_peak = [rss_base or 0]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(RSS_SAMPLE_SECONDS):
+            rss_peak[0] = max(rss_peak[0], _current_rss() or 0)
+
+    sampler = threading.Thread(target=sample, daemon=True) if rss_base is not None else None
+    if sampler is not None:
+        sampler.start()
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        result.peak_mb = max(peak - base, 0) / (1024 * 1024)
+        if started:
+            tracemalloc.stop()
+        if sampler is not None:
+            stop.set()
+            sampler.join()
+            rss_peak[0] = max(rss_peak[0], _current_rss() or 0)
+            result.rss_peak_mb = max(rss_peak[0] - rss_base, 0) / (1024 * 1024)
+
+
+# ---------------------------------------------------------------------------
+# 읽기
+# ---------------------------------------------------------------------------
+
+def read_password_excel(
+    excel_path: str,
+    password: str,
+    usecols: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, type]] = None,
+) -> pd.DataFrame:
+    """
+    비밀번호 걸린 엑셀을 복호화해서 읽는다. (첫 줄은 안내 문구라 건너뜀)
+    usecols 를 주면 그 컬럼만 읽고, 없는 컬럼이 있으면 MissingColumnsError.
+    dtype 은 컬럼별 타입 스키마 (ChannelSpec.source_dtypes()).
+    복호화 결과는 파일(캐시 또는 임시 파일)로 스트리밍해서 mmap 으로 읽으므로
+    복호화된 엑셀 전체가 메모리에 bytes 로 올라오지 않는다.
+    캐시를 쓰면 같은 파일을 다시 열 때 복호화를 건너뛴다.
+    읽기 캐시(frame_cache)에 있으면 복호화·파싱 모두 건너뛴다. (키에 비밀번호 해시 포함)
+    """
+    def parse() -> pd.DataFrame:
+        if is_delimited(excel_path):
+            # CSV 로 저장한 파일은 암호가 없으므로 같은 모양(첫 줄 안내 문구)으로 바로 읽는다
+            df = read_table(excel_path, skiprows=[0], usecols=_usecols_arg(usecols), dtype=dtype)
+        else:
+            with open_decrypted_mmap(excel_path, password, get_default_cache()) as mm:
+                df = read_table(excel_path, source=mm, skiprows=[0], usecols=_usecols_arg(usecols), dtype=dtype)
+        return _check_columns(df, usecols, excel_path)
+
+    pw_hash = hashlib.sha256(password.encode("utf-8")).hexdigest()[:16]
+    key = reader_key("password_excel", backend=pick_backend(excel_path).name,
+                     usecols=usecols, dtype=dtype, password=pw_hash)
+    return cached_read(excel_path, key, parse)
+
+
+def _read_sheet(
+    file_name: str,
+    sheet_name: str,
+    usecols: Optional[List[str]],
+    dtype: Optional[Dict[str, type]],
+    backend: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    시트 1개 읽기. 빈 칸은 0 으로 채움 (문자열 컬럼은 "0").
+    프로세스 풀에서 호출되므로 모듈 최상위 함수이고, 인자는 모두 피클 가능한 값만 받는다.
+    backend 는 부모가 고른 백엔드 이름 (새로 뜬 프로세스에는 set_default_backend() 가 없으므로).
+    """
+    df = read_table(file_name, sheet_name=sheet_name, usecols=_usecols_arg(usecols), dtype=dtype,
+                    backend=backend)
+    df = _check_columns(df, usecols, f"{file_name} / {sheet_name}")
+    text_fill = {c: "0" for c, t in (dtype or {}).items() if t is str and c in df.columns}
+    return df.fillna(text_fill).fillna(0)
+
+
+def read_non_password_excel(
+    file_name: str,
+    usecols: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, type]] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    비밀번호 없는 엑셀의 모든 시트를 읽어서 하나로 합친다. (COL_SHEET 컬럼에 원래 시트 이름)
+    - 빈 칸은 0 으로 채움 (문자열 컬럼은 "0")
+    - usecols 를 주면 그 컬럼만 읽고, 그 컬럼이 없는 시트(안내/요약 시트 등)는 건너뜀
+    - 시트가 2개 이상이면 프로세스 풀에서 시트마다 따로 읽는다 (workers: 최대 프로세스 수,
+      기본 CPU 수, 1 이면 순서대로)
+    예전에는 마지막 시트만 돌려줘서 여러 시트로 나뉜 쿠팡 주문이 빠졌다.
+    읽기 캐시(frame_cache)에 있으면 파싱을 건너뛴다.
+    """
+    key = reader_key("non_password_excel", backend=pick_backend(file_name).name, usecols=usecols, dtype=dtype)
+    return cached_read(file_name, key, lambda: _parse_non_password_excel(file_name, usecols, dtype, workers))
+
+
+def _parse_non_password_excel(
+    file_name: str,
+    usecols: Optional[List[str]],
+    dtype: Optional[Dict[str, type]],
+    workers: Optional[int],
+) -> pd.DataFrame:
+    backend = pick_backend(file_name).name
+    names = sheet_names(file_name, backend)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(names)))
+
+    results = []
+    if workers == 1:
+        for sn in names:
+            try:
+                results.append((sn, _read_sheet(file_name, sn, usecols, dtype, backend), None))
+            except Exception as e:
+                results.append((sn, None, e))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(sn, pool.submit(_read_sheet, file_name, sn, usecols, dtype, backend)) for sn in names]
+            for sn, fut in futures:
+                try:
+                    results.append((sn, fut.result(), None))
+                except Exception as e:
+                    results.append((sn, None, e))
+
+    frames = []
+    first_error: Optional[Exception] = None
+    for sn, sheet_df, err in results:
+        if err is not None:
+            print("File read error:", sn, err)
+            first_error = first_error or err
+            continue
+        if sheet_df.empty:
+            continue
+        sheet_df.insert(len(sheet_df.columns), COL_SHEET, sn)
+        frames.append(sheet_df)
+
+    if not frames:
+        if isinstance(first_error, MissingColumnsError):
+            raise first_error
+        raise ValueError(f"읽을 수 있는 시트가 없습니다: {file_name}")
+
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    df.name = ", ".join(f[COL_SHEET].iat[0] for f in frames)
+    return df
+
+
+def read_channel_excel(
+    spec: ChannelSpec,
+    path: str,
+    password: Optional[str] = None,
+    sheet_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    채널에 맞는 방식으로 주문 엑셀을 읽는다. (네이버: 비밀번호 / 쿠팡: 비밀번호 없음, 모든 시트)
+    송장 변환에 쓰는 컬럼(spec.source_columns())만, 스키마(spec.source_dtypes())대로 읽는다.
+    sheet_workers: 여러 시트를 동시에 읽을 프로세스 수 (None 이면 CPU 수)
+    """
+    usecols = spec.source_columns()
+    dtype = spec.source_dtypes()
+    if spec.password_protected:
+        return read_password_excel(path, password or NAVER_DEFAULT_PASSWORD, usecols, dtype)
+    return read_non_password_excel(path, usecols, dtype, sheet_workers)
@@ -0,0 +1,171 @@
+# invoice_pages.py
+# 아주 큰 송장 엑셀을 페이지(행 묶음) 단위로 읽어서 보여주기 위한 저장소 (Qt 없이 동작)
+# - openpyxl read_only 로 한 번 훑으면서 PAGE_ROWS 행마다 페이지 파일(pickle)로 임시 폴더에 씀
+#   → 첫 페이지가 써지는 즉시 화면에 보여줄 수 있음 (전체를 pd.read_excel 로 읽을 때까지 기다리지 않음)
+# - 화면에서 필요한 페이지만 파일에서 읽어 메모리에 두고, MAX_PAGES_IN_MEMORY 개를 넘으면
+#   가장 오래 안 쓴 페이지부터 버림 (LRU)
+# - 셀 값은 pandas 의 openpyxl 변환과 같게 (정수인 실수 → int, 빈 칸 → NaN)
+#   단, 컬럼 단위 dtype 추론은 하지 않으므로 빈 칸이 섞인 정수 컬럼은 "3.0" 대신 "3" 으로 보이고,
+#   글자 셀 숫자("06236" 우편번호 등)는 숫자로 바꾸지 않아 앞자리 0 이 그대로 보인다.
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+PAGE_ROWS = 1_000
+MAX_PAGES_IN_MEMORY = 8
+
+# 이보다 큰 결과 엑셀은 (읽기 캐시에 없으면) 페이지 모드로 연다
+PAGING_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _convert(value):
+    """pandas 의 openpyxl 셀 변환과 같게: 빈 칸 → NaN, 정수인 실수 → int"""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class ScanCancelled(Exception):
+    pass
+
+
+class PagedWorkbook:
+    """
+    엑셀 첫 시트를 페이지 파일로 나눠 두고 필요한 페이지만 메모리에 올린다.
+    scan() 은 작업 스레드에서, page()/columns/rows_indexed 는 화면 스레드에서 불러도 된다.
+    transform: 페이지 DataFrame 마다 적용 (예: 문구개수 컬럼 추가). 컬럼 구성은 모든 페이지가 같아야 함.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        page_rows: int = PAGE_ROWS,
+        max_pages: int = MAX_PAGES_IN_MEMORY,
+        transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    ):
+        self.path = path
+        self.page_rows = page_rows
+        self.max_pages = max_pages
+        self.transform = transform
+
+        self.columns: Optional[List[str]] = None
+        self.rows_indexed = 0                   # 페이지 파일로 써 둔 행 수
+        self.estimated_rows: Optional[int] = None
+        self.done = False
+        self.error: Optional[str] = None
+
+        self._tmp_dir = tempfile.mkdtemp(prefix="excel_cal_pages_")
+        self._page_files: List[str] = []
+        self._pages: "OrderedDict[int, List[np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0                          # 파일에서 다시 읽은 횟수 (LRU 에서 밀려난 뒤)
+
+    # ------------------------------------------------------------------
+    # 훑기 (작업 스레드)
+    # ------------------------------------------------------------------
+    def scan(
+        self,
+        on_progress: Optional[Callable[[int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        엑셀을 처음부터 끝까지 한 번 읽으며 페이지 파일을 만든다.
+        페이지가 하나 써질 때마다 on_progress(지금까지 행 수).
+        """
+        wb = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            self.estimated_rows = max((ws.max_row or 1) - 1, 0) or None
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            names = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+            width = len(names)
+
+            block: List[list] = []
+            for row in rows:
+                values = [_convert(row[i]) if i < len(row) else np.nan for i in range(width)]
+                if all(v is np.nan for v in values):
+                    continue
+                block.append(values)
+                if len(block) >= self.page_rows:
+                    self._write_page(names, block)
+                    block = []
+                    if on_progress is not None:
+                        on_progress(self.rows_indexed)
+                    if is_cancelled is not None and is_cancelled():
+                        raise ScanCancelled()
+            if block or not self._page_files:
+                self._write_page(names, block)
+        finally:
+            wb.close()
+        self.done = True
+        if on_progress is not None:
+            on_progress(self.rows_indexed)
+
+    def _write_page(self, names: List[str], block: List[list]) -> None:
+        df = pd.DataFrame(block, columns=names) if block else pd.DataFrame(columns=names)
+        if self.transform is not None:
+            df = self.transform(df)
+        arrays = [df.iloc[:, i].to_numpy(dtype=object) for i in range(len(df.columns))]
+
+        index = len(self._page_files)
+        path = os.path.join(self._tmp_dir, f"page_{index:06d}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(arrays, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self.columns is None:
+                self.columns = [str(c) for c in df.columns]
+            self._page_files.append(path)
+            self._remember(index, arrays)
+            self.rows_indexed += len(df)
+
+    # ------------------------------------------------------------------
+    # 페이지 조회 (화면 스레드)
+    # ------------------------------------------------------------------
+    def _remember(self, index: int, arrays: List[np.ndarray]) -> None:
+        self._pages[index] = arrays
+        self._pages.move_to_end(index)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def page(self, index: int) -> List[np.ndarray]:
+        """index 번째 페이지의 컬럼 배열들. 메모리에 없으면 페이지 파일에서 읽는다."""
+        with self._lock:
+            arrays = self._pages.get(index)
+            if arrays is not None:
+                self._pages.move_to_end(index)
+                return arrays
+            path = self._page_files[index]
+        with open(path, "rb") as f:
+            arrays = pickle.load(f)
+        with self._lock:
+            self.loads += 1
+            self._remember(index, arrays)
+        return arrays
+
+    def value(self, row: int, col: int):
+        return self.page(row // self.page_rows)[col][row % self.page_rows]
+
+    def pages_in_memory(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    def close(self) -> None:
+        """임시 페이지 파일 삭제 (훑기가 끝났거나 취소된 뒤에 부른다)."""
+        with self._lock:
+            self._pages.clear()
+            self._page_files = []
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
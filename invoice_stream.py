@@ -0,0 +1,350 @@
+# invoice_stream.py
+# 아주 큰 주문 엑셀(시즌 전체 수십만 행)을 메모리를 일정하게 쓰면서 송장 변환
+# - openpyxl read_only 로 행을 하나씩 읽고, 출고번호 경계에서 STREAM_CHUNK_ROWS 행 단위로 잘라
+#   invoice_consolidate.consolidate 에 넘긴 뒤 결과를 바로 xlsx_stream.XlsxRowWriter 로 저장
+# - 엑셀이 출고번호끼리 붙어 있으면(보통의 다운로드) 한 번 읽기로 끝,
+#   같은 출고번호가 떨어져 나오면 처음부터 다시 읽으면서 임시 파일에 나눠 정렬(spill) 후 병합
+# - 메모리에는 조각 1개 + 출고번호 목록(키만)만 남는다
+
+import heapq
+import os
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+from decrypt_cache import get_default_cache, open_decrypted_mmap
+from invoice_consolidate import (
+    COL_BUNDLE,
+    COL_ENGRAVE,
+    COL_ITEM,
+    ChannelSpec,
+    consolidate,
+    output_paths,
+)
+from invoice_io import NAVER_DEFAULT_PASSWORD, MissingColumnsError
+from order_history import OrderHistory
+from processed_index import ProcessedIndex
+from xlsx_stream import XlsxRowWriter
+
+
+STREAM_CHUNK_ROWS = 20_000      # consolidate 에 한 번에 넘기는 행 수 (출고번호 경계에서 자름)
+SPILL_RUN_ROWS = 100_000        # 정렬 안 된 엑셀: 임시 파일 1개에 정렬해서 담는 행 수
+_PICKLE_BATCH = 1_000
+
+
+@dataclass
+class StreamResult:
+    paths: Dict[str, str]                   # 저장한 결과 파일 (새 주문이 없으면 빈 dict)
+    rows: int = 0                           # 변환한 주문 행 수
+    groups: int = 0                         # 출고번호 묶음 수
+    skipped_rows: int = 0                   # 전에 변환해서 건너뛴 행 수
+    repeat_buyers: int = 0
+    chunks: int = 0
+    spill_runs: int = 0                     # 0 이면 출고번호끼리 붙어 있는 엑셀이라 한 번에 처리
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class _NotGrouped(Exception):
+    """같은 출고번호가 떨어져서 다시 나옴 → spill 정렬로 다시 읽어야 함."""
+
+
+# ---------------------------------------------------------------------------
+# 행 읽기 (pd.read_excel 과 같은 셀 변환)
+# ---------------------------------------------------------------------------
+
+def _convert(value):
+    """pandas 의 openpyxl 셀 변환과 같게: 빈 칸 → "", 정수인 실수 → int"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _sheet_rows(ws, columns: List[str], header_row: int, where: str) -> Iterator[list]:
+    """
+    시트에서 columns 순서대로 값만 뽑은 행을 하나씩 돌려준다. (머리글 행 이전은 건너뜀, 빈 행은 버림)
+    필요한 컬럼이 없으면 MissingColumnsError.
+    """
+    ws.reset_dimensions()   # 다운로드 엑셀의 dimension 정보가 틀린 경우가 있어 pandas 와 같이 무시
+    rows = ws.iter_rows(min_row=header_row, values_only=True)
+    header = next(rows, None) or ()
+    positions = {}
+    for i, name in enumerate(header):
+        key = str(name).strip() if name is not None else ""
+        positions.setdefault(key, i)
+    missing = [c for c in columns if c not in positions]
+    if missing:
+        raise MissingColumnsError(missing, where)
+
+    idx = [positions[c] for c in columns]
+    for row in rows:
+        n = len(row)
+        values = [_convert(row[i]) if i < n else "" for i in idx]
+        if any(v != "" for v in values):
+            yield values
+
+
+@contextmanager
+def _open_rows(spec: ChannelSpec, path: str, password: Optional[str]):
+    """채널에 맞게 엑셀을 열어 행 iterator 를 돌려준다. (네이버: 복호화 후 첫 시트, 쿠팡: 모든 시트)"""
+    columns = spec.source_columns()
+    if spec.password_protected:
+        pw = password or NAVER_DEFAULT_PASSWORD
+        with open_decrypted_mmap(path, pw, get_default_cache()) as mm:
+            wb = load_workbook(mm, read_only=True, data_only=True)
+            try:
+                # 첫 줄은 안내 문구라 두 번째 줄이 머리글 (read_password_excel 의 skiprows=[0])
+                yield _sheet_rows(wb.worksheets[0], columns, 2, path)
+            finally:
+                wb.close()
+        return
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        def all_sheets() -> Iterator[list]:
+            found = False
+            first_error = None
+            for ws in wb.worksheets:
+                try:
+                    for row in _sheet_rows(ws, columns, 1, f"{path} / {ws.title}"):
+                        found = True
+                        yield row
+                except MissingColumnsError as e:
+                    print("File read error:", ws.title, e)
+                    first_error = first_error or e
+            if not found and first_error is not None:
+                raise first_error
+
+        yield all_sheets()
+    finally:
+        wb.close()
+
+
+def _to_frame(spec: ChannelSpec, columns: List[str], rows: List[list]) -> pd.DataFrame:
+    """행 목록 → DataFrame. read_excel 과 같은 TextParser 로 타입 추론 / 스키마 적용."""
+    dtype = spec.source_dtypes()
+    df = TextParser([columns] + rows, header=0, dtype=dtype, skip_blank_lines=False).read()
+    if not spec.password_protected:
+        # read_non_password_excel 과 같이 빈 칸을 0 으로 (문자열 컬럼은 "0")
+        df = df.fillna({c: "0" for c in dtype if c in df.columns}).fillna(0)
+    return df
+
+
+# ---------------------------------------------------------------------------
+# 출고번호 경계로 자르기 / spill 정렬
+# ---------------------------------------------------------------------------
+
+def _grouped_chunks(rows: Iterator[list], key_idx: int, chunk_rows: int, check: bool) -> Iterator[List[list]]:
+    """
+    출고번호가 바뀌는 곳에서만 잘라서 chunk_rows 행 안팎의 조각을 돌려준다.
+    check 면 이미 지나간 출고번호가 다시 나올 때 _NotGrouped.
+    """
+    buf: List[list] = []
+    seen = set()
+    current = object()
+    for row in rows:
+        key = row[key_idx]
+        if key != current:
+            if len(buf) >= chunk_rows:
+                yield buf
+                buf = []
+            if check:
+                if key in seen:
+                    raise _NotGrouped()
+                seen.add(key)
+            current = key
+        buf.append(row)
+    if buf:
+        yield buf
+
+
+def _write_run(items: List[Tuple[int, int, list]], tmp_dir: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="run_", suffix=".pkl", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(items), _PICKLE_BATCH):
+            pickle.dump(items[start:start + _PICKLE_BATCH], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[int, int, list]]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _spill_sorted(rows: Iterator[list], key_idx: int, run_rows: int, tmp_dir: str,
+                  stats: Dict[str, int]) -> Iterator[list]:
+    """
+    출고번호가 흩어진 엑셀: (출고번호 처음 나온 순서, 원래 행 순서) 로 정렬한 조각을 임시 파일에 쓰고
+    heapq.merge 로 합쳐서, 출고번호끼리 붙은 행을 원래 순서대로 돌려준다.
+    메모리에는 run_rows 행 + 출고번호 → 순번 dict 만 남는다.
+    """
+    ordinal: Dict[object, int] = {}
+    runs: List[str] = []
+    buf: List[Tuple[int, int, list]] = []
+    sort_key = itemgetter(0, 1)
+    for seq, row in enumerate(rows):
+        buf.append((ordinal.setdefault(row[key_idx], len(ordinal)), seq, row))
+        if len(buf) >= run_rows:
+            buf.sort(key=sort_key)
+            runs.append(_write_run(buf, tmp_dir))
+            buf = []
+    if buf:
+        buf.sort(key=sort_key)
+        runs.append(_write_run(buf, tmp_dir))
+    del ordinal
+    stats["spill_runs"] = len(runs)
+
+    for _, _, row in heapq.merge(*(_read_run(p) for p in runs), key=sort_key):
+        yield row
+
+
+class _Timer:
+    """iterator 를 감싸서 next() 에 걸린 시간(=읽기)을 모은다."""
+
+    def __init__(self, it):
+        self.it = it
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            return next(self.it)
+        finally:
+            self.seconds += time.perf_counter() - t0
+
+
+# ---------------------------------------------------------------------------
+# 스트리밍 변환
+# ---------------------------------------------------------------------------
+
+def _run_pass(
+    spec: ChannelSpec,
+    chunks: Iterator[List[list]],
+    columns: List[str],
+    paths: Dict[str, str],
+    result: StreamResult,
+    history: Optional[OrderHistory],
+    processed: Optional[ProcessedIndex],
+    new_keys: List[pd.DataFrame],
+) -> None:
+    key_col = spec.raw_column(spec.processed_key)
+    writers = {
+        "invoice": XlsxRowWriter(paths["invoice"], spec.invoice_columns),
+        "invoice_full": XlsxRowWriter(paths["invoice_full"], spec.invoice_columns, replace={COL_ITEM: COL_ENGRAVE}),
+    }
+    if "send" in paths:
+        writers["send"] = XlsxRowWriter(paths["send"], spec.send_columns, sheet_name="발송처리")
+    t_convert = t_write = 0.0
+    try:
+        for rows in chunks:
+            t0 = time.perf_counter()
+            df = _to_frame(spec, columns, rows)
+            if processed is not None:
+                df, skipped = processed.split_new(spec, df)
+                result.skipped_rows += skipped
+                new_keys.append(df[[key_col]])
+            part = consolidate(df, spec, history=history)
+            t1 = time.perf_counter()
+            t_convert += t1 - t0
+
+            writers["invoice"].write_frame(part.invoice)
+            writers["invoice_full"].write_frame(part.invoice)
+            if "send" in writers and part.send is not None:
+                writers["send"].write_frame(part.send)
+            t_write += time.perf_counter() - t1
+
+            result.rows += part.rows
+            result.groups += part.groups
+            result.repeat_buyers += part.repeat_buyers
+            result.chunks += 1
+    finally:
+        t0 = time.perf_counter()
+        for w in writers.values():
+            w.close()
+        t_write += time.perf_counter() - t0
+    result.timings["변환"] = result.timings.get("변환", 0.0) + t_convert
+    result.timings["저장"] = result.timings.get("저장", 0.0) + t_write
+
+
+def stream_consolidate(
+    spec: ChannelSpec,
+    path: str,
+    out_dir: str,
+    stamp: str,
+    password: Optional[str] = None,
+    history: Optional[OrderHistory] = None,
+    processed: Optional[ProcessedIndex] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    run_rows: int = SPILL_RUN_ROWS,
+) -> StreamResult:
+    """
+    주문 엑셀 path 를 조각 단위로 읽고 변환해서 out_dir 에 바로 저장한다. (결과 파일명은 write_result 와 같음)
+    묶음이 조각 경계에 걸치지 않으므로 결과는 전체를 한 번에 consolidate 한 것과 같은 순서/내용이다.
+    (단, 타입 추론이 조각마다 따로라 한 컬럼에 숫자/문자가 섞인 엑셀은 표기가 다를 수 있고,
+     history 의 1년 주문건수는 앞 조각까지 기록된 주문으로 센다)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    final_paths = output_paths(spec, out_dir, stamp)
+    tmp_paths = {k: f"{p}.{os.getpid()}.tmp" for k, p in final_paths.items()}
+    columns = spec.source_columns()
+    key_idx = columns.index(spec.raw_column(COL_BUNDLE))
+    result = StreamResult(paths={})
+    new_keys: List[pd.DataFrame] = []
+    read_seconds = 0.0
+
+    try:
+        try:
+            with _open_rows(spec, path, password) as rows:
+                timed = _Timer(rows)
+                try:
+                    chunks = _grouped_chunks(timed, key_idx, chunk_rows, check=True)
+                    _run_pass(spec, chunks, columns, tmp_paths, result, history, processed, new_keys)
+                finally:
+                    read_seconds += timed.seconds
+        except _NotGrouped:
+            print(f"[{spec.label}] 같은 출고번호가 떨어져 있어 임시 파일로 정렬해서 다시 읽습니다.")
+            result = StreamResult(paths={}, timings={"첫 시도": read_seconds + sum(result.timings.values())})
+            new_keys = []
+            read_seconds = 0.0
+            stats: Dict[str, int] = {}
+            with tempfile.TemporaryDirectory(prefix="excel_cal_spill_") as tmp_dir, \
+                    _open_rows(spec, path, password) as rows:
+                timed = _Timer(rows)
+                try:
+                    merged = _spill_sorted(timed, key_idx, run_rows, tmp_dir, stats)
+                    chunks = _grouped_chunks(merged, key_idx, chunk_rows, check=False)
+                    _run_pass(spec, chunks, columns, tmp_paths, result, history, processed, new_keys)
+                finally:
+                    read_seconds += timed.seconds
+            result.spill_runs = stats.get("spill_runs", 0)
+
+        if result.rows:
+            for key, tmp in tmp_paths.items():
+                os.replace(tmp, final_paths[key])
+            result.paths = final_paths
+            if processed is not None and new_keys:
+                processed.mark_processed(spec, pd.concat(new_keys, ignore_index=True))
+    finally:
+        for tmp in tmp_paths.values():
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    result.timings = {"읽기": read_seconds, **result.timings}
+    return result
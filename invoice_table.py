@@ -0,0 +1,337 @@
+# invoice_table.py
+# 송장 엑셀 표시용 Qt 모델/델리게이트 (ReadInvoiceWidget 에서 사용)
+# - DataFrameTableModel : DataFrame 컬럼 배열을 그대로 들고, 화면에 보이는 셀만 그때그때 글자로 바꿈
+#                         (셀마다 QTableWidgetItem / 행마다 QPushButton 을 만들지 않음)
+# - InvoiceFilterProxy  : 정렬(원래 값 기준) + 검색 필터 (search_index 가 있으면 색인으로, 없으면 칸을 훑어서)
+# - PhotoButtonDelegate : "사진(N장)…" 칸을 버튼 모양으로 그리고 클릭을 시그널로 알림
+# - fit_columns_sampled : 일부 행만 재서 컬럼 너비/행 높이를 정함 (행 수가 늘어도 시간 일정)
+# - PagedTableModel     : 아주 큰 엑셀용. invoice_pages.PagedWorkbook 의 페이지를 스크롤할 때마다
+#                         canFetchMore/fetchMore 로 이어 붙이고, 메모리에는 최근 페이지 몇 개만 둠
+# - PageScanThread      : PagedWorkbook.scan() 을 작업 스레드에서 돌리고 진행을 시그널로 알림
+
+import math
+import random
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    QSortFilterProxyModel,
+    QThread,
+    pyqtSignal,
+)
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionButton, QTableView
+
+from invoice_pages import PagedWorkbook, ScanCancelled
+from search_index import SearchIndex
+
+
+PHOTO_COLUMN = "사진"
+
+# 툴팁으로 전체 문구를 보여주는 컬럼
+LONG_TEXT_COLUMNS = ("품목명", "상품명")
+
+# 정렬할 때 쓰는 원래 값 (숫자는 숫자로, 빈 칸은 None)
+SORT_ROLE = Qt.UserRole + 1
+
+# 크기 계산에 쓰는 표본 행 수 / 컬럼 최대 너비 / 한 행에 보여줄 최대 줄 수
+SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 420
+MAX_ROW_LINES = 6
+
+
+def _plain(value):
+    """numpy 값 → 파이썬 값 (QVariant 로 바로 넘길 수 있게). NaN/None → None"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+def cell_text(value) -> str:
+    """셀 표시 글자. 예전 QTableWidget 표시와 같게: 빈 칸은 "", 나머지는 str()"""
+    return "" if pd.isna(value) else str(value)
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    DataFrame 을 보여주는 읽기 전용 모델. 맨 끝에 "사진" 컬럼을 붙인다.
+    사진 장수는 photo_count(행 번호) 로 그때그때 물어본다 (ReadInvoiceWidget._image_map 기준).
+    """
+
+    def __init__(self, photo_count: Optional[Callable[[int], int]] = None, parent=None):
+        super().__init__(parent)
+        self._columns: List[str] = []
+        self._arrays: List[np.ndarray] = []
+        self._rows = 0
+        self._col_index: Dict[str, int] = {}
+        self._photo_count = photo_count or (lambda row: 0)
+
+    # ------------------------------------------------------------------
+    # 데이터 설정 / 조회
+    # ------------------------------------------------------------------
+    def set_frame(self, df: pd.DataFrame) -> None:
+        self.beginResetModel()
+        cols = [str(c) for c in df.columns]
+        self._columns = cols + [PHOTO_COLUMN]
+        self._arrays = [df.iloc[:, i].to_numpy(dtype=object, copy=False) for i in range(len(cols))]
+        self._rows = len(df)
+        self._col_index = {name: idx for idx, name in enumerate(self._columns)}
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_frame(pd.DataFrame())
+
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column_index(self, name: str) -> Optional[int]:
+        return self._col_index.get(name)
+
+    def photo_column(self) -> Optional[int]:
+        return self._col_index.get(PHOTO_COLUMN)
+
+    def value(self, row: int, col: int):
+        return self._arrays[col][row]
+
+    def cell_text(self, row: int, col: int) -> str:
+        if col == self.photo_column():
+            return self._photo_text(row)
+        return cell_text(self.value(row, col))
+
+    def text_by_name(self, row: int, col_name: str) -> str:
+        col = self._col_index.get(col_name)
+        if col is None or not (0 <= row < self._rows):
+            return ""
+        return self.cell_text(row, col)
+
+    def _photo_text(self, row: int) -> str:
+        return f"사진({self._photo_count(row)}장)…"
+
+    def refresh_photo_column(self, row: Optional[int] = None) -> None:
+        """사진 장수가 바뀌었을 때 (row 가 None 이면 전체) 다시 그리게 한다."""
+        col = self.photo_column()
+        if col is None or self._rows == 0:
+            return
+        first = 0 if row is None else row
+        last = self._rows - 1 if row is None else row
+        self.dataChanged.emit(self.index(first, col), self.index(last, col), [Qt.DisplayRole])
+
+    # ------------------------------------------------------------------
+    # QAbstractTableModel
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if col == self.photo_column():
+            if role == Qt.DisplayRole:
+                return self._photo_text(row)
+            if role == SORT_ROLE:
+                return self._photo_count(row)
+            return None
+        if role == Qt.DisplayRole:
+            return cell_text(self.value(row, col))
+        if role == Qt.ToolTipRole and self._columns[col] in LONG_TEXT_COLUMNS:
+            return cell_text(self.value(row, col))
+        if role == SORT_ROLE:
+            return _plain(self.value(row, col))
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._columns[section] if 0 <= section < len(self._columns) else None
+        return str(section + 1)
+
+
+class PagedTableModel(DataFrameTableModel):
+    """
+    PagedWorkbook 을 보여주는 모델. 처음에는 첫 페이지만 행으로 내보내고,
+    뷰가 끝까지 스크롤하면 canFetchMore/fetchMore 로 한 페이지씩 늘린다.
+    셀 값은 그때그때 PagedWorkbook.page() 에서 (LRU 창 안에 없으면 페이지 파일에서) 가져온다.
+    """
+
+    def __init__(self, photo_count: Optional[Callable[[int], int]] = None, parent=None):
+        super().__init__(photo_count, parent)
+        self._book: Optional[PagedWorkbook] = None
+
+    def set_book(self, book: PagedWorkbook) -> None:
+        self.beginResetModel()
+        self._book = book
+        self._columns = list(book.columns or []) + [PHOTO_COLUMN]
+        self._col_index = {name: idx for idx, name in enumerate(self._columns)}
+        self._rows = 0
+        self.endResetModel()
+
+    def book(self) -> Optional[PagedWorkbook]:
+        return self._book
+
+    def value(self, row: int, col: int):
+        return self._book.value(row, col)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._book is not None and self._rows < self._book.rows_indexed
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        add = min(self._book.rows_indexed - self._rows, self._book.page_rows)
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + add - 1)
+        self._rows += add
+        self.endInsertRows()
+
+
+class PageScanThread(QThread):
+    """PagedWorkbook.scan() 작업 스레드. progress(행 수) 는 페이지마다, done(오류 문구, 없으면 "")"""
+
+    progress = pyqtSignal(int)
+    done = pyqtSignal(str)
+
+    def __init__(self, book: PagedWorkbook, parent=None):
+        super().__init__(parent)
+        self.book = book
+        self._cancel = False
+
+    def cancel(self) -> None:
+        self._cancel = True
+
+    def run(self) -> None:
+        try:
+            self.book.scan(self.progress.emit, lambda: self._cancel)
+        except ScanCancelled:
+            self.done.emit("취소됨")
+            return
+        except Exception as e:
+            self.done.emit(f"{type(e).__name__}: {e}")
+            return
+        self.done.emit("")
+
+
+class InvoiceFilterProxy(QSortFilterProxyModel):
+    """
+    정렬은 SORT_ROLE(원래 값)로 — 숫자 컬럼이 "10" < "9" 처럼 글자 순서로 정렬되지 않게.
+    필터
+    - SearchIndex 가 있으면: 검색할 때 색인으로 일치 행 표시(bool 배열)를 한 번 만들고 행마다 그 값만 봄
+    - 없으면 (페이지 모드): 검색어가 한 칸이라도 들어 있는 행만 (대소문자 무시, 사진 컬럼 제외)
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self._needle = ""
+        self._index: Optional[SearchIndex] = None
+        self._accept: Optional[List[bool]] = None      # 색인 검색 결과 (source 행별), None 이면 전체
+
+    def set_search_index(self, index: Optional[SearchIndex]) -> None:
+        """source 모델을 바꿀 때 같이 (index 의 행 = source 행)"""
+        self._index = index
+        self._apply_search()
+
+    def set_search_text(self, text: str) -> None:
+        self._needle = text.strip().lower()
+        self._apply_search()
+
+    def _apply_search(self) -> None:
+        mask = self._index.search(self._needle) if self._index is not None else None
+        self._accept = mask.tolist() if mask is not None else None
+        # invalidateFilter() 는 걸러진 행 구간마다 rowsRemoved 를 보내서, 일치 행이 흩어져 있으면
+        # 글자 하나에 수백 ms 가 걸린다 → 정렬 안 했을 때는 매핑을 통째로 다시 만든다.
+        # 정렬 중에는 통째로 다시 만들면 남은 행 전체를 lessThan 으로 다시 정렬하므로 그대로 invalidateFilter().
+        if self.sortColumn() < 0:
+            self.invalidate()
+        else:
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        accept = self._accept
+        if accept is not None:
+            return accept[source_row]
+        if not self._needle or self._index is not None:
+            return True
+        model = self.sourceModel()
+        photo_col = model.photo_column()
+        for col in range(model.columnCount()):
+            if col != photo_col and self._needle in model.cell_text(source_row, col).lower():
+                return True
+        return False
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        a = left.data(SORT_ROLE)
+        b = right.data(SORT_ROLE)
+        # 빈 칸은 항상 뒤로, 숫자/글자가 섞이면 글자로 비교
+        if a is None or b is None:
+            return a is not None and b is None
+        try:
+            return a < b
+        except TypeError:
+            return str(a) < str(b)
+
+
+class PhotoButtonDelegate(QStyledItemDelegate):
+    """사진 컬럼을 버튼처럼 그리고, 클릭하면 clicked(보이는 행 인덱스) 시그널."""
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def paint(self, painter, option, index):
+        btn = QStyleOptionButton()
+        btn.rect = option.rect.adjusted(2, 2, -2, -2)
+        btn.text = index.data(Qt.DisplayRole) or ""
+        btn.state = QStyle.State_Enabled
+        if option.state & QStyle.State_MouseOver:
+            btn.state |= QStyle.State_MouseOver
+        style = option.widget.style() if option.widget is not None else QtWidgets.QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, btn, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.pos()):
+                self.clicked.emit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+def fit_columns_sampled(view: QTableView, model: DataFrameTableModel, sample_rows: int = SAMPLE_ROWS) -> None:
+    """
+    resizeColumnsToContents / resizeRowsToContents 는 모든 셀을 재서 행 수에 비례해 느려지므로,
+    앞쪽 행 + 무작위 표본만 재서 컬럼 너비와 (모든 행 공통) 행 높이를 정한다.
+    긴 품목명은 MAX_ROW_LINES 줄까지만 보이고 전체는 툴팁/COPY 로 본다.
+    """
+    rows = model.rowCount()
+    head = list(range(min(rows, sample_rows // 2)))
+    rest = range(len(head), rows)
+    sample = head + (random.Random(0).sample(rest, min(len(rest), sample_rows - len(head))) if len(rest) else [])
+
+    fm = view.fontMetrics()
+    header_fm = view.horizontalHeader().fontMetrics()
+    line_h = fm.lineSpacing()
+    padding = 16
+    max_lines = 1
+    for col, name in enumerate(model.column_names()):
+        width = header_fm.horizontalAdvance(name) + padding
+        for row in sample:
+            lines = model.cell_text(row, col).splitlines() or [""]
+            width = max(width, max(fm.horizontalAdvance(s) for s in lines) + padding)
+            if name in LONG_TEXT_COLUMNS:
+                max_lines = max(max_lines, len(lines))
+        view.setColumnWidth(col, min(width, MAX_COLUMN_WIDTH))
+
+    header = view.verticalHeader()
+    header.setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+    header.setDefaultSectionSize(min(max_lines, MAX_ROW_LINES) * line_h + 8)
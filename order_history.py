@@ -0,0 +1,140 @@
+# order_history.py
+# 주문 이력 저장소 (로컬 SQLite) — 채널에 상관없이 "1년 주문건수" 계산
+# - 송장 변환할 때마다 주문 행을 upsert (키: 채널 + 상품주문번호)
+# - 구매자 키 = 숫자만 남긴 구매자 연락처 + "|" + 공백 뺀 구매자명
+# - (구매자 키, 주문시각) 인덱스로 배치 전체의 구매자별 건수를 집계 쿼리 한 번에 계산
+#
+# 주의: 구매자 이름/연락처가 저장되므로 사용자 로컬 폴더에만 둔다.
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+DEFAULT_DB_PATH = Path.home() / ".excel_cal" / "order_history.sqlite3"
+
+YEAR_SECONDS = 365 * 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    channel     TEXT NOT NULL,
+    order_key   TEXT NOT NULL,      -- 상품주문번호 (쿠팡: 주문번호)
+    bundle      TEXT NOT NULL,      -- 출고번호 (네이버 주문번호 / 쿠팡 묶음배송번호)
+    buyer_key   TEXT NOT NULL,
+    ordered_at  REAL NOT NULL,      -- 주문일시 (없으면 처음 기록한 시각), 로컬 시각 기준 초
+    PRIMARY KEY (channel, order_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_orders_buyer ON orders (buyer_key, ordered_at, channel, bundle);
+"""
+
+
+def _normalize_unique(values: pd.Series, pattern: str) -> pd.Series:
+    """pattern 에 맞는 글자를 지운다. 같은 값이 많으므로 고유값에만 정규식을 돌리고 다시 펼친다."""
+    codes, uniques = pd.factorize(values.astype(object).where(values.notna(), ""), sort=False)
+    cleaned = pd.Series(uniques, dtype=object).astype(str).str.replace(pattern, "", regex=True).to_numpy()
+    return pd.Series(cleaned[codes], index=values.index, dtype=object)
+
+
+def normalize_buyer_keys(names: pd.Series, phones: pd.Series) -> pd.Series:
+    """
+    구매자 키를 한 번에(벡터) 만든다. "010-1234-5678" / "01012345678" 은 같은 사람으로 본다.
+    연락처·이름이 모두 비어 있으면 "" (건수 계산에서 제외).
+    """
+    digits = _normalize_unique(phones, r"\D")
+    name = _normalize_unique(names, r"\s+")
+    keys = digits + "|" + name
+    return keys.where((digits != "") | (name != ""), "")
+
+
+def _to_epoch(values: Optional[pd.Series], n: int, now: float) -> pd.Series:
+    """주문일시 → 초. 없거나 못 읽는 값은 now."""
+    if values is None:
+        return pd.Series([now] * n, dtype=float)
+    ts = pd.to_datetime(values.astype(object), errors="coerce")
+    secs = (ts - pd.Timestamp(0)).dt.total_seconds()
+    return secs.fillna(now).reset_index(drop=True)
+
+
+class OrderHistory:
+    """
+    주문 이력 SQLite. 스레드마다(작업 스레드 / 프로세스) 새로 만들어 쓴다.
+    여러 프로세스(명령줄 --jobs)가 같이 써도 되도록 WAL 모드 + busy timeout.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "OrderHistory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 기록 + 집계
+    # ------------------------------------------------------------------
+    def record_and_count(
+        self,
+        channel: str,
+        order_keys: pd.Series,
+        bundles: pd.Series,
+        buyer_keys: pd.Series,
+        ordered_at: Optional[pd.Series] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """
+        이번 배치 주문을 upsert 한 뒤, 배치에 나온 구매자별 최근 1년 주문건수(출고번호 기준, 모든 채널,
+        이번 배치 포함)를 돌려준다. {구매자 키: 건수}
+        같은 파일을 다시 변환해도 (채널, 상품주문번호) 가 같으면 덮어쓰므로 건수가 늘지 않는다.
+        """
+        if now is None:
+            now = (pd.Timestamp.now() - pd.Timestamp(0)).total_seconds()
+        n = len(order_keys)
+        rows = pd.DataFrame({
+            "order_key": order_keys.astype(str).reset_index(drop=True),
+            "bundle": bundles.astype(str).reset_index(drop=True),
+            "buyer_key": buyer_keys.reset_index(drop=True),
+            "ordered_at": _to_epoch(ordered_at, n, now),
+        })
+        rows = rows[rows["buyer_key"] != ""]
+        if rows.empty:
+            return {}
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO orders (channel, order_key, bundle, buyer_key, ordered_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (channel, order_key) DO UPDATE SET "
+                "bundle = excluded.bundle, buyer_key = excluded.buyer_key, "
+                "ordered_at = MIN(orders.ordered_at, excluded.ordered_at)",
+                ((channel, *r) for r in rows.itertuples(index=False, name=None)),
+            )
+
+        # 배치 구매자만 임시 테이블에 넣고 인덱스 조인 한 번으로 집계
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_buyers (buyer_key TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM batch_buyers")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO batch_buyers VALUES (?)", ((k,) for k in rows["buyer_key"].unique())
+        )
+        cur = self.conn.execute(
+            "SELECT o.buyer_key, COUNT(DISTINCT o.channel || '|' || o.bundle) "
+            "FROM batch_buyers b JOIN orders o ON o.buyer_key = b.buyer_key "
+            "WHERE o.ordered_at >= ? GROUP BY o.buyer_key",
+            (now - YEAR_SECONDS,),
+        )
+        counts = dict(cur.fetchall())
+        self.conn.execute("DELETE FROM batch_buyers")
+        self.conn.commit()
+        return counts
+
+    def order_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
@@ -0,0 +1,99 @@
+# order_keys.py
+# 송장 행의 고정 키 (Qt 없이 동작, 첨부 사진을 행 번호 대신 이 키로 저장)
+# - 행 번호(1부터)로 사진을 붙여 두면 결과 엑셀을 다시 만들거나 순서가 바뀌면 다른 손님 행에 붙어 버린다.
+# - 키: 출고번호 → 없으면 상품주문번호 → 둘 다 없으면 행 내용(원본 컬럼 값 전체)의 sha256 앞부분
+#   예) "출고번호:20240101-0001", "상품주문번호:2024010112345678", "row:3f2a…"
+# - 같은 키가 또 나오면 나온 순서대로 "#2", "#3" … 을 붙인다 (묶음 배송 등).
+# - OrderKeyIndex: 행(DataFrame 위치, 0부터) → 키 목록 + 키 → 행 dict (정렬/검색과 상관없는 source 행)
+#   화면(정렬/검색 후) 행은 proxy.mapFromSource 로 바로 얻는다.
+# - 값은 pandas 엑셀 읽기와 페이지 모드(invoice_pages) 가 같은 키를 만들도록 정규화
+#   (빈 칸 → "", 정수인 실수 → 정수, 숫자만 있는 글자 → 앞자리 0 없이: pandas 는 "01234" 를 1234 로 읽음)
+#   → 같은 파일은 어느 쪽으로 열어도 같은 키.
+# 문구개수처럼 읽은 뒤에 붙이는 컬럼은 키에 넣지 않도록, 컬럼을 붙이기 전에 extend() 할 것.
+
+import hashlib
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+KEY_COLUMNS = ("출고번호", "상품주문번호")
+HASH_KEY_PREFIX = "row"
+
+# 내용 sha256 중 키에 쓰는 길이 (16진수 글자 수)
+HASH_KEY_CHARS = 24
+
+_VALUE_SEP = "\x1f"
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:          # NaN
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    text = str(value).strip()
+    if text.isdigit():
+        return text.lstrip("0") or "0"
+    return text
+
+
+def is_row_number_key(key: str) -> bool:
+    """예전(meta.json) 방식의 행 번호 키인지 ("12")"""
+    return key.isdigit()
+
+
+class OrderKeyIndex:
+    """
+    source 행 ↔ 고정 키.
+    페이지 모드에서는 작업 스레드가 페이지마다 extend() 하고 화면 스레드가 key()/row_of() 로 읽는다
+    (목록/dict 에 덧붙이기만 하므로 잠금 없이).
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}        # 기본 키 → 나온 횟수
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "OrderKeyIndex":
+        index = cls()
+        index.extend(df)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """df 의 행들을 뒤에 이어 붙인다 (df 는 원본 컬럼만)."""
+        names = [str(c) for c in df.columns]
+        key_cols = [i for i, c in enumerate(names) if c in KEY_COLUMNS]
+        key_cols.sort(key=lambda i: KEY_COLUMNS.index(names[i]))
+
+        for values in df.itertuples(index=False, name=None):
+            base = None
+            for i in key_cols:
+                text = _text(values[i])
+                if text:
+                    base = f"{names[i]}:{text}"
+                    break
+            if base is None:
+                joined = _VALUE_SEP.join(f"{n}={_text(v)}" for n, v in zip(names, values))
+                digest = hashlib.sha256(joined.encode("utf-8")).hexdigest()[:HASH_KEY_CHARS]
+                base = f"{HASH_KEY_PREFIX}:{digest}"
+
+            n = self._seen.get(base, 0) + 1
+            self._seen[base] = n
+            key = base if n == 1 else f"{base}#{n}"
+            self._rows[key] = len(self._keys)
+            self._keys.append(key)
+
+    def key(self, row: int) -> Optional[str]:
+        """source 행의 키 (아직 읽지 않은 행이면 None)"""
+        return self._keys[row] if 0 <= row < len(self._keys) else None
+
+    def row_of(self, key: str) -> Optional[int]:
+        """키의 source 행 (이 파일에 없으면 None)"""
+        return self._rows.get(key)
@@ -0,0 +1,246 @@
+# photo_gallery.py
+# 송장 전체 사진 모아보기 (ReadInvoiceWidget 의 "사진 모아보기")
+# - PhotoGalleryModel   : ReadInvoiceWidget._image_map (주문 키 → 파일명 목록) 을 "행 머리 + 사진들" 한 줄 목록으로 펼친 모델
+#                         파일명/키만 들고 있고 QPixmap 은 들고 있지 않음
+# - PhotoGalleryDelegate: 화면에 그려질 때만 image_cache 에 썸네일을 요청 (캐시에 있으면 바로, 없으면 자리표시 후 도착하면 다시 그림)
+# - PhotoGalleryDialog  : QListView (왼→오 흐름, 줄바꿈). 행 머리는 한 줄을 다 차지해서 행별로 묶여 보인다.
+#                         스크롤로 화면 밖으로 나간 사진의 디코딩 요청은 취소 → 500장 넘게 훑어도 보이는 것만 디코딩
+# 메모리에는 image_cache 의 LRU 상한만큼만 축소 pixmap 이 남는다.
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PyQt5 import QtGui
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog,
+    QLabel,
+    QListView,
+    QStyle,
+    QStyledItemDelegate,
+    QVBoxLayout,
+)
+
+from image_cache import CacheKey, PixmapCache, get_pixmap_cache
+
+
+# 썸네일 상자 (thumb_store 의 160 썸네일을 그대로 씀) / 칸 크기 / 머리 높이
+THUMB_BOX = QSize(150, 150)
+CELL_SIZE = QSize(166, 180)
+HEADER_HEIGHT = 28
+
+# 스크롤이 멈추고 이만큼 지나면 화면 밖 사진의 디코딩 요청을 취소 (ms)
+CANCEL_DELAY_MS = 150
+
+
+@dataclass
+class _Entry:
+    row_key: str                    # order_keys 의 주문 키 (image_meta 의 행 키와 같음)
+    fname: Optional[str] = None     # None 이면 행 머리
+    order: int = 0                  # 행 안에서 몇 번째 사진인지 (0 = 대표)
+    count: int = 0                  # 행의 사진 수 (행 머리용)
+
+
+class PhotoGalleryModel(QAbstractListModel):
+    def __init__(self, cache: PixmapCache, row_label: Callable[[str], str], parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.row_label = row_label
+        self._image_dir: Optional[Path] = None
+        self._entries: List[_Entry] = []
+        self._keys: Dict[int, Optional[CacheKey]] = {}      # 목록 위치 → 캐시 키 (처음 그릴 때 계산)
+        self._rows_by_key: Dict[CacheKey, List[int]] = {}
+        self.cache.loaded.connect(self._on_loaded)
+
+    def set_images(self, image_dir: Optional[Path], image_map: Dict[str, List[str]]) -> None:
+        """image_map 의 순서대로 보여준다 (부르는 쪽에서 송장 행 순서로 정렬해서 줄 것)"""
+        self.beginResetModel()
+        self._image_dir = image_dir
+        self._entries = []
+        self._keys = {}
+        self._rows_by_key = {}
+        for row_key, files in image_map.items():
+            if not files:
+                continue
+            self._entries.append(_Entry(row_key, count=len(files)))
+            self._entries.extend(_Entry(row_key, fname, i) for i, fname in enumerate(files))
+        self.endResetModel()
+
+    def detach(self) -> None:
+        self.cache.loaded.disconnect(self._on_loaded)
+
+    def photo_count(self) -> int:
+        return sum(1 for e in self._entries if e.fname is not None)
+
+    def row_count_with_photos(self) -> int:
+        return sum(1 for e in self._entries if e.fname is None)
+
+    # ------------------------------------------------------------------
+    # Qt 모델
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def entry(self, row: int) -> _Entry:
+        return self._entries[row]
+
+    def is_header(self, row: int) -> bool:
+        return self._entries[row].fname is None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        e = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            if e.fname is None:
+                return f"{self.row_label(e.row_key)}  ({e.count}장)"
+            return "대표" if e.order == 0 else e.fname
+        if role == Qt.ToolTipRole and e.fname is not None:
+            return str(self._image_dir / e.fname) if self._image_dir else e.fname
+        if role == Qt.UserRole:
+            return e.row_key
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # ------------------------------------------------------------------
+    # 썸네일
+    # ------------------------------------------------------------------
+    def key(self, row: int) -> Optional[CacheKey]:
+        if row not in self._keys:
+            e = self._entries[row]
+            key = None
+            if e.fname is not None and self._image_dir is not None:
+                key = self.cache.key_for(self._image_dir / e.fname, THUMB_BOX)
+            self._keys[row] = key
+            if key is not None:
+                self._rows_by_key.setdefault(key, []).append(row)
+        return self._keys[row]
+
+    def thumbnail(self, row: int) -> Optional[QtGui.QPixmap]:
+        """캐시에 있으면 pixmap (읽지 못한 파일은 빈 pixmap), 없으면 디코딩을 맡기고 None"""
+        key = self.key(row)
+        if key is None:
+            return QtGui.QPixmap()
+        # 여러 장이 한꺼번에 보이므로 "지금 보여줄 것" 하나를 고르는 load() 기본 동작 대신 prefetch 로
+        return self.cache.load(key, prefetch=True)
+
+    def requested_keys(self) -> Dict[CacheKey, List[int]]:
+        return self._rows_by_key
+
+    def _on_loaded(self, key, _pix):
+        for row in self._rows_by_key.get(key, ()):
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+
+class PhotoGalleryDelegate(QStyledItemDelegate):
+    def __init__(self, view: QListView):
+        super().__init__(view)
+        self.view = view
+
+    def sizeHint(self, option, index):
+        model = index.model()
+        if model.is_header(index.row()):
+            # 한 줄을 다 차지 → 다음 사진들은 새 줄에서 시작
+            width = self.view.viewport().width() - 2 * self.view.spacing() - 1
+            return QSize(max(width, CELL_SIZE.width()), HEADER_HEIGHT)
+        return CELL_SIZE
+
+    def paint(self, painter, option, index):
+        model = index.model()
+        row = index.row()
+        text = index.data(Qt.DisplayRole)
+        painter.save()
+        if model.is_header(row):
+            painter.fillRect(option.rect, option.palette.alternateBase())
+            font = painter.font()
+            font.setBold(True)
+            painter.setFont(font)
+            painter.drawText(option.rect.adjusted(8, 0, -8, 0), Qt.AlignVCenter | Qt.AlignLeft, text)
+            painter.restore()
+            return
+
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        box = QRect(option.rect.x() + (option.rect.width() - THUMB_BOX.width()) // 2,
+                    option.rect.y() + 4, THUMB_BOX.width(), THUMB_BOX.height())
+        pix = model.thumbnail(row)
+        if pix is None:
+            painter.drawText(box, Qt.AlignCenter, "불러오는 중…")
+        elif pix.isNull():
+            painter.drawText(box, Qt.AlignCenter, "이미지 없음")
+        else:
+            x = box.x() + (box.width() - pix.width()) // 2
+            y = box.y() + (box.height() - pix.height()) // 2
+            painter.drawPixmap(x, y, pix)
+        caption = QRect(option.rect.x() + 2, box.bottom() + 2, option.rect.width() - 4,
+                        option.rect.bottom() - box.bottom() - 2)
+        elided = option.fontMetrics.elidedText(text, Qt.ElideMiddle, caption.width())
+        painter.drawText(caption, Qt.AlignHCenter | Qt.AlignTop, elided)
+        painter.restore()
+
+
+class PhotoGalleryDialog(QDialog):
+    """
+    송장 전체 사진을 행별로 모아 보여준다 (모달 아님).
+    사진/행 머리를 더블클릭하면 row_activated(주문 키) → 송장 표에서 그 행 선택 + 사진 관리.
+    """
+
+    row_activated = pyqtSignal(str)
+
+    def __init__(self, parent, row_label: Callable[[str], str]):
+        super().__init__(parent)
+        self.setWindowTitle("사진 모아보기")
+        self.resize(900, 650)
+
+        self.cache = get_pixmap_cache()
+        self.model = PhotoGalleryModel(self.cache, row_label, self)
+
+        layout = QVBoxLayout(self)
+        self.lbl_summary = QLabel("")
+        layout.addWidget(self.lbl_summary)
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.ListMode)
+        self.view.setFlow(QListView.LeftToRight)
+        self.view.setWrapping(True)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setUniformItemSizes(False)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setBatchSize(500)
+        self.view.setSpacing(4)
+        self.view.setSelectionMode(QListView.SingleSelection)
+        self.view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.view.setItemDelegate(PhotoGalleryDelegate(self.view))
+        self.view.setModel(self.model)
+        layout.addWidget(self.view, 1)
+
+        self._cancel_timer = QTimer(self)
+        self._cancel_timer.setSingleShot(True)
+        self._cancel_timer.setInterval(CANCEL_DELAY_MS)
+        self._cancel_timer.timeout.connect(self._cancel_offscreen)
+        self.view.verticalScrollBar().valueChanged.connect(lambda _: self._cancel_timer.start())
+        self.view.doubleClicked.connect(lambda idx: self.row_activated.emit(self.model.entry(idx.row()).row_key))
+
+    def set_images(self, image_dir: Optional[Path], image_map: Dict[str, List[str]]) -> None:
+        self.model.set_images(image_dir, image_map)
+        self.lbl_summary.setText(
+            f"사진 {self.model.photo_count():,}장 / 사진 있는 행 {self.model.row_count_with_photos():,}개"
+            "  (더블클릭: 그 행의 사진 관리)"
+        )
+
+    def _cancel_offscreen(self):
+        """화면 밖으로 지나간 사진의 디코딩 요청 취소 (아직 시작 전인 것만)"""
+        visible = self.view.viewport().rect()
+        for key, rows in self.model.requested_keys().items():
+            if not any(self.view.visualRect(self.model.index(r)).intersects(visible) for r in rows):
+                self.cache.cancel(key)
+
+    def done(self, result):
+        self.model.detach()
+        super().done(result)
@@ -0,0 +1,90 @@
+# processed_index.py
+# 이미 송장발부로 만든 주문 기록 (로컬 SQLite)
+# - 하루에 여러 번 겹치는 기간을 내려받아도, 전에 변환한 주문은 건너뛰고 새 주문만 변환
+# - 키: 네이버 상품주문번호 / 쿠팡 묶음배송번호 (ChannelSpec.processed_key) + 처음 처리한 시각
+# - 결과 엑셀 저장까지 끝난 뒤에만 기록 (중간에 실패/취소하면 다음에 다시 변환됨)
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+from invoice_consolidate import ChannelSpec
+
+
+DEFAULT_DB_PATH = Path.home() / ".excel_cal" / "processed.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    channel     TEXT NOT NULL,
+    order_key   TEXT NOT NULL,
+    first_seen  REAL NOT NULL,
+    PRIMARY KEY (channel, order_key)
+) WITHOUT ROWID;
+"""
+
+
+def _key_values(spec: ChannelSpec, df_raw: pd.DataFrame) -> pd.Series:
+    col = spec.raw_column(spec.processed_key)
+    if col not in df_raw.columns:
+        raise ValueError(f"[{spec.label}] 엑셀에 필요한 컬럼이 없습니다: {col}")
+    return df_raw[col].astype(object).astype(str)
+
+
+class ProcessedIndex:
+    """처리한 주문 키 저장소. OrderHistory 와 같이 스레드/프로세스마다 새로 열어서 쓴다."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ProcessedIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def split_new(self, spec: ChannelSpec, df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """
+        df_raw 에서 전에 처리하지 않은 행만 돌려준다. (새 행 DataFrame, 건너뛴 행 수)
+        배치 키를 임시 테이블에 넣고 기본키 조인 한 번으로 이미 처리한 키를 찾은 뒤,
+        isin 으로 한 번에 걸러낸다 (anti-join).
+        """
+        keys = _key_values(spec, df_raw)
+        unique_keys = keys.unique()
+
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (order_key TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM batch_keys")
+        self.conn.executemany("INSERT OR IGNORE INTO batch_keys VALUES (?)", ((k,) for k in unique_keys))
+        done = [
+            row[0] for row in self.conn.execute(
+                "SELECT p.order_key FROM batch_keys b JOIN processed p "
+                "ON p.channel = ? AND p.order_key = b.order_key",
+                (spec.name,),
+            )
+        ]
+        self.conn.execute("DELETE FROM batch_keys")
+        self.conn.commit()
+
+        if not done:
+            return df_raw, 0
+        is_new = ~keys.isin(done).to_numpy()
+        return df_raw[is_new], int((~is_new).sum())
+
+    def mark_processed(self, spec: ChannelSpec, df_raw: pd.DataFrame) -> None:
+        """df_raw 의 키를 처리한 것으로 기록. 이미 있으면 처음 처리한 시각을 그대로 둔다."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed (channel, order_key, first_seen) VALUES (?, ?, ?)",
+                ((spec.name, k, now) for k in _key_values(spec, df_raw).unique()),
+            )
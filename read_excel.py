@@ -2,17 +2,17 @@
 # 네이버·쿠팡 송장 엑셀을 읽어와서 보여주고,
 # 품목명 파싱, 복사용 문구 COPY, 사진 첨부/삭제/재사용,
 # 문자 전송 UI 뼈대까지 포함한 탭 위젯.
+# 아주 큰 엑셀(읽기 캐시에 없고 PAGING_MIN_BYTES 이상)은 페이지 모드로 열어 첫 화면부터 바로 보여준다.
 
 import os
-import re
-import json
+import sqlite3
 import shutil
 from pathlib import Path
 from typing import Optional, List, Dict
 
 import pandas as pd
 from PyQt5 import QtWidgets, QtGui
-from PyQt5.QtCore import Qt, QDateTime
+from PyQt5.QtCore import Qt, QDateTime, QSize
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -21,8 +21,7 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QComboBox,
     QFileDialog,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QPlainTextEdit,
     QDialog,
     QLineEdit,
@@ -34,6 +33,26 @@ from PyQt5.QtWidgets import (
     QCheckBox,
 )
 
+from excel_readers import is_delimited
+from image_cache import PREFETCH_ROWS, get_pixmap_cache
+from photo_gallery import PhotoGalleryDialog
+from thumb_store import get_thumb_store
+from blob_store import get_blob_store
+from image_meta import ImageMetaStore
+from order_keys import OrderKeyIndex, is_row_number_key
+from engraving_lines import EngravingLines, parse_cell
+from search_index import SearchIndex
+from frame_cache import read_excel_cached, read_excel_is_cached
+from invoice_pages import PAGING_MIN_BYTES, PagedWorkbook
+from invoice_table import (
+    DataFrameTableModel,
+    InvoiceFilterProxy,
+    PagedTableModel,
+    PageScanThread,
+    PhotoButtonDelegate,
+    fit_columns_sampled,
+)
+
 
 # ----------------------------------------------------------------------
 # COPY 다이얼로그: 파싱된 문구들 + 각 줄별 COPY 버튼
@@ -119,6 +138,8 @@ class CopyLinesDialog(QDialog):
 # 이미지 관리 다이얼로그: 행별 여러 장 추가/삭제/미리보기
 # ----------------------------------------------------------------------
 class ImageManageDialog(QDialog):
+    ICON_SIZE = QSize(64, 64)
+
     def __init__(
         self,
         parent,
@@ -135,6 +156,11 @@ class ImageManageDialog(QDialog):
         self.image_dir = image_dir
         self._images: List[str] = list(current_files)
 
+        # 썸네일/미리보기는 작업 스레드에서 디코딩 (끝나면 _on_pixmap_loaded)
+        self._pixmaps = get_pixmap_cache()
+        self._pixmaps.loaded.connect(self._on_pixmap_loaded)
+        self._preview_key = None
+
         main_layout = QVBoxLayout(self)
 
         top_layout = QHBoxLayout()
@@ -185,20 +211,22 @@ class ImageManageDialog(QDialog):
     def images(self) -> List[str]:
         return list(self._images)
 
+    def done(self, result):
+        self._pixmaps.loaded.disconnect(self._on_pixmap_loaded)
+        super().done(result)
+
     # 리스트 갱신
     def _reload_list(self):
         self.list_widget.clear()
 
         for fname in self._images:
             item = QListWidgetItem(fname)
-            fpath = self.image_dir / fname
-            if fpath.is_file():
-                pix = QtGui.QPixmap(str(fpath))
-                if not pix.isNull():
-                    icon = QtGui.QIcon(
-                        pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    )
-                    item.setIcon(icon)
+            key = self._pixmaps.key_for(self.image_dir / fname, self.ICON_SIZE)
+            if key is not None:
+                item.setData(Qt.UserRole, key)
+                pix = self._pixmaps.load(key, prefetch=True)
+                if pix is not None and not pix.isNull():
+                    item.setIcon(QtGui.QIcon(pix))
             self.list_widget.addItem(item)
 
         if self._images:
@@ -218,27 +246,37 @@ class ImageManageDialog(QDialog):
             return
 
         fname = self._images[row]
-        fpath = self.image_dir / fname
-        if not fpath.is_file():
+        key = self._pixmaps.key_for(self.image_dir / fname, self.lbl_preview.size())
+        self._preview_key = key
+        self.lbl_filename.setText(fname)
+        if key is None:
+            self.lbl_preview.setPixmap(QtGui.QPixmap())
             self.lbl_preview.setText("파일 없음")
+            return
+
+        pix = self._pixmaps.load(key)
+        if pix is None:
             self.lbl_preview.setPixmap(QtGui.QPixmap())
-            self.lbl_filename.setText(fname)
+            self.lbl_preview.setText("불러오는 중…")
             return
+        self._show_preview(pix)
 
-        pix = QtGui.QPixmap(str(fpath))
+    def _show_preview(self, pix: QtGui.QPixmap):
         if pix.isNull():
-            self.lbl_preview.setText("이미지 로드 실패")
             self.lbl_preview.setPixmap(QtGui.QPixmap())
-            self.lbl_filename.setText(fname)
+            self.lbl_preview.setText("이미지 로드 실패")
             return
+        self.lbl_preview.setPixmap(pix)
 
-        scaled = pix.scaled(
-            self.lbl_preview.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        self.lbl_preview.setPixmap(scaled)
-        self.lbl_filename.setText(fname)
+    def _on_pixmap_loaded(self, key, pix: QtGui.QPixmap):
+        if key == self._preview_key:
+            self._show_preview(pix)
+        if pix.isNull():
+            return
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if item.data(Qt.UserRole) == key:
+                item.setIcon(QtGui.QIcon(pix))
 
     # 이미지 추가
     def _on_add(self):
@@ -254,16 +292,23 @@ class ImageManageDialog(QDialog):
         src = Path(src_path)
         ext = src.suffix.lower() or ".png"
 
+        # 행 번호는 파일마다 바뀌므로 (사진은 주문 키로 붙음) 같은 이름의 다른 주문 사진을 덮어쓰지 않게
         next_idx = len(self._images) + 1
         new_name = f"row_{self.row_id:04d}_{next_idx}{ext}"
+        while new_name in self._images or (self.image_dir / new_name).exists():
+            next_idx += 1
+            new_name = f"row_{self.row_id:04d}_{next_idx}{ext}"
 
+        # 원본은 공유 저장소에 한 벌만 (이미 붙인 적 있는 사진이면 링크만 만듦)
         try:
-            self.image_dir.mkdir(parents=True, exist_ok=True)
-            (self.image_dir / new_name).write_bytes(src.read_bytes())
+            get_blob_store().attach(src, self.image_dir / new_name)
         except (OSError, IOError) as e:
             QtWidgets.QMessageBox.critical(self, "복사 실패", str(e))
             return
 
+        store = get_thumb_store()
+        if store is not None:
+            store.generate_async([self.image_dir / new_name])
         self._images.append(new_name)
         self._reload_list()
 
@@ -286,10 +331,8 @@ class ImageManageDialog(QDialog):
             return
 
         fname = self._images.pop(row)
-        fpath = self.image_dir / fname
         try:
-            if fpath.is_file():
-                fpath.unlink()
+            get_blob_store().release(self.image_dir / fname)
         except (OSError, IOError):
             pass
 
@@ -312,15 +355,29 @@ class ReadInvoiceWidget(QWidget):
         self.current_df: Optional[pd.DataFrame] = None
         self.current_file: Optional[str] = None
 
-        # 이미지 매핑: row_id(1부터) -> [파일명, ...]
-        self._image_map: Dict[int, List[str]] = {}
+        # 품목명/상품명 각인 문구 줄 표 (엑셀 읽을 때 한 번 파싱, 페이지 모드에서는 None)
+        self._lines: Optional[EngravingLines] = None
+        self._lines_column: Optional[str] = None
+
+        # 행 고정 키 (출고번호/상품주문번호/행 내용 해시) ↔ source 행
+        self._order_keys: Optional[OrderKeyIndex] = None
+
+        # 이미지 매핑: 주문 키 -> [파일명, ...] (정렬/검색/파일 재생성과 상관없이 같은 주문에)
+        self._image_map: Dict[str, List[str]] = {}
         self._image_dir: Optional[Path] = None
-        self._meta_path: Optional[Path] = None
+        self._meta_store: Optional[ImageMetaStore] = None
 
-        # 테이블 컬럼 이름 → index 매핑
-        self._col_index: Dict[str, int] = {}
+        # 선택된 행 (current_df 기준 행 번호, 정렬/검색과 상관없음)
         self._current_row_idx: Optional[int] = None
 
+        # 대표 이미지 미리보기: 작업 스레드에서 줄여서 디코딩 + LRU 캐시 (image_cache)
+        self._pixmaps = get_pixmap_cache()
+        self._pixmaps.loaded.connect(self._on_pixmap_loaded)
+        self._preview_key = None
+
+        # 사진 모아보기 창 (열려 있을 때만)
+        self._gallery: Optional[PhotoGalleryDialog] = None
+
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(10, 10, 10, 10)
         main_layout.setSpacing(10)
@@ -332,21 +389,48 @@ class ReadInvoiceWidget(QWidget):
         self.combo_type.addItems(["네이버 송장", "쿠팡 송장"])
         self.lbl_file = QLabel("선택된 파일: (없음)")
         self.btn_open = QPushButton("엑셀 불러오기")
+        self.btn_gallery = QPushButton("사진 모아보기")
 
         top_layout.addWidget(lbl_type)
         top_layout.addWidget(self.combo_type)
         top_layout.addSpacing(20)
         top_layout.addWidget(self.lbl_file, 1)
         top_layout.addSpacing(20)
+        top_layout.addWidget(self.btn_gallery)
         top_layout.addWidget(self.btn_open)
         main_layout.addLayout(top_layout)
 
-        # 테이블
-        self.table = QTableWidget()
+        # 검색
+        search_layout = QHBoxLayout()
+        self.edit_search = QLineEdit()
+        self.edit_search.setPlaceholderText("검색 (받는 분, 전화번호, 출고번호, 상품주문번호, 각인 문구)")
+        self.edit_search.setClearButtonEnabled(True)
+        self.lbl_shown = QLabel("")
+        search_layout.addWidget(QLabel("검색:"))
+        search_layout.addWidget(self.edit_search, 1)
+        search_layout.addWidget(self.lbl_shown)
+        main_layout.addLayout(search_layout)
+
+        # 테이블 (모델/뷰: 화면에 보이는 행만 그림)
+        # self.model 은 지금 보여주는 모델 (보통 df_model, 페이지 모드면 paged_model)
+        self.df_model = DataFrameTableModel(photo_count=self._photo_count, parent=self)
+        self.paged_model = PagedTableModel(photo_count=self._photo_count, parent=self)
+        self.model: DataFrameTableModel = self.df_model
+        self.proxy = InvoiceFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self._page_thread: Optional[PageScanThread] = None
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setAlternatingRowColors(True)
         self.table.setWordWrap(True)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)   # 처음에는 엑셀 순서 그대로
+        self.table.setMouseTracking(True)
+
+        self.photo_delegate = PhotoButtonDelegate(self.table)
         main_layout.addWidget(self.table, 1)
 
         # 문자 전송 패널
@@ -360,8 +444,20 @@ class ReadInvoiceWidget(QWidget):
 
         # 시그널
         self.btn_open.clicked.connect(self.on_click_open)
-        self.table.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.table.itemSelectionChanged.connect(self.on_table_selection_changed)
+        self.btn_gallery.clicked.connect(self._open_gallery)
+        self.table.doubleClicked.connect(self.on_item_double_clicked)
+        self.table.selectionModel().selectionChanged.connect(self.on_table_selection_changed)
+        self.photo_delegate.clicked.connect(self._on_photo_clicked)
+        self.edit_search.textChanged.connect(self._on_search_changed)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._stop_paging)
+            # 작업 스레드의 Python 코드가 남은 채로 QApplication 이 정리되지 않도록 먼저 멈춤
+            store = get_thumb_store()
+            if store is not None:
+                app.aboutToQuit.connect(store.stop_background)
+            app.aboutToQuit.connect(self._pixmaps.shutdown)
+            app.aboutToQuit.connect(self._close_meta_store)
 
     # ------------------------------------------------------------------
     # 문자 전송 UI
@@ -444,32 +540,39 @@ class ReadInvoiceWidget(QWidget):
         self.lbl_file.setText(f"선택된 파일: {os.path.basename(file_path)}")
 
         invoice_type = self.combo_type.currentText()
+        self._stop_paging()
+        self._order_keys = None
+        if self._should_page(file_path):
+            self._open_paged(file_path, invoice_type)
+            return
         try:
             if invoice_type == "네이버 송장":
                 df = self._load_naver_invoice(file_path)
             else:
                 df = self._load_coupang_invoice(file_path)
 
-            df = self._add_item_count_column(df, invoice_type)
+            self._order_keys = OrderKeyIndex.build(df)     # 문구개수 컬럼을 붙이기 전 원본 컬럼으로
+            self._lines_column = self._item_column(df)
+            self._lines = self._parse_item_lines(df, invoice_type)
+            df = self._add_item_count_column(df, invoice_type, self._lines)
             self.current_df = df
 
             self._setup_image_store()
-            self._show_df_in_table(df)
+            self._show_df_in_table(df, SearchIndex.build(df, self._lines))
             self._log_columns(df, invoice_type, file_path)
 
         except (OSError, IOError, ValueError) as e:
             QtWidgets.QMessageBox.critical(self, "엑셀 읽기 오류", str(e))
             self.log.appendPlainText(f"[오류] 엑셀을 읽는 중 문제가 발생했습니다: {e}")
 
-    def on_item_double_clicked(self, item: QTableWidgetItem):
-        if self.current_df is None:
+    def on_item_double_clicked(self, index):
+        if self.model.rowCount() == 0 or not index.isValid():
             return
 
-        row = item.row()
-        col = item.column()
-
-        header = self.table.horizontalHeaderItem(col)
-        col_name = header.text() if header is not None else ""
+        src = self.proxy.mapToSource(index)
+        row = src.row()
+        col = src.column()
+        col_name = self.model.column_names()[col]
 
         if col_name not in ("품목명", "상품명"):
             self.log.appendPlainText(
@@ -477,16 +580,15 @@ class ReadInvoiceWidget(QWidget):
             )
             return
 
-        cell_text = self.table.item(row, col).text() if self.table.item(row, col) else ""
+        cell_text = self.model.cell_text(row, col)
         if not cell_text.strip():
             return
 
-        invoice_type = self.combo_type.currentText()
-
-        if invoice_type == "네이버 송장":
-            lines = self._parse_naver_lines(cell_text)
+        if self._lines is not None and self.model is self.df_model and col_name == self._lines_column:
+            lines = self._lines.for_row(row)
         else:
-            lines = self._parse_coupang_lines(cell_text)
+            # 페이지 모드: 줄 표가 없으므로 이 칸만 파싱
+            lines = parse_cell(cell_text, self.combo_type.currentText())
 
         if not lines:
             self.log.appendPlainText("※ 파싱된 문구가 없습니다. 패턴을 한 번 확인해 주세요.")
@@ -495,7 +597,7 @@ class ReadInvoiceWidget(QWidget):
         dlg = CopyLinesDialog(lines, self)
         dlg.exec_()
 
-    def on_table_selection_changed(self):
+    def on_table_selection_changed(self, *_):
         selected = self.table.selectionModel().selectedRows()
         if not selected:
             self._current_row_idx = None
@@ -504,10 +606,25 @@ class ReadInvoiceWidget(QWidget):
             self._clear_preview()
             return
 
-        row_idx = selected[0].row()
+        row_idx = self.proxy.mapToSource(selected[0]).row()
         self._current_row_idx = row_idx
         self._update_sms_panel_for_row(row_idx)
 
+    def _on_search_changed(self, text: str):
+        self.proxy.set_search_text(text)
+        self._update_shown_label()
+
+    def _update_shown_label(self):
+        total = self.model.rowCount()
+        shown = self.proxy.rowCount()
+        text = f"{shown:,} / {total:,}행" if shown != total else f"{total:,}행"
+        book = self.paged_model.book() if self.model is self.paged_model else None
+        if book is not None:
+            state = "읽기 완료" if book.done else "읽는 중"
+            more = ", 스크롤하면 더 불러옴" if self.paged_model.canFetchMore() or not book.done else ""
+            text += f" 표시 (전체 {book.rows_indexed:,}행 {state}{more})"
+        self.lbl_shown.setText(text)
+
     # ------------------------------------------------------------------
     # 문자 전송 버튼 (현재는 로그만 남김)
     # ------------------------------------------------------------------
@@ -520,7 +637,7 @@ class ReadInvoiceWidget(QWidget):
         phone = self._get_cell_text(self._current_row_idx, "받으시는 분 전화")
         invoice_type = self.combo_type.currentText()
         row_id = self._current_row_idx + 1
-        img_count = len(self._image_map.get(row_id, []))
+        img_count = self._photo_count(self._current_row_idx)
 
         when = (
             "지금"
@@ -533,7 +650,7 @@ class ReadInvoiceWidget(QWidget):
         )
 
     def on_send_all(self):
-        row_count = self.table.rowCount()
+        row_count = self.proxy.rowCount()
         if row_count == 0:
             QtWidgets.QMessageBox.information(self, "알림", "표시된 고객이 없습니다.")
             return
@@ -554,131 +671,291 @@ class ReadInvoiceWidget(QWidget):
     # ------------------------------------------------------------------
     @staticmethod
     def _load_naver_invoice(file_path: str) -> pd.DataFrame:
-        return pd.read_excel(file_path)
+        return read_excel_cached(file_path)
 
     @staticmethod
     def _load_coupang_invoice(file_path: str) -> pd.DataFrame:
-        return pd.read_excel(file_path)
+        return read_excel_cached(file_path)
 
     # ------------------------------------------------------------------
-    # 이미지 저장 위치 / meta.json 세팅
+    # 이미지 저장 위치 / 행별 사진 목록(meta.sqlite3) 세팅
     # ------------------------------------------------------------------
     def _setup_image_store(self):
+        self._close_meta_store()
         if not self.current_file:
             self._image_dir = None
-            self._meta_path = None
             self._image_map = {}
             return
 
         excel_path = Path(self.current_file)
         base_dir = excel_path.parent / excel_path.stem
         image_dir = base_dir / "images"
-        meta_path = base_dir / "meta.json"
 
         self._image_dir = image_dir
-        self._meta_path = meta_path
+        self._meta_store = ImageMetaStore(base_dir)     # 예전 meta.json 은 처음 열 때 옮겨 담음
         self._image_map = {}
+        try:
+            self._image_map = self._meta_store.load()
+        except (sqlite3.Error, OSError) as e:
+            self.log.appendPlainText(f"[경고] 사진 목록을 읽지 못했습니다: {e}")
+        self._migrate_row_number_keys()
 
-        if meta_path.is_file():
+        if self._image_map:
             try:
-                with meta_path.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                rows = data.get("rows", {})
-                self._image_map = {int(k): list(v) for k, v in rows.items()}
-            except (OSError, IOError, json.JSONDecodeError, ValueError, TypeError):
-                self._image_map = {}
-
-    def _save_image_meta(self):
-        if not self._meta_path:
+                # 안 쓰는 blob 정리(prune_orphans)는 하지 않음: 다른 창/프로세스가 막 만들고 링크하기 전일 수 있음
+                usage = get_blob_store().usage()
+                self.log.appendPlainText(f"  - 사진 저장소: {usage.describe()}")
+            except OSError as e:
+                self.log.appendPlainText(f"[경고] 사진 저장소 용량을 확인하지 못했습니다: {e}")
+
+        # 아직 썸네일이 없는 사진은 백그라운드에서 미리 만들어 둠 (이미 있으면 sha256 조회만)
+        store = get_thumb_store()
+        if store is not None and self._image_map:
+            store.generate_async(image_dir / f for files in self._image_map.values() for f in files)
+        self._refresh_gallery()
+
+    def _migrate_row_number_keys(self):
+        """
+        예전 행 번호 키("12") → 이 파일 그 행의 주문 키 (한 번만).
+        페이지 모드에서는 아직 읽지 않은 행은 남겨 두고 페이지가 읽힐 때마다 다시 부른다.
+        """
+        keys = self._order_keys
+        if keys is None or self._meta_store is None:
+            return
+        renames: Dict[str, str] = {}
+        for old in [k for k in self._image_map if is_row_number_key(k)]:
+            new = keys.key(int(old) - 1)
+            if new is not None and new not in self._image_map:
+                renames[old] = new
+        if not renames:
             return
+        try:
+            self._meta_store.rename_rows(renames)
+        except (sqlite3.Error, OSError) as e:
+            self.log.appendPlainText(f"[경고] 사진 목록 키 변환 실패: {e}")
+            return
+        for old, new in renames.items():
+            self._image_map[new] = self._image_map.pop(old)
+        self.log.appendPlainText(f"  - 사진 {len(renames)}행: 행 번호 대신 주문 키(출고번호 등)로 저장했습니다.")
+        self._refresh_gallery()
+
+    def _row_key(self, row_idx: int) -> Optional[str]:
+        return self._order_keys.key(row_idx) if self._order_keys is not None else None
 
+    def _save_image_row(self, row_key: str):
+        """행 하나의 사진 목록만 저장 (전체를 다시 쓰지 않음)"""
+        if self._meta_store is None:
+            return
         try:
-            self._meta_path.parent.mkdir(parents=True, exist_ok=True)
-            data = {"rows": self._image_map}
-            with self._meta_path.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except (OSError, IOError, TypeError, ValueError) as e:
-            self.log.appendPlainText(f"[경고] meta.json 저장 실패: {e}")
+            self._meta_store.set_row(row_key, self._image_map.get(row_key, []))
+        except (sqlite3.Error, OSError) as e:
+            self.log.appendPlainText(f"[경고] 사진 목록 저장 실패: {e}")
+
+    def _close_meta_store(self):
+        if self._meta_store is not None:
+            self._meta_store.close()
+            self._meta_store = None
 
     # ------------------------------------------------------------------
-    # DataFrame → QTableWidget 표시
+    # DataFrame → 테이블 표시 (모델만 바꾸고, 크기는 표본 행으로 계산)
     # ------------------------------------------------------------------
-    def _show_df_in_table(self, df: pd.DataFrame):
-        self.table.clear()
-
-        cols = list(df.columns)
-        photo_col_name = "사진"
-        cols_with_photo = cols + [photo_col_name]
-
-        row_count = len(df)
-        col_count = len(cols_with_photo)
-
-        self.table.setColumnCount(col_count)
-        self.table.setRowCount(row_count)
-        self.table.setHorizontalHeaderLabels([str(c) for c in cols_with_photo])
-
-        self._col_index = {name: idx for idx, name in enumerate(cols_with_photo)}
-
-        for row_idx in range(row_count):
-            for col_idx, col_name in enumerate(cols):
-                val = df.iloc[row_idx, col_idx]
-                text = "" if pd.isna(val) else str(val)
-                item = QTableWidgetItem(text)
-                if col_name in ("품목명", "상품명"):
-                    item.setToolTip(text)
-                self.table.setItem(row_idx, col_idx, item)
-
-            photo_col_idx = self._col_index[photo_col_name]
-            btn = QPushButton()
-            row_id = row_idx + 1
-            count = len(self._image_map.get(row_id, []))
-            btn.setText(f"사진({count}장)…")
-            btn.clicked.connect(self._make_photo_button_handler(row_idx))
-            self.table.setCellWidget(row_idx, photo_col_idx, btn)
-
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
-
-    def _make_photo_button_handler(self, row_idx: int):
-        def handler():
-            self._open_image_manager(row_idx)
-        return handler
+    def _show_df_in_table(self, df: pd.DataFrame, index: Optional[SearchIndex] = None):
+        self._use_model(self.df_model)
+        self.table.setSortingEnabled(True)
+        self.model.set_frame(df)
+        self.proxy.set_search_index(index)
+        self.table.setItemDelegateForColumn(self.model.photo_column(), self.photo_delegate)
+        fit_columns_sampled(self.table, self.model)
+        self._update_shown_label()
+
+    def _use_model(self, model: DataFrameTableModel):
+        old_photo_col = self.model.photo_column()
+        if old_photo_col is not None:
+            self.table.setItemDelegateForColumn(old_photo_col, None)
+        # 새 파일은 엑셀 순서 그대로 (이전 파일에서 누른 정렬 해제)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        if model is not self.model:
+            self.model = model
+            self.proxy.set_search_index(None)
+            self.proxy.setSourceModel(model)
+
+    # ------------------------------------------------------------------
+    # 페이지 모드 (아주 큰 엑셀)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _should_page(file_path: str) -> bool:
+        if is_delimited(file_path):
+            return False
+        try:
+            big = os.path.getsize(file_path) >= PAGING_MIN_BYTES
+        except OSError:
+            return False
+        return big and not read_excel_is_cached(file_path)
+
+    def _open_paged(self, file_path: str, invoice_type: str):
+        """
+        엑셀을 작업 스레드에서 페이지 파일로 나누면서, 첫 페이지가 나오면 바로 보여준다.
+        정렬은 전체 행이 메모리에 없으므로 끄고, 검색은 불러온 행 안에서만 한다.
+        """
+        self.current_df = None
+        self._lines = None
+        self._setup_image_store()
+        self._use_model(self.df_model)
+        self.df_model.clear()
+        self.lbl_shown.setText("불러오는 중…")
+        self.log.appendPlainText(
+            f"▶ [{invoice_type}] 큰 파일이라 페이지 단위로 읽습니다: {os.path.basename(file_path)}"
+        )
+
+        # 페이지마다 (작업 스레드) 주문 키를 이어 붙인 뒤 문구개수 컬럼을 붙인다
+        keys = self._order_keys = OrderKeyIndex()
+
+        def transform(df: pd.DataFrame) -> pd.DataFrame:
+            keys.extend(df)
+            return self._add_item_count_column(df, invoice_type)
+
+        book = PagedWorkbook(file_path, transform=transform)
+        thread = PageScanThread(book, self)
+        thread.progress.connect(self._on_page_progress)
+        thread.done.connect(self._on_page_scan_done)
+        self._page_thread = thread
+        thread.start()
+
+    def _on_page_progress(self, rows: int):
+        thread = self._page_thread
+        if thread is None or self.sender() is not thread:
+            return
+        book = thread.book
+        self._migrate_row_number_keys()
+        if self.model is not self.paged_model or self.paged_model.book() is not book:
+            # 첫 페이지: 모델을 바꾸고 바로 보여줌
+            self.paged_model.set_book(book)
+            self._use_model(self.paged_model)
+            self.table.setSortingEnabled(False)
+            self.paged_model.fetchMore()
+            self.table.setItemDelegateForColumn(self.model.photo_column(), self.photo_delegate)
+            fit_columns_sampled(self.table, self.model)
+        else:
+            # 이미 맨 아래까지 스크롤해 둔 상태면 새로 읽힌 페이지를 바로 이어 붙임
+            bar = self.table.verticalScrollBar()
+            if bar.value() >= bar.maximum() and self.paged_model.canFetchMore():
+                self.paged_model.fetchMore()
+        self._update_shown_label()
+
+    def _on_page_scan_done(self, error: str):
+        thread = self._page_thread
+        if thread is None or self.sender() is not thread:
+            return
+        if error:
+            self.log.appendPlainText(f"[오류] 페이지 읽기 중단: {error}")
+        else:
+            book = thread.book
+            self.log.appendPlainText(
+                f"  - 행 수: {book.rows_indexed}, 열 수: {len(book.columns or [])} "
+                f"(페이지 {book.page_rows}행, 메모리에는 최근 {book.max_pages}페이지만)"
+            )
+            self._migrate_row_number_keys()
+        self._update_shown_label()
+
+    def _stop_paging(self):
+        """읽고 있던 페이지 모드 파일을 닫는다 (작업 스레드 취소 + 임시 페이지 파일 삭제)."""
+        thread = self._page_thread
+        if thread is None:
+            return
+        self._page_thread = None
+        thread.cancel()
+        thread.wait()
+        if self.model is self.paged_model:
+            self._use_model(self.df_model)
+            self.df_model.clear()
+        thread.book.close()
+
+    def _photo_count(self, row_idx: int) -> int:
+        key = self._row_key(row_idx)
+        return len(self._image_map.get(key, [])) if key is not None else 0
+
+    def _on_photo_clicked(self, index):
+        self._open_image_manager(self.proxy.mapToSource(index).row())
 
     def _open_image_manager(self, row_idx: int):
         if not self._image_dir:
             QtWidgets.QMessageBox.information(self, "알림", "이미지 저장 폴더를 찾을 수 없습니다.")
             return
 
-        row_id = row_idx + 1
-        current_files = self._image_map.get(row_id, [])
+        row_key = self._row_key(row_idx)
+        if row_key is None:
+            return
+        current_files = self._image_map.get(row_key, [])
 
-        dlg = ImageManageDialog(self, row_id, self._image_dir, current_files)
+        dlg = ImageManageDialog(self, row_idx + 1, self._image_dir, current_files)
         if dlg.exec_() == QDialog.Accepted:
             files = dlg.images()
             if files:
-                self._image_map[row_id] = files
+                self._image_map[row_key] = files
             else:
-                self._image_map.pop(row_id, None)
+                self._image_map.pop(row_key, None)
 
-            self._save_image_meta()
-            self._refresh_photo_buttons()
+            self._save_image_row(row_key)
+            self.model.refresh_photo_column(row_idx)
             self._update_preview_for_row(row_idx)
+            self._refresh_gallery()
 
-    def _refresh_photo_buttons(self):
-        """
-        테이블에 있는 사진 버튼 텍스트를 image_map 기준으로 다시 그려준다.
-        """
-        photo_col_idx = self._col_index.get("사진")
-        if photo_col_idx is None:
+    # ------------------------------------------------------------------
+    # 사진 모아보기
+    # ------------------------------------------------------------------
+    def _open_gallery(self):
+        if not self._image_dir:
+            QtWidgets.QMessageBox.information(self, "알림", "먼저 송장 엑셀을 불러와 주세요.")
             return
+        if self._gallery is None:
+            dlg = PhotoGalleryDialog(self, self._gallery_row_label)
+            dlg.setAttribute(Qt.WA_DeleteOnClose)
+            dlg.row_activated.connect(self._on_gallery_row_activated)
+            dlg.finished.connect(self._on_gallery_closed)
+            self._gallery = dlg
+            self._refresh_gallery()
+        self._gallery.show()
+        self._gallery.raise_()
+
+    def _refresh_gallery(self):
+        if self._gallery is None:
+            return
+        # 송장 행 순서대로, 이 파일에 없는 주문(예전 파일에서 붙인 사진 등)은 맨 뒤에
+        keys = self._order_keys
+        end = len(keys) if keys is not None else 0
+
+        def order(row_key: str) -> int:
+            row = keys.row_of(row_key) if keys is not None else None
+            return end if row is None else row
 
-        for row_idx in range(self.table.rowCount()):
-            widget = self.table.cellWidget(row_idx, photo_col_idx)
-            if not isinstance(widget, QPushButton):
-                continue
-            row_id = row_idx + 1
-            count = len(self._image_map.get(row_id, []))
-            widget.setText(f"사진({count}장)…")
+        ordered = {k: self._image_map[k] for k in sorted(self._image_map, key=order)}
+        self._gallery.set_images(self._image_dir, ordered)
+
+    def _on_gallery_closed(self, *_):
+        self._gallery = None
+
+    def _source_row_of(self, row_key: str) -> Optional[int]:
+        """주문 키의 source 행 (이 파일에 없거나 아직 읽지 않았으면 None)"""
+        row = self._order_keys.row_of(row_key) if self._order_keys is not None else None
+        return row if row is not None and row < self.model.rowCount() else None
+
+    def _gallery_row_label(self, row_key: str) -> str:
+        row_idx = self._source_row_of(row_key)
+        if row_idx is None:
+            return f"이 파일에 없는 주문 · {row_key}"
+        name = self._get_cell_text(row_idx, "받으시는 분")
+        return f"행 {row_idx + 1}" + (f" · {name}" if name else "")
+
+    def _on_gallery_row_activated(self, row_key: str):
+        row_idx = self._source_row_of(row_key)
+        if row_idx is None:
+            QtWidgets.QMessageBox.information(self, "알림", f"지금 연 송장에 없는 주문입니다.\n{row_key}")
+            return
+        view_idx = self.proxy.mapFromSource(self.model.index(row_idx, 0))
+        if view_idx.isValid():
+            self.table.selectRow(view_idx.row())
+            self.table.scrollTo(view_idx)
+        self._open_image_manager(row_idx)
 
     # ------------------------------------------------------------------
     # 로그 출력
@@ -694,70 +971,30 @@ class ReadInvoiceWidget(QWidget):
         self.log.appendPlainText("-" * 40)
 
     # ------------------------------------------------------------------
-    # 네이버 / 쿠팡 품목명 파싱 (static)
+    # 각인 문구 줄 표 / "문구개수" 컬럼 자동 추가
     # ------------------------------------------------------------------
     @staticmethod
-    def _parse_naver_lines(cell_text: str) -> List[str]:
-        lines: List[str] = []
-        for raw in cell_text.splitlines():
-            s = raw.strip()
-            if not re.match(r"^\d+\.", s):
-                continue
-            body = s.split(".", 1)[1].lstrip()
-            idx = body.find("/ 각인체")
-            if idx != -1:
-                core = body[:idx].strip()
-            else:
-                if "=>" in body:
-                    core = body.split("=>", 1)[0].strip()
-                else:
-                    core = body.strip()
-            if core:
-                lines.append(core)
-        return lines
+    def _item_column(df: pd.DataFrame) -> Optional[str]:
+        for cand in ("품목명", "상품명"):
+            if cand in df.columns:
+                return cand
+        return None
 
-    @staticmethod
-    def _parse_coupang_lines(cell_text: str) -> List[str]:
-        lines: List[str] = []
-        for raw in cell_text.splitlines():
-            s = raw.strip()
-            if not re.match(r"^\d+\.", s):
-                continue
-            if ":" in s:
-                right = s.split(":", 1)[1]
-            else:
-                right = s
-            if "=>" in right:
-                core = right.split("=>", 1)[0].strip()
-            else:
-                core = right.strip()
-            if core:
-                lines.append(core)
-        return lines
+    def _parse_item_lines(self, df: pd.DataFrame, invoice_type: str) -> Optional[EngravingLines]:
+        col_key = self._item_column(df)
+        if col_key is None:
+            return None
+        return EngravingLines.parse(df[col_key], invoice_type)
 
-    # ------------------------------------------------------------------
-    # "문구개수" 컬럼 자동 추가
-    # ------------------------------------------------------------------
     def _add_item_count_column(
-        self, df: pd.DataFrame, invoice_type: str
+        self, df: pd.DataFrame, invoice_type: str, lines: Optional[EngravingLines] = None
     ) -> pd.DataFrame:
-        col_key = None
-        for cand in ("품목명", "상품명"):
-            if cand in df.columns:
-                col_key = cand
-                break
-        if col_key is None:
+        """lines 가 없으면 여기서 파싱 (페이지 모드에서 페이지마다)"""
+        if lines is None:
+            lines = self._parse_item_lines(df, invoice_type)
+        if lines is None:
             return df
-
-        counts: List[int] = []
-        for idx in range(len(df)):
-            val = df.iloc[idx][col_key]
-            text = "" if pd.isna(val) else str(val)
-            if invoice_type == "네이버 송장":
-                lines = self._parse_naver_lines(text)
-            else:
-                lines = self._parse_coupang_lines(text)
-            counts.append(len(lines))
+        counts = lines.counts()
 
         base_name = "문구개수"
         col_name = base_name
@@ -772,11 +1009,7 @@ class ReadInvoiceWidget(QWidget):
     # 문자 패널 / 미리보기 갱신
     # ------------------------------------------------------------------
     def _get_cell_text(self, row_idx: int, col_name: str) -> str:
-        col_idx = self._col_index.get(col_name)
-        if col_idx is None:
-            return ""
-        item = self.table.item(row_idx, col_idx)
-        return "" if item is None else item.text()
+        return self.model.text_by_name(row_idx, col_name)
 
     def _update_sms_panel_for_row(self, row_idx: int):
         name = self._get_cell_text(row_idx, "받으시는 분")
@@ -787,39 +1020,59 @@ class ReadInvoiceWidget(QWidget):
         self._update_preview_for_row(row_idx)
 
     def _clear_preview(self):
+        self._preview_key = None
         self.lbl_img_preview.setPixmap(QtGui.QPixmap())
         self.lbl_img_preview.setText("대표 이미지\n미리보기 없음")
         self.lbl_img_name.setText("")
 
-    def _update_preview_for_row(self, row_idx: int):
+    def _primary_image_key(self, row_idx: int):
+        """row_idx 의 대표 이미지 캐시 키 (사진이 없거나 파일이 없으면 None)"""
         if not self._image_dir:
-            self._clear_preview()
-            return
-
-        row_id = row_idx + 1
-        files = self._image_map.get(row_id) or []
+            return None
+        key = self._row_key(row_idx)
+        files = (self._image_map.get(key) if key is not None else None) or []
         if not files:
-            self._clear_preview()
-            return
+            return None
+        return self._pixmaps.key_for(self._image_dir / files[0], self.lbl_img_preview.size())
 
-        fname = files[0]
-        fpath = self._image_dir / fname
-        if not fpath.is_file():
+    def _update_preview_for_row(self, row_idx: int):
+        key = self._primary_image_key(row_idx)
+        if key is None:
             self._clear_preview()
             return
 
-        pix = QtGui.QPixmap(str(fpath))
+        self._preview_key = key
+        pix = self._pixmaps.load(key)
+        if pix is None:
+            # 디코딩이 끝나면 _on_pixmap_loaded 에서 표시
+            self.lbl_img_preview.setPixmap(QtGui.QPixmap())
+            self.lbl_img_preview.setText("불러오는 중…")
+            self.lbl_img_name.setText(Path(key[0]).name)
+        else:
+            self._show_preview(key, pix)
+        self._prefetch_neighbours(row_idx)
+
+    def _show_preview(self, key, pix: QtGui.QPixmap):
         if pix.isNull():
             self._clear_preview()
             return
-        # noinspection PyUnresolvedReferences
-        scaled = pix.scaled(
-            self.lbl_img_preview.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        self.lbl_img_preview.setPixmap(scaled)
-        self.lbl_img_name.setText(fname)
+        self.lbl_img_preview.setPixmap(pix)
+        self.lbl_img_name.setText(Path(key[0]).name)
+
+    def _on_pixmap_loaded(self, key, pix: QtGui.QPixmap):
+        if key == self._preview_key:
+            self._show_preview(key, pix)
+
+    def _prefetch_neighbours(self, row_idx: int):
+        """화면(정렬/검색 후) 기준 위아래 PREFETCH_ROWS 행의 대표 이미지를 미리 디코딩"""
+        view_row = self.proxy.mapFromSource(self.model.index(row_idx, 0)).row()
+        if view_row < 0:
+            return
+        for d in range(1, PREFETCH_ROWS + 1):
+            for r in (view_row + d, view_row - d):
+                if 0 <= r < self.proxy.rowCount():
+                    src_row = self.proxy.mapToSource(self.proxy.index(r, 0)).row()
+                    self._pixmaps.prefetch(self._primary_image_key(src_row))
 
 
 # ----------------------------------------------------------------------
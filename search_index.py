@@ -0,0 +1,126 @@
+# search_index.py
+# 송장 검색용 n-gram 역색인 (Qt 없이 동작, ReadInvoiceWidget 검색창에서 사용)
+# - 엑셀을 읽을 때 한 번: 행마다 검색 대상 글자를 모아 정규화하고, 글자 1개/2개 조각(1-gram, 2-gram) → 행 번호 목록을 만든다.
+# - 검색할 때: 검색어의 2-gram 목록들을 교집합 → 후보 행만 실제로 들어 있는지 확인 (전체 행을 훑지 않음)
+# - 한 글자씩 이어 치는 경우(앞 결과 ⊇ 새 결과)는 앞 결과 안에서만 확인
+# - 검색 대상: 받는 분 이름, 전화번호(숫자만으로도), 출고번호, 상품주문번호, 각인 문구
+#   (각인 문구는 전체 문구가 든 "각인" 컬럼, 없으면 품목명에서 파싱한 줄 표 — 품목명은 8줄까지만 있으므로)
+# - 정규화: 소문자, 공백/하이픈 제거 → "010-1234" 와 "0101234", "홍 길동" 과 "홍길동" 이 같게
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from engraving_lines import EngravingLines
+
+
+SEARCH_COLUMNS = ("받으시는 분", "받으시는 분 전화", "받는분핸드폰", "출고번호", "상품주문번호")
+ENGRAVING_COLUMN = "각인"
+
+_STRIP = re.compile(r"[\s\-]+")
+
+# 서로 다른 칸의 글자가 붙어서 엉뚱한 조각이 생기지 않도록 칸 사이에 넣는 글자 (검색어에는 안 나옴)
+_FIELD_SEP = "\x00"
+
+
+def normalize(text: str) -> str:
+    return _STRIP.sub("", text.lower())
+
+
+def _grams(text: str):
+    """text 의 1-gram + 2-gram (칸 구분 글자를 넘는 조각은 만들지 않음)"""
+    grams = set()
+    for part in text.split(_FIELD_SEP):
+        grams.update(part)
+        grams.update([part[i:i + 2] for i in range(len(part) - 1)])
+    return grams
+
+
+class SearchIndex:
+    """
+    행 번호(0부터, DataFrame 위치) 단위 역색인.
+    search(query) → 행별 일치 여부 bool 배열 (검색어가 비면 None = 전체).
+    """
+
+    def __init__(self, docs: List[str]):
+        self.docs = docs
+        self.n_rows = len(docs)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for row, doc in enumerate(docs):
+            for g in _grams(doc):
+                postings[g].append(row)
+        # 행 번호 순으로 쌓였으므로 이미 정렬/중복 없음
+        self._postings: Dict[str, np.ndarray] = {g: np.asarray(rows, dtype=np.int64) for g, rows in postings.items()}
+
+        self._last_query = ""
+        self._last_rows: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, lines: Optional[EngravingLines] = None) -> "SearchIndex":
+        """df 의 SEARCH_COLUMNS + 각인 문구로 색인"""
+        parts: List[pd.Series] = []
+        text_cols = list(SEARCH_COLUMNS) + [ENGRAVING_COLUMN]
+        for col in text_cols:
+            if col in df.columns:
+                s = df[col].reset_index(drop=True)
+                parts.append(s.where(s.notna(), "").astype(str))
+        if ENGRAVING_COLUMN not in df.columns and lines is not None and len(lines.table):
+            joined = lines.table.groupby("row")["text"].agg(_FIELD_SEP.join)
+            parts.append(joined.reindex(range(len(df)), fill_value="").astype(str))
+
+        if parts:
+            merged = parts[0]
+            for p in parts[1:]:
+                merged = merged + _FIELD_SEP + p
+            docs = [normalize(d) for d in merged.tolist()]
+        else:
+            docs = [""] * len(df)
+        return cls(docs)
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def _candidates(self, q: str) -> np.ndarray:
+        if len(q) == 1:
+            return self._postings.get(q, np.empty(0, dtype=np.int64))
+        lists = []
+        for g in {q[i:i + 2] for i in range(len(q) - 1)}:
+            rows = self._postings.get(g)
+            if rows is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(rows)
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def search_rows(self, query: str) -> Optional[np.ndarray]:
+        """일치하는 행 번호 (오름차순). 검색어가 비면 None."""
+        q = normalize(query).replace(_FIELD_SEP, "")
+        if not q:
+            self._last_query, self._last_rows = "", None
+            return None
+        if self._last_rows is not None and self._last_query and self._last_query in q:
+            candidates = self._last_rows            # 이어 치는 중: 앞 결과 안에서만
+        else:
+            candidates = self._candidates(q)
+        docs = self.docs
+        rows = np.fromiter((r for r in candidates.tolist() if q in docs[r]), dtype=np.int64)
+        self._last_query, self._last_rows = q, rows
+        return rows
+
+    def search(self, query: str) -> Optional[np.ndarray]:
+        """행별 일치 여부 (bool 배열, 길이 n_rows). 검색어가 비면 None."""
+        rows = self.search_rows(query)
+        if rows is None:
+            return None
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return mask
@@ -0,0 +1,269 @@
+# thumb_store.py
+# 첨부 사진 썸네일 저장소 (디스크, 사용자 로컬 폴더)
+# - 송장을 다시 열 때마다 <엑셀이름>/images 의 원본 사진(폰 사진 12MP 등)을 다시 디코딩하지 않도록
+#   THUMB_SIZES 크기(정사각형 상자 안에 비율 유지)의 썸네일을 한 번 만들어 두고 계속 쓴다.
+# - 키: 원본 파일 sha256 → 같은 사진을 여러 송장/행에 붙여도 썸네일은 하나,
+#   원본을 바꾸면 내용이 달라지므로 자연히 새로 만듦
+# - 원본을 한 번만 (가장 큰 썸네일 크기로 줄여서) 디코딩하고, 작은 크기는 그걸 다시 줄여서 만든다.
+# - index.json 의 "paths": {"경로|크기|mtime_ns": sha256} 로 같은 파일은 sha256 계산도 생략
+# - 썸네일은 1장에 수십 KB 라 따로 지우지 않는다. 비우려면 clear().
+#
+# Qt 위젯은 쓰지 않고 QImageReader 로 읽고 줄이기만 하므로 작업 스레드에서 불러도 된다.
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from PyQt5.QtCore import QRunnable, QSize, Qt, QThreadPool
+from PyQt5.QtGui import QImageReader
+
+from file_hash import path_key, sha256_file
+
+
+DEFAULT_THUMB_DIR = Path.home() / ".excel_cal" / "thumbs"
+
+# 사진 관리 아이콘 64, 행 미리보기 160, 사진 관리 미리보기 260
+THUMB_SIZES = (64, 160, 260)
+
+JPEG_QUALITY = 90
+
+# 송장을 열 때 미리 만들어 두는 작업은 화면에 보이는 디코딩보다 뒤로
+PRIORITY_BACKGROUND = -1
+
+
+def wait_pool(pool: QThreadPool, msecs: int = -1) -> bool:
+    """
+    pool 의 작업이 끝날 때까지 대기. PyQt 의 waitForDone() 은 GIL 을 쥔 채로 기다려서
+    Python 으로 된 작업(QRunnable.run)이 끝나지 못하고 멈추므로, GIL 을 놓으며 조금씩 확인한다.
+    """
+    deadline = None if msecs < 0 else time.monotonic() + msecs / 1000
+    while not pool.waitForDone(0):
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class ThumbnailStore:
+    """
+    원본 사진 → 크기별 썸네일 파일.
+    cache_dir/<sha256 앞 2자리>/<sha256>_<크기>.jpg (투명 배경 있는 사진은 .png)
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_THUMB_DIR, sizes=THUMB_SIZES):
+        self.cache_dir = Path(cache_dir)
+        self.sizes = tuple(sorted(sizes))
+        self.index_path = self.cache_dir / "index.json"
+        self._lock = threading.Lock()
+        self._paths: Optional[Dict[str, str]] = None
+        self._busy: Dict[str, threading.Event] = {}     # sha256 → 다른 스레드가 만드는 중
+        self._stopping = False
+        self._pool: Optional[QThreadPool] = None
+
+        self.hits = 0
+        self.generated = 0
+
+    # ------------------------------------------------------------------
+    # 원본 → sha256
+    # ------------------------------------------------------------------
+    def _load_paths(self) -> Dict[str, str]:
+        if self._paths is None:
+            try:
+                with self.index_path.open("r", encoding="utf-8") as f:
+                    self._paths = dict(json.load(f).get("paths", {}))
+            except (OSError, IOError, json.JSONDecodeError, ValueError, TypeError, AttributeError):
+                self._paths = {}
+        return self._paths
+
+    def _save_paths(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(f"index.{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"paths": self._paths}, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def content_hash(self, path) -> Optional[str]:
+        """원본 sha256 (파일이 없으면 None)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        pk = path_key(path, st)
+        with self._lock:
+            sha = self._load_paths().get(pk)
+        if sha is not None:
+            return sha
+        try:
+            sha = sha256_file(str(path))
+        except OSError:
+            return None
+        with self._lock:
+            self._load_paths()[pk] = sha
+            try:
+                self._save_paths()
+            except OSError:
+                pass
+        return sha
+
+    # ------------------------------------------------------------------
+    # 썸네일 파일
+    # ------------------------------------------------------------------
+    def _thumb_path(self, sha: str, size: int, ext: str) -> Path:
+        return self.cache_dir / sha[:2] / f"{sha}_{size}{ext}"
+
+    def _existing(self, sha: str, size: int) -> Optional[Path]:
+        for ext in (".jpg", ".png"):
+            p = self._thumb_path(sha, size, ext)
+            if p.is_file():
+                return p
+        return None
+
+    def _size_for(self, box: QSize) -> Optional[int]:
+        """box 안에 맞출 때 쓸 썸네일 크기: box 보다 작지 않은 것 중 가장 작은 것 (없으면 None → 원본 사용)"""
+        need = max(box.width(), box.height())
+        for s in self.sizes:
+            if s >= need:
+                return s
+        return None
+
+    def lookup(self, path, box: QSize) -> Optional[Path]:
+        """box 미리보기에 쓸 썸네일 파일. 아직 없으면 None (만들지는 않음)."""
+        size = self._size_for(box)
+        sha = self.content_hash(path) if size is not None else None
+        if sha is None:
+            return None
+        found = self._existing(sha, size)
+        if found is not None:
+            self.hits += 1
+        return found
+
+    def generate(self, path) -> Dict[int, Path]:
+        """
+        원본을 한 번 디코딩해서 모든 크기의 썸네일을 만든다 (이미 있는 크기는 건너뜀).
+        {크기: 썸네일 파일}. 원본을 읽지 못하면 빈 dict.
+        """
+        sha = self.content_hash(path)
+        if sha is None:
+            return {}
+        # 같은 사진을 두 스레드가 동시에 만들지 않도록 (송장 열 때 미리 만들기 + 화면 미리보기)
+        with self._lock:
+            busy = self._busy.get(sha)
+            if busy is None:
+                self._busy[sha] = threading.Event()
+        if busy is not None:
+            busy.wait()
+            return {s: p for s in self.sizes for p in [self._existing(sha, s)] if p is not None}
+        try:
+            return self._generate(path, sha)
+        finally:
+            with self._lock:
+                self._busy.pop(sha).set()
+
+    def _generate(self, path, sha: str) -> Dict[int, Path]:
+        out = {s: p for s in self.sizes for p in [self._existing(sha, s)] if p is not None}
+        missing = [s for s in self.sizes if s not in out]
+        if not missing:
+            return out
+
+        reader = QImageReader(str(path))
+        src = reader.size()
+        largest = QSize(missing[-1], missing[-1])
+        if src.isValid() and (src.width() > largest.width() or src.height() > largest.height()):
+            reader.setScaledSize(src.scaled(largest, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return out
+
+        ext = ".png" if image.hasAlphaChannel() else ".jpg"
+        for s in reversed(missing):
+            if image.width() > s or image.height() > s:
+                image = image.scaled(s, s, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            target = self._thumb_path(sha, s, ext)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f"{target.stem}.{threading.get_ident()}.tmp{ext}")
+            if image.save(str(tmp), None, JPEG_QUALITY if ext == ".jpg" else -1):
+                os.replace(tmp, target)
+                out[s] = target
+        self.generated += 1
+        return out
+
+    def thumbnail_for(self, path, box: QSize) -> Optional[Path]:
+        """box 미리보기에 쓸 썸네일 파일. 없으면 지금 만든다 (작업 스레드에서 부를 것)."""
+        size = self._size_for(box)
+        if size is None:
+            return None
+        found = self.lookup(path, box)
+        if found is not None:
+            return found
+        return self.generate(path).get(size)
+
+    # ------------------------------------------------------------------
+    # 백그라운드 생성
+    # ------------------------------------------------------------------
+    def generate_async(self, paths: Iterable, priority: int = PRIORITY_BACKGROUND) -> None:
+        """paths 의 썸네일을 백그라운드 스레드 1개에서 만든다 (사진 추가 / 송장 열기 직후)."""
+        files: List[str] = [str(p) for p in paths]
+        if not files:
+            return
+        if self._pool is None:
+            self._pool = QThreadPool()
+            self._pool.setMaxThreadCount(1)     # 화면 미리보기 디코딩 몫을 남겨 둠
+        self._stopping = False
+        self._pool.start(_GenerateTask(self, files), priority)
+
+    def stop_background(self) -> None:
+        """
+        generate_async 로 맡긴 남은 파일은 건너뛰고, 만드는 중인 1장이 끝날 때까지 기다린다 (프로그램 종료 시).
+        """
+        self._stopping = True
+        if self._pool is not None:
+            self._pool.clear()
+            wait_pool(self._pool)
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._paths = {}
+
+
+class _GenerateTask(QRunnable):
+    def __init__(self, store: ThumbnailStore, files: List[str]):
+        super().__init__()
+        self.store = store
+        self.files = files
+
+    def run(self):
+        for f in self.files:
+            if self.store._stopping:
+                return
+            try:
+                self.store.generate(f)
+            except OSError as e:
+                print(f"[썸네일] 만들지 못함: {f} ({e})")
+
+
+# ---------------------------------------------------------------------------
+# 기본 저장소 (프로세스당 하나)
+# ---------------------------------------------------------------------------
+
+_default_store: Optional[ThumbnailStore] = None
+_default_enabled = True
+
+
+def get_thumb_store() -> Optional[ThumbnailStore]:
+    """기본 저장소. set_thumb_store_enabled(False) 면 None (항상 원본에서 디코딩)."""
+    global _default_store
+    if not _default_enabled:
+        return None
+    if _default_store is None:
+        _default_store = ThumbnailStore()
+    return _default_store
+
+
+def set_thumb_store_enabled(enabled: bool) -> None:
+    global _default_enabled
+    _default_enabled = enabled
@@ -0,0 +1,316 @@
+# xlsx_stream.py
+# 결과 엑셀(.xlsx) 스트리밍 저장 (zipfile 만 사용, openpyxl/xlsxwriter 불필요)
+# - 행을 조금씩 XML 로 만들어 바로 zip 에 압축해 쓰므로 메모리는 거의 일정
+# - 문자열은 공유 문자열 표(sharedStrings.xml)에 한 번만 넣고, 같은 표를 여러 파일이 함께 쓸 수 있음
+#   (송장발부 / 송장발부_전체 는 품목명 한 컬럼만 달라서 표를 한 번만 만들면 된다)
+# - 머리글은 pandas.to_excel 과 같이 굵게 + 얇은 테두리
+# - 날짜/시각은 to_excel 처럼 엑셀 날짜(일련번호 + 날짜 서식)로, ±inf 는 to_excel(inf_rep) 처럼 "inf"/"-inf" 글자로
+# - XlsxRowWriter: 전체 행 수를 모르는 채로 DataFrame 조각을 이어서 쓰기 (스트리밍 변환용, 문자열은 셀 안에)
+#
+# openpyxl 3.1 은 문자열을 셀마다 inlineStr 로 쓰고 공유 문자열 표가 없어서 직접 쓴다.
+
+import datetime
+import math
+import re
+import zipfile
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+ROW_CHUNK = 2000            # 한 번에 XML 로 만들어 zip 에 쓰는 행 수
+
+# XML 1.0 에 쓸 수 없는 제어 문자 (openpyxl ILLEGAL_CHARACTERS_RE 와 같은 범위)
+_ILLEGAL_XML = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sst}</Types>'
+)
+_SST_CONTENT_TYPE = (
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '{sst}</Relationships>'
+)
+_SST_REL = (
+    '<Relationship Id="rId3" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/>'
+)
+
+# 스타일 0: 기본, 스타일 1: 머리글 (굵게 + 얇은 테두리), 2: 날짜+시각, 3: 날짜
+# (날짜 서식은 pandas.to_excel 기본값 datetime_format / date_format 과 같게)
+_STYLE_DATETIME = 2
+_STYLE_DATE = 3
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="YYYY-MM-DD HH:MM:SS"/>'
+    '<numFmt numFmtId="165" formatCode="YYYY-MM-DD"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" '
+    'applyAlignment="1"><alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _escape(text: str) -> str:
+    text = _ILLEGAL_XML.sub("", text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+# 엑셀(1900 날짜 체계) 일련번호 0 일. 1900-03-01 전은 엑셀의 1900-02-29 버그 때문에 하루 당긴다.
+_EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+
+def _excel_serial(value: datetime.datetime) -> float:
+    """datetime → 엑셀 날짜 일련번호 (openpyxl.utils.datetime.to_excel 과 같은 값, 시간대는 버림)"""
+    delta = value.replace(tzinfo=None) - _EXCEL_EPOCH
+    days = delta.days
+    if 0 < days <= 60:
+        days -= 1
+    return days + (delta.seconds + delta.microseconds / 1e6) / 86400
+
+
+def _col_letter(idx: int) -> str:
+    """0 → A, 25 → Z, 26 → AA"""
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# ---------------------------------------------------------------------------
+# 공유 문자열 표
+# ---------------------------------------------------------------------------
+
+class SharedStrings:
+    """
+    여러 파일이 같이 쓰는 공유 문자열 표.
+    index: 문자열 → 번호, xml: 완성된 sharedStrings.xml (한 번만 만들어서 파일마다 그대로 씀)
+    """
+
+    def __init__(self, strings: Sequence[str]):
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(strings)}
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{len(strings)}" uniqueCount="{len(strings)}">'
+        ]
+        parts.extend(f'<si><t xml:space="preserve">{_escape(s)}</t></si>' for s in strings)
+        parts.append("</sst>")
+        self.xml = "".join(parts).encode("utf-8")
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[pd.DataFrame]) -> "SharedStrings":
+        """frames 의 머리글 + 문자열 셀을 모두 모아 표를 만든다. (pd.unique 로 한 번에 중복 제거)"""
+        chunks: List[np.ndarray] = []
+        for df in frames:
+            chunks.append(np.asarray([str(c) for c in df.columns], dtype=object))
+            for col in df.columns:
+                values = df[col].to_numpy(dtype=object)
+                chunks.append(values[[isinstance(v, str) for v in values]])
+        strings = pd.unique(np.concatenate(chunks)) if chunks else []
+        return cls(list(strings))
+
+
+# ---------------------------------------------------------------------------
+# 쓰기
+# ---------------------------------------------------------------------------
+
+def _cell_xml(ref: str, value, sst: Optional[SharedStrings]) -> str:
+    if value is None or value is pd.NaT:
+        return ""
+    if isinstance(value, str):
+        if value == "":
+            return ""
+        if sst is None:
+            return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{_escape(value)}</t></is></c>'
+        return f'<c r="{ref}" t="s"><v>{sst.index[value]}</v></c>'
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return ""
+        if math.isinf(value):
+            # 엑셀 숫자에는 무한대가 없다 → to_excel(inf_rep="inf") 과 같은 글자
+            return f'<c r="{ref}" t="inlineStr"><is><t>{"inf" if value > 0 else "-inf"}</t></is></c>'
+        return f'<c r="{ref}"><v>{repr(float(value))}</v></c>'
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+        if value is pd.NaT:
+            return ""
+    if isinstance(value, datetime.datetime):       # pd.Timestamp 포함
+        return f'<c r="{ref}" s="{_STYLE_DATETIME}"><v>{repr(_excel_serial(value))}</v></c>'
+    if isinstance(value, datetime.date):
+        serial = _excel_serial(datetime.datetime.combine(value, datetime.time()))
+        return f'<c r="{ref}" s="{_STYLE_DATE}"><v>{repr(serial)}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{_escape(str(value))}</t></is></c>'
+
+
+def _write_package(zf: zipfile.ZipFile, sheet_name: str, sst: Optional[SharedStrings]) -> None:
+    """시트 XML 을 뺀 나머지 파일들 (sst 가 없으면 공유 문자열 표 없이)"""
+    zf.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sst=_SST_CONTENT_TYPE if sst else ""))
+    zf.writestr("_rels/.rels", _ROOT_RELS)
+    zf.writestr(
+        "xl/workbook.xml",
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{_escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    )
+    zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(sst=_SST_REL if sst else ""))
+    zf.writestr("xl/styles.xml", _STYLES)
+    if sst is not None:
+        zf.writestr("xl/sharedStrings.xml", sst.xml)
+
+
+def _sheet_head(dim: Optional[str]) -> bytes:
+    dim_xml = f'<dimension ref="{dim}"/>' if dim else ""
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'{dim_xml}<sheetData>'
+    ).encode("utf-8")
+
+
+def _header_xml(letters: List[str], columns: List, sst: Optional[SharedStrings]) -> bytes:
+    if sst is None:
+        cells = "".join(
+            f'<c r="{letter}1" s="1" t="inlineStr"><is><t xml:space="preserve">{_escape(str(c))}</t></is></c>'
+            for letter, c in zip(letters, columns)
+        )
+    else:
+        cells = "".join(
+            f'<c r="{letter}1" s="1" t="s"><v>{sst.index[str(c)]}</v></c>' for letter, c in zip(letters, columns)
+        )
+    return f'<row r="1">{cells}</row>'.encode("utf-8")
+
+
+def _write_rows(out, df: pd.DataFrame, sources: List[str], letters: List[str], first_row: int,
+                sst: Optional[SharedStrings]) -> None:
+    """df 행을 ROW_CHUNK 씩 XML 로 만들어 out 에 쓴다. first_row: 첫 행의 엑셀 행 번호"""
+    values = [df[c].to_numpy(dtype=object) for c in sources]
+    n_rows = len(df)
+    for start in range(0, n_rows, ROW_CHUNK):
+        parts = []
+        for i in range(start, min(start + ROW_CHUNK, n_rows)):
+            r = first_row + i
+            cells = "".join(_cell_xml(f"{letter}{r}", col[i], sst) for letter, col in zip(letters, values))
+            parts.append(f'<row r="{r}">{cells}</row>')
+        out.write("".join(parts).encode("utf-8"))
+
+
+def _sources(columns: List, replace: Optional[Dict[str, str]]) -> List:
+    return [(replace or {}).get(c, c) for c in columns]
+
+
+def write_xlsx(
+    path: str,
+    df: pd.DataFrame,
+    sheet_name: str = "Sheet1",
+    shared: Optional[SharedStrings] = None,
+    replace: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    df 를 시트 1개짜리 .xlsx 로 저장한다. (index 없이, to_excel(index=False) 와 같은 배치)
+    shared: 여러 파일이 함께 쓰는 공유 문자열 표 (없으면 df 로 새로 만듦)
+    replace: {"보낼 컬럼": "값을 가져올 컬럼"} — 복사본 없이 한 컬럼 내용만 바꿔서 쓸 때
+             (예: 송장발부_전체 = 송장발부 의 품목명 자리에 각인 컬럼)
+    """
+    sst = shared if shared is not None else SharedStrings.from_frames([df])
+    columns = list(df.columns)
+    letters = [_col_letter(i) for i in range(len(columns))]
+    dim = f"A1:{letters[-1]}{len(df) + 1}" if columns else "A1"
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        _write_package(zf, sheet_name, sst)
+        with zf.open("xl/worksheets/sheet1.xml", "w") as out:
+            out.write(_sheet_head(dim))
+            out.write(_header_xml(letters, columns, sst))
+            _write_rows(out, df, _sources(columns, replace), letters, 2, sst)
+            out.write(b"</sheetData></worksheet>")
+
+
+class XlsxRowWriter:
+    """
+    행 수를 모르는 채로 DataFrame 조각을 이어서 쓰는 .xlsx 저장기.
+    공유 문자열 표를 만들려면 모든 문자열을 들고 있어야 하므로 문자열은 셀 안(inlineStr)에 쓴다.
+    with XlsxRowWriter(path, columns) as w:
+        w.write_frame(chunk_df)
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], sheet_name: str = "Sheet1",
+                 replace: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+        self._sources = _sources(self.columns, replace)
+        self._letters = [_col_letter(i) for i in range(len(self.columns))]
+        self._zf = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        _write_package(self._zf, sheet_name, None)
+        self._out = self._zf.open("xl/worksheets/sheet1.xml", "w")
+        self._out.write(_sheet_head(None))
+        self._out.write(_header_xml(self._letters, self.columns, None))
+
+    def write_frame(self, df: pd.DataFrame) -> None:
+        _write_rows(self._out, df, self._sources, self._letters, self.rows + 2, None)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._out is None:
+            return
+        self._out.write(b"</sheetData></worksheet>")
+        self._out.close()
+        self._zf.close()
+        self._out = None
+
+    def __enter__(self) -> "XlsxRowWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()